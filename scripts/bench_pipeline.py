@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import sys
+import tempfile
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = REPO_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from staff_quoter.pipeline.benchmark import (
+    CASES,
+    DEFAULT_THRESHOLD,
+    compare_to_baseline,
+    load_baseline,
+    run_suite,
+    write_baseline,
+)
+from staff_quoter.pipeline.synthetic import SyntheticWorkbookSpec, generate_workbook
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark validator, builder, PDF renderer and end-to-end pipeline "
+        "on a synthetic workbook and compare against a stored baseline"
+    )
+    parser.add_argument("--sheets", type=int, default=3, help="Costing sheets in the workbook")
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per costing sheet")
+    parser.add_argument("--columns", type=int, default=8, help="Columns per costing sheet")
+    parser.add_argument(
+        "--formula-density", type=float, default=0.6, help="Share of costing cells with formulas"
+    )
+    parser.add_argument(
+        "--cross-sheet", type=float, default=0.1, help="Share of formulas reading another sheet"
+    )
+    parser.add_argument(
+        "--error-ratio", type=float, default=0.0, help="Share of formulas with an error token"
+    )
+    parser.add_argument("--quotes", type=int, default=1, help="Quote rows in INPUT_QUOTE")
+    parser.add_argument("--seed", type=int, default=0, help="Generator seed")
+    parser.add_argument(
+        "--case",
+        dest="cases",
+        action="append",
+        choices=CASES,
+        default=None,
+        help="Case to run (repeatable; default all)",
+    )
+    parser.add_argument("--iterations", type=int, default=5, help="Minimum timed runs per case")
+    parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=0.5,
+        help="Keep repeating each case until this much time has been measured",
+    )
+    parser.add_argument(
+        "--baseline",
+        default=str(REPO_ROOT / "benchmarks" / "pipeline_baseline.json"),
+        help="Baseline file (one entry per workbook shape)",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Allowed throughput drop / peak RSS growth before failing (0.2 = 20%%)",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Record these results as the baseline instead of comparing",
+    )
+    parser.add_argument(
+        "--no-isolate",
+        action="store_true",
+        help="Run every case in this process (peak RSS then covers all previous cases)",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    spec = SyntheticWorkbookSpec(
+        sheets=args.sheets,
+        rows=args.rows,
+        columns=args.columns,
+        formula_density=args.formula_density,
+        cross_sheet_ratio=args.cross_sheet,
+        error_ratio=args.error_ratio,
+        quotes=args.quotes,
+        seed=args.seed,
+    )
+    baseline_path = Path(args.baseline).expanduser().resolve()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workbook_path = generate_workbook(Path(tmp) / f"synthetic_{spec.label}.xlsx", spec)
+        results = run_suite(
+            workbook_path,
+            cases=args.cases or CASES,
+            iterations=args.iterations,
+            isolate=not args.no_isolate,
+            min_seconds=args.min_seconds,
+        )
+
+    for result in results:
+        print(json.dumps(result.to_dict(), ensure_ascii=True), flush=True)
+
+    baseline = load_baseline(baseline_path, spec)
+    if args.update_baseline or baseline is None:
+        write_baseline(baseline_path, spec, results)
+        print(f"Baseline for {spec.label} recorded in {baseline_path}", file=sys.stderr)
+        return 0
+
+    regressions = compare_to_baseline(results, baseline, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    print(
+        json.dumps({"workbook": spec.label, "regressions": len(regressions)}, ensure_ascii=True)
+    )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
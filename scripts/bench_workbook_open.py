@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+from openpyxl import Workbook
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = REPO_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from staff_quoter.pipeline import WorkbookFormulaValidator, WorkbookSnapshot
+from staff_quoter.pipeline.quote_builder import QuotePayloadBuilder
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare opening a quote workbook twice (openpyxl) vs once (snapshot)"
+    )
+    parser.add_argument("--workbook", default="", help="Existing workbook to benchmark (.xlsx)")
+    parser.add_argument(
+        "--rows", type=int, default=5000, help="Formula rows in the generated workbook"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Quotes processed per strategy")
+    return parser.parse_args()
+
+
+def _create_workbook(path: Path, rows: int) -> None:
+    wb = Workbook()
+    ws_input = wb.active
+    ws_input.title = "INPUT_QUOTE"
+    ws_input["A2"] = "Q-BENCH-001"
+    ws_input["C2"] = "MACHINING"
+    ws_input["D2"] = "Bench Customer"
+    ws_input["G2"] = "PN-BENCH-001"
+
+    ws_calc = wb.create_sheet("CALC_OUTPUTS")
+    for column, value in zip("BCDEF", [100.0, 150.0, 0.5, 2.0, 50]):
+        ws_calc[f"{column}2"] = value
+
+    ws_quote = wb.create_sheet("QUOTE_OUTPUT")
+    ws_quote["C2"] = "TRUE"
+
+    ws_costing = wb.create_sheet("COSTING")
+    for row in range(1, rows + 1):
+        ws_costing.append([row, row * 1.5, f"=A{row}*B{row}", f"=C{row}+CALC_OUTPUTS!B2"])
+
+    wb.save(path)
+    wb.close()
+
+
+def _time_per_quote(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def main() -> int:
+    args = parse_args()
+    validator = WorkbookFormulaValidator()
+    builder = QuotePayloadBuilder()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workbook_path = Path(args.workbook).expanduser().resolve() if args.workbook else None
+        if workbook_path is None:
+            workbook_path = Path(tmp) / "bench_workbook.xlsx"
+            _create_workbook(workbook_path, args.rows)
+
+        def open_twice() -> None:
+            validator.validate(workbook_path)
+            builder.build_from_workbook(workbook_path)
+
+        def open_once() -> None:
+            snapshot = WorkbookSnapshot.load(workbook_path)
+            validator.validate_snapshot(snapshot)
+            builder.build_from_snapshot(snapshot)
+
+        twice = _time_per_quote(open_twice, args.repeat)
+        once = _time_per_quote(open_once, args.repeat)
+
+    result = {
+        "workbook": (
+            str(workbook_path) if args.workbook else f"generated ({args.rows} formula rows)"
+        ),
+        "repeat": args.repeat,
+        "open_twice_ms_per_quote": round(twice * 1000, 2),
+        "snapshot_ms_per_quote": round(once * 1000, 2),
+        "saved_ms_per_quote": round((twice - once) * 1000, 2),
+        "speedup": round(twice / once, 2) if once else None,
+    }
+    print(json.dumps(result, indent=2, ensure_ascii=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import sys
+
+from dotenv import load_dotenv
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = REPO_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from staff_quoter.config import get_settings
+from staff_quoter.pipeline import QuoteLedger
+
+
+def parse_args() -> argparse.Namespace:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Look up quotes in the JSONL quote ledger")
+    parser.add_argument(
+        "--ledger-dir",
+        default=str(settings.output_json_dir),
+        help="Ledger directory (defaults to OUTPUT_JSON_DIR)",
+    )
+    parser.add_argument("--quote-id", default="", help="Print a single quote")
+    parser.add_argument("--customer", default=None, help="Filter by customer name")
+    parser.add_argument("--part-number", default=None, help="Filter by part number")
+    return parser.parse_args()
+
+
+def main() -> int:
+    load_dotenv()
+    args = parse_args()
+    ledger_dir = Path(args.ledger_dir).expanduser().resolve()
+    if not ledger_dir.exists():
+        raise FileNotFoundError(f"Ledger directory not found: {ledger_dir}")
+
+    ledger = QuoteLedger.load(ledger_dir)
+    if args.quote_id:
+        quote = ledger.get(args.quote_id)
+        if quote is None:
+            raise KeyError(f"Quote not found in ledger: {args.quote_id}")
+        print(json.dumps(quote, indent=2, ensure_ascii=True))
+        return 0
+
+    if args.customer is None and args.part_number is None:
+        quotes = ledger.scan()
+    else:
+        quotes = iter(ledger.find(customer_name=args.customer, part_number=args.part_number))
+    for quote in quotes:
+        print(json.dumps(quote, ensure_ascii=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
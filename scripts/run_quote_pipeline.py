@@ -2,9 +2,13 @@
 from __future__ import annotations
 
 import argparse
+from dataclasses import replace
 import json
+import os
 from pathlib import Path
 import sys
+import time
+from typing import Any, cast
 
 from dotenv import load_dotenv
 
@@ -14,7 +18,8 @@ if str(SRC_ROOT) not in sys.path:
     sys.path.insert(0, str(SRC_ROOT))
 
 from staff_quoter.config import get_settings
-from staff_quoter.pipeline import QuotePipeline
+from staff_quoter.pipeline import BatchSummary, PipelineResult, QuotePipeline
+from staff_quoter.pipeline.profiling import to_prometheus
 
 
 def parse_args() -> argparse.Namespace:
@@ -25,11 +30,55 @@ def parse_args() -> argparse.Namespace:
         default=str(settings.default_workbook),
         help="Path to workbook (.xlsx)",
     )
+    parser.add_argument(
+        "--multi-quote",
+        action="store_true",
+        help="Emit one quote per data row of INPUT_QUOTE/CALC_OUTPUTS",
+    )
+    parser.add_argument(
+        "--workbook-dir",
+        default="",
+        help="Directory of workbooks (.xlsx) to quote in batch mode",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for batch mode (0 = one per CPU)",
+    )
     parser.add_argument(
         "--run-recalc",
         action="store_true",
         help="Run LibreOffice recalc script before validation",
     )
+    parser.add_argument(
+        "--recalc",
+        choices=["libreoffice", "native"],
+        default=None,
+        help="Recalc mode: external LibreOffice script or in-process native evaluator",
+    )
+    parser.add_argument(
+        "--recalc-workers",
+        type=int,
+        default=0,
+        help="Keep N warm recalc worker processes instead of one subprocess per workbook",
+    )
+    parser.add_argument(
+        "--json-mode",
+        choices=["ledger", "files"],
+        default=None,
+        help="Quote JSON output: indexed JSONL ledger (default) or one <quote_id>.json per quote",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Record per-stage wall/CPU time and peak memory; print a summary to stderr",
+    )
+    parser.add_argument(
+        "--profile-output",
+        default="",
+        help="Write stage metrics to this file (.prom/.txt = Prometheus text, otherwise JSON)",
+    )
     parser.add_argument(
         "--allow-formula-issues",
         action="store_true",
@@ -44,17 +93,103 @@ def main() -> int:
     workbook_path = Path(args.workbook).expanduser().resolve()
 
     settings = get_settings()
-    pipeline = QuotePipeline(settings)
+    if args.json_mode:
+        settings = replace(settings, output_json_mode=args.json_mode)
+    profile = args.profile or bool(args.profile_output)
+    pipeline = QuotePipeline(settings, recalc_workers=args.recalc_workers, profile=profile)
+
+    try:
+        if args.workbook_dir:
+            return _run_batch(pipeline, args)
+        if args.multi_quote:
+            return _run_many(pipeline, args, workbook_path)
+        return _run_single(pipeline, args, workbook_path)
+    finally:
+        pipeline.close()
+
 
+def _run_single(pipeline: QuotePipeline, args: argparse.Namespace, workbook_path: Path) -> int:
     result = pipeline.run(
         workbook_path=workbook_path,
         fail_on_formula_issues=not args.allow_formula_issues,
         run_recalc=args.run_recalc,
+        recalc=args.recalc,
     )
 
     print(json.dumps(result.__dict__, indent=2, ensure_ascii=True))
+    _report_profile(args, [result])
     return 0
 
 
+def _run_many(pipeline: QuotePipeline, args: argparse.Namespace, workbook_path: Path) -> int:
+    results = pipeline.run_many(
+        workbook_path=workbook_path,
+        fail_on_formula_issues=not args.allow_formula_issues,
+        run_recalc=args.run_recalc,
+        recalc=args.recalc,
+    )
+
+    print(json.dumps([result.__dict__ for result in results], indent=2, ensure_ascii=True))
+    _report_profile(args, results)
+    return 0
+
+
+def _run_batch(pipeline: QuotePipeline, args: argparse.Namespace) -> int:
+    workbook_dir = Path(args.workbook_dir).expanduser().resolve()
+    if not workbook_dir.exists():
+        raise FileNotFoundError(f"Workbook directory not found: {workbook_dir}")
+
+    workbook_paths = sorted(p for p in workbook_dir.glob("*.xlsx") if not p.name.startswith("~$"))
+    workers = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    summary = BatchSummary()
+    results: list[PipelineResult] = []
+    started = time.perf_counter()
+    for item in pipeline.run_batch(
+        workbook_paths,
+        workers=workers,
+        fail_on_formula_issues=not args.allow_formula_issues,
+        run_recalc=args.run_recalc,
+        recalc=args.recalc,
+    ):
+        summary.add(item)
+        if item.result is not None:
+            results.append(item.result)
+        print(json.dumps(item.to_dict(), ensure_ascii=True), flush=True)
+    summary.elapsed_seconds = time.perf_counter() - started
+
+    print(json.dumps({"summary": summary.to_dict()}, indent=2, ensure_ascii=True))
+    _report_profile(args, results)
+    return 1 if summary.failed else 0
+
+
+def _report_profile(args: argparse.Namespace, results: list[PipelineResult]) -> None:
+    profiles = [result.profile for result in results if result.profile is not None]
+    if not profiles:
+        return
+
+    totals: dict[str, list[float]] = {}
+    for profile in profiles:
+        for span in cast("list[dict[str, Any]]", profile["stages"]):
+            stage = totals.setdefault(span["stage"], [0.0, 0.0, 0])
+            stage[0] += span["wall_seconds"]
+            stage[1] += span["cpu_seconds"]
+            if span["peak_memory_bytes"] is not None:
+                stage[2] = max(stage[2], span["peak_memory_bytes"])
+    print(f"{'stage':<12} {'wall_s':>10} {'cpu_s':>10} {'peak_kib':>10}", file=sys.stderr)
+    for name, (wall, cpu, peak) in totals.items():
+        print(f"{name:<12} {wall:>10.4f} {cpu:>10.4f} {peak / 1024:>10.1f}", file=sys.stderr)
+
+    if args.profile_output:
+        output_path = Path(args.profile_output).expanduser()
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        if output_path.suffix in {".prom", ".txt"}:
+            output_path.write_text(to_prometheus(profiles), encoding="utf-8")
+        else:
+            output_path.write_text(
+                json.dumps(profiles, indent=2, ensure_ascii=True), encoding="utf-8"
+            )
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import replace
+import json
+from pathlib import Path
+import signal
+import sys
+
+from dotenv import load_dotenv
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = REPO_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from staff_quoter.config import get_settings
+from staff_quoter.pipeline.service import DEFAULT_MAX_BODY_BYTES, QuoteService
+
+
+def parse_args() -> argparse.Namespace:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Serve POST /quote over HTTP on localhost")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind")
+    parser.add_argument("--port", type=int, default=8080, help="Port to bind (0 = any free port)")
+    parser.add_argument("--workers", type=int, default=2, help="Warm quote worker processes")
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=16,
+        help="Quotes running or waiting before new requests get 503",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=30.0, help="Seconds per quote before answering 504"
+    )
+    parser.add_argument(
+        "--max-body-bytes",
+        type=int,
+        default=DEFAULT_MAX_BODY_BYTES,
+        help="Largest accepted request body",
+    )
+    parser.add_argument(
+        "--template",
+        default=str(settings.default_workbook),
+        help="Workbook that JSON input_quote requests are written into",
+    )
+    parser.add_argument(
+        "--recalc",
+        choices=["libreoffice", "native"],
+        default=None,
+        help="Recalc mode for uploaded workbooks (input_quote requests always recalc)",
+    )
+    parser.add_argument(
+        "--json-mode",
+        choices=["ledger", "files"],
+        default=None,
+        help="Quote JSON output: indexed JSONL ledger (default) or one <quote_id>.json per quote",
+    )
+    parser.add_argument(
+        "--allow-formula-issues",
+        action="store_true",
+        help="Do not fail a quote when formula issues are found",
+    )
+    return parser.parse_args()
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    settings = get_settings()
+    if args.json_mode:
+        settings = replace(settings, output_json_mode=args.json_mode)
+    service = QuoteService(
+        settings,
+        workers=args.workers,
+        max_queue=args.max_queue,
+        request_timeout=args.timeout,
+        max_body_bytes=args.max_body_bytes,
+        recalc=args.recalc,
+        fail_on_formula_issues=not args.allow_formula_issues,
+        template=Path(args.template).expanduser().resolve(),
+    )
+    host, port = await service.start(args.host, args.port)
+    print(json.dumps({"listening": f"http://{host}:{port}"}), file=sys.stderr, flush=True)
+
+    serving = asyncio.ensure_future(service.serve_forever())
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, serving.cancel)
+    try:
+        await serving
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await service.close()
+
+
+def main() -> int:
+    load_dotenv()
+    asyncio.run(_serve(parse_args()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
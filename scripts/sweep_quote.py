@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import re
+import sys
+import time
+
+from dotenv import load_dotenv
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = REPO_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from staff_quoter.config import get_settings
+from staff_quoter.pipeline import WorkbookSnapshot
+from staff_quoter.pipeline.sweep import QuoteSweep, scenario_grid
+
+_RANGE_PATTERN = re.compile(r"^(-?[\d.]+):(-?[\d.]+)(?::(-?[\d.]+))?$")
+
+
+def parse_args() -> argparse.Namespace:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(
+        description="Evaluate a quote workbook over a grid of input overrides and write a CSV"
+    )
+    parser.add_argument(
+        "--workbook",
+        default=str(settings.default_workbook),
+        help="Path to workbook (.xlsx)",
+    )
+    parser.add_argument(
+        "--set",
+        dest="overrides",
+        action="append",
+        default=[],
+        metavar="SHEET!CELL=VALUES",
+        help="Input axis, e.g. INPUT_QUOTE!H2=10,50,100 or INPUT_QUOTE!H2=1:1000:1 (repeatable)",
+    )
+    parser.add_argument("--output", required=True, help="CSV file to write")
+    return parser.parse_args()
+
+
+def _parse_override(text: str) -> tuple[tuple[str, str], list[object]]:
+    target, sep, raw_values = text.partition("=")
+    sheet, bang, cell = target.rpartition("!")
+    if not sep or not bang or not sheet or not cell:
+        raise ValueError(f"Expected SHEET!CELL=VALUES, got: {text}")
+    return (sheet.strip("'"), cell.upper()), _parse_values(raw_values)
+
+
+def _parse_values(text: str) -> list[object]:
+    match = _RANGE_PATTERN.match(text.strip())
+    if match:
+        start, stop = float(match.group(1)), float(match.group(2))
+        step = float(match.group(3) or 1)
+        if step <= 0:
+            raise ValueError(f"Range step must be positive: {text}")
+        count = int((stop - start) / step + 1e-9) + 1
+        return [_number(start + idx * step) for idx in range(count)]
+    return [_scalar(part.strip()) for part in text.split(",")]
+
+
+def _scalar(text: str) -> object:
+    if text.upper() in ("TRUE", "FALSE"):
+        return text.upper() == "TRUE"
+    try:
+        return _number(float(text))
+    except ValueError:
+        return text
+
+
+def _number(value: float) -> float | int:
+    return int(value) if value.is_integer() else value
+
+
+def main() -> int:
+    load_dotenv()
+    args = parse_args()
+    workbook_path = Path(args.workbook).expanduser().resolve()
+    if not workbook_path.exists():
+        raise FileNotFoundError(f"Workbook not found: {workbook_path}")
+    if not args.overrides:
+        raise ValueError("At least one --set SHEET!CELL=VALUES axis is required")
+
+    axes = dict(_parse_override(text) for text in args.overrides)
+    started = time.perf_counter()
+    sweep = QuoteSweep(WorkbookSnapshot.load(workbook_path))
+    table = sweep.run(scenario_grid(axes))
+    elapsed = time.perf_counter() - started
+
+    output_path = Path(args.output).expanduser().resolve()
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    table.to_csv(output_path, index=False)
+
+    summary = {
+        "workbook_path": str(workbook_path),
+        "output_path": str(output_path),
+        "scenarios": len(table),
+        "elapsed_seconds": round(elapsed, 4),
+        "unsupported_functions": sorted(sweep.unsupported_functions),
+    }
+    print(json.dumps(summary, indent=2, ensure_ascii=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
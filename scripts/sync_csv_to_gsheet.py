@@ -4,6 +4,7 @@ from __future__ import annotations
 import argparse
 import csv
 from pathlib import Path
+from typing import Iterator
 import sys
 
 from dotenv import load_dotenv
@@ -14,7 +15,7 @@ if str(SRC_ROOT) not in sys.path:
     sys.path.insert(0, str(SRC_ROOT))
 
 from staff_quoter.config import get_settings
-from staff_quoter.google_sheets import GoogleSheetsGateway
+from staff_quoter.google_sheets import GoogleSheetsGateway, SyncStateStore
 
 
 def parse_args() -> argparse.Namespace:
@@ -30,12 +31,59 @@ def parse_args() -> argparse.Namespace:
         default=[],
         help="Specific tabs to sync (defaults to all CSV files found)",
     )
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="Send only rows changed since the last sync (full rewrite on header change)",
+    )
+    parser.add_argument(
+        "--state-file",
+        default=str(REPO_ROOT / "output" / "gsheet_sync_state.json"),
+        help="Local snapshot of row hashes used by --diff",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="With --diff, rewrite every tab and refresh the local snapshot",
+    )
+    parser.add_argument(
+        "--typed",
+        action="store_true",
+        help="Infer number/bool/date columns and upload typed values with RAW input",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Upload each CSV in fixed-size row chunks with constant memory (large tabs)",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=5000,
+        help="Rows per upload chunk with --stream",
+    )
+    parser.add_argument(
+        "--requests-per-minute",
+        type=float,
+        default=60.0,
+        help="Client-side Sheets API request budget (token bucket shared by all workers)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Pooled HTTP connections / worker threads for independent tab operations",
+    )
     return parser.parse_args()
 
 
 def main() -> int:
     load_dotenv()
     args = parse_args()
+    if args.stream and args.diff:
+        raise ValueError("--stream and --diff cannot be combined")
+    if args.stream and args.typed:
+        raise ValueError("--stream and --typed cannot be combined")
     settings = get_settings()
 
     if not settings.google_sheets_id:
@@ -46,6 +94,8 @@ def main() -> int:
     gateway = GoogleSheetsGateway(
         spreadsheet_id=settings.google_sheets_id,
         credentials_file=settings.google_credentials_file,
+        requests_per_minute=args.requests_per_minute,
+        max_workers=args.workers,
     )
 
     csv_dir = Path(args.csv_dir).expanduser().resolve()
@@ -57,13 +107,37 @@ def main() -> int:
         wanted = set(args.tabs)
         csv_files = [p for p in csv_files if p.stem in wanted]
 
-    synced = 0
-    for csv_file in csv_files:
-        rows = _read_csv_dicts(csv_file)
-        tab_name = csv_file.stem
-        gateway.write_records(tab_name, rows, clear_first=True)
-        print(f"synced tab={tab_name} rows={len(rows)} source={csv_file}")
-        synced += 1
+    if args.stream:
+        for csv_file in csv_files:
+            header, rows = _iter_csv_rows(csv_file)
+            written = gateway.write_stream(
+                csv_file.stem,
+                header,
+                rows,
+                row_count=_count_csv_rows(csv_file),
+                chunk_rows=args.chunk_rows,
+            )
+            print(f"synced tab={csv_file.stem} rows={written} source={csv_file} mode=stream")
+        print(f"done. synced_tabs={len(csv_files)}")
+        return 0
+
+    tabs = {csv_file.stem: _read_csv_dicts(csv_file) for csv_file in csv_files}
+    if args.diff:
+        store = SyncStateStore(Path(args.state_file).expanduser())
+        results = gateway.write_diff(tabs, store, force_full=args.full)
+        for csv_file in csv_files:
+            result = results[csv_file.stem]
+            print(
+                f"synced tab={result.tab} mode={result.mode} rows={result.rows} "
+                f"changed={result.changed_rows} cleared={result.cleared_rows} source={csv_file}"
+            )
+        synced = len(results)
+    else:
+        written_by_tab = gateway.write_many(tabs, clear_first=True, typed=args.typed)
+        for csv_file in csv_files:
+            row_count = written_by_tab[csv_file.stem]
+            print(f"synced tab={csv_file.stem} rows={row_count} source={csv_file}")
+        synced = len(written_by_tab)
 
     print(f"done. synced_tabs={synced}")
     return 0
@@ -75,5 +149,23 @@ def _read_csv_dicts(path: Path) -> list[dict[str, str]]:
         return list(reader)
 
 
+def _count_csv_rows(path: Path) -> int:
+    # Parse rather than count lines: quoted fields may contain newlines.
+    with path.open("r", encoding="utf-8-sig", newline="") as fh:
+        return max(0, sum(1 for _row in csv.reader(fh)) - 1)
+
+
+def _iter_csv_rows(path: Path) -> tuple[list[str], Iterator[list[str]]]:
+    fh = path.open("r", encoding="utf-8-sig", newline="")
+    reader = csv.reader(fh)
+    header = next(reader, [])
+
+    def rows() -> Iterator[list[str]]:
+        with fh:
+            yield from reader
+
+    return header, rows()
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+from dataclasses import replace
+import json
+from pathlib import Path
+import signal
+import sys
+
+from dotenv import load_dotenv
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = REPO_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from staff_quoter.config import get_settings
+from staff_quoter.pipeline import BatchItemResult
+from staff_quoter.pipeline.watcher import WATCH_BACKENDS, QuoteInboxDaemon
+
+
+def parse_args() -> argparse.Namespace:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(
+        description="Keep the quote pipeline warm and quote every workbook dropped into an inbox"
+    )
+    parser.add_argument(
+        "--inbox",
+        default=str(settings.workspace_root / "inbox"),
+        help="Directory to watch for workbooks (.xlsx)",
+    )
+    parser.add_argument("--done-dir", default="", help="Where quoted workbooks go (inbox/done)")
+    parser.add_argument(
+        "--failed-dir",
+        default="",
+        help="Where failed workbooks go, with a .error.txt (inbox/failed)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Warm worker processes (1 = quote in this process)",
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=4,
+        help="Workbooks in progress at once; the rest of a backlog waits in the inbox",
+    )
+    parser.add_argument(
+        "--watch",
+        choices=WATCH_BACKENDS,
+        default="auto",
+        help="inotify (Linux) or directory polling; auto picks inotify when available",
+    )
+    parser.add_argument(
+        "--poll-interval", type=float, default=1.0, help="Seconds between inbox rescans"
+    )
+    parser.add_argument(
+        "--settle-seconds",
+        type=float,
+        default=0.5,
+        help="Polled files are taken once unmodified this long",
+    )
+    parser.add_argument(
+        "--recalc",
+        choices=["libreoffice", "native"],
+        default=None,
+        help="Recalc mode: external LibreOffice script or in-process native evaluator",
+    )
+    parser.add_argument(
+        "--recalc-workers",
+        type=int,
+        default=0,
+        help="Keep N warm recalc worker processes instead of one subprocess per workbook",
+    )
+    parser.add_argument(
+        "--json-mode",
+        choices=["ledger", "files"],
+        default=None,
+        help="Quote JSON output: indexed JSONL ledger (default) or one <quote_id>.json per quote",
+    )
+    parser.add_argument(
+        "--allow-formula-issues",
+        action="store_true",
+        help="Do not fail a workbook when formula issues are found",
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Quote the current inbox backlog and exit instead of watching",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    load_dotenv()
+    args = parse_args()
+    settings = get_settings()
+    if args.json_mode:
+        settings = replace(settings, output_json_mode=args.json_mode)
+
+    daemon = QuoteInboxDaemon(
+        settings,
+        Path(args.inbox).expanduser().resolve(),
+        done_dir=Path(args.done_dir).expanduser().resolve() if args.done_dir else None,
+        failed_dir=Path(args.failed_dir).expanduser().resolve() if args.failed_dir else None,
+        workers=args.jobs,
+        max_in_flight=args.max_in_flight,
+        poll_interval=args.poll_interval,
+        settle_seconds=args.settle_seconds,
+        watch=args.watch,
+        fail_on_formula_issues=not args.allow_formula_issues,
+        recalc=args.recalc,
+        recalc_workers=args.recalc_workers,
+    )
+    try:
+        if args.once:
+            daemon.run_once(_print_item)
+            return 0
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: daemon.stop())
+        print(
+            json.dumps({"watching": args.inbox, "backend": daemon.backend}, ensure_ascii=True),
+            file=sys.stderr,
+            flush=True,
+        )
+        daemon.serve_forever(_print_item)
+        return 0
+    finally:
+        daemon.close()
+
+
+def _print_item(item: BatchItemResult) -> None:
+    print(json.dumps(item.to_dict(), ensure_ascii=True), flush=True)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -14,7 +14,10 @@ class Settings:
     default_workbook: Path
     output_json_dir: Path
     output_pdf_dir: Path
-
+    # "ledger" appends quotes to an indexed JSONL ledger; "files" writes <quote_id>.json.
+    output_json_mode: str = "ledger"
+    # SQLite quote history; None disables it.
+    quote_history_db: Path | None = None
 
 
 def _env_path(name: str, default: Path) -> Path:
@@ -22,6 +25,13 @@ def _env_path(name: str, default: Path) -> Path:
     return Path(value).expanduser() if value else default
 
 
+def _env_optional_path(name: str, default: Path) -> Path | None:
+    # Unset means the default; set but empty means "off".
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return Path(value).expanduser() if value else None
+
 
 def get_settings() -> Settings:
     repo_root = Path(__file__).resolve().parents[2]
@@ -40,4 +50,8 @@ def get_settings() -> Settings:
         ),
         output_json_dir=_env_path("OUTPUT_JSON_DIR", repo_root / "output" / "json"),
         output_pdf_dir=_env_path("OUTPUT_PDF_DIR", repo_root / "output" / "pdf"),
+        output_json_mode=os.getenv("OUTPUT_JSON_MODE", "ledger"),
+        quote_history_db=_env_optional_path(
+            "QUOTE_HISTORY_DB", repo_root / "output" / "quote_history.sqlite3"
+        ),
     )
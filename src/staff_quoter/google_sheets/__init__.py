@@ -1,3 +1,14 @@
+from .cache import ReadCache
 from .client import GoogleSheetsGateway
+from .sync_state import SyncStateStore, TabSyncResult
+from .transport import RateLimitedHTTPClient, RetryPolicy, TokenBucket
 
-__all__ = ["GoogleSheetsGateway"]
+__all__ = [
+    "GoogleSheetsGateway",
+    "RateLimitedHTTPClient",
+    "ReadCache",
+    "RetryPolicy",
+    "SyncStateStore",
+    "TabSyncResult",
+    "TokenBucket",
+]
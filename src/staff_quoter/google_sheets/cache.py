@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable, Mapping
+import copy
+import threading
+import time
+
+from gspread import Worksheet
+
+
+class ReadCache:
+    """Read-through cache for worksheet handles and tab values.
+
+    Entries expire after ``ttl_seconds`` (``None`` keeps them until the revision
+    changes) and values are bounded by an LRU of ``max_entries``. Callers always
+    receive copies, so mutating a result never corrupts the cache.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float | None = 300.0,
+        max_entries: int = 128,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._values: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._worksheets: tuple[float, dict[str, Worksheet]] | None = None
+        self._revision: str | None = None
+
+    @property
+    def revision(self) -> str | None:
+        return self._revision
+
+    def sync_revision(self, revision: str) -> bool:
+        """Record the spreadsheet revision; drop everything when it changed since last time.
+
+        The first revision also drops whatever was cached before it, since that
+        may predate it.
+        """
+        with self._lock:
+            if self._revision is None:
+                # Entries cached before any revision was seen cannot be dated, so they go too.
+                changed = bool(self._values) or self._worksheets is not None
+            else:
+                changed = revision != self._revision
+            if changed:
+                self.clear()
+            self._revision = revision
+            return changed
+
+    def worksheets(self) -> dict[str, Worksheet] | None:
+        with self._lock:
+            if self._worksheets is None or self._expired(self._worksheets[0]):
+                self._worksheets = None
+                return None
+            return dict(self._worksheets[1])
+
+    def put_worksheets(self, worksheets: Mapping[str, Worksheet]) -> None:
+        with self._lock:
+            self._worksheets = (self._clock(), dict(worksheets))
+
+    def get_or_load(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is not None and not self._expired(entry[0]):
+                self._values.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+            self.misses += 1
+        # Load outside the lock so concurrent reads of different tabs overlap.
+        value = load()
+        with self._lock:
+            self._values[key] = (self._clock(), value)
+            self._values.move_to_end(key)
+            while len(self._values) > self.max_entries:
+                self._values.popitem(last=False)
+        return copy.deepcopy(value)
+
+    def invalidate_tabs(self, tabs: Iterable[str]) -> None:
+        """Drop cached values of ``tabs``; keys are tuples whose second item is the tab."""
+        targets = set(tabs)
+        with self._lock:
+            for key in [key for key in self._values if _key_tab(key) in targets]:
+                del self._values[key]
+
+    def invalidate_worksheets(self) -> None:
+        with self._lock:
+            self._worksheets = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+            self._worksheets = None
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl_seconds is not None and self._clock() - stored_at >= self.ttl_seconds
+
+
+def _key_tab(key: Hashable) -> Any:
+    return key[1] if isinstance(key, tuple) and len(key) > 1 else None
@@ -1,23 +1,42 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Mapping, Sequence
+from typing import Any, Callable, Iterable, Iterator, Mapping, Sequence, TypeVar
+import json
 
 import gspread
 from gspread import Spreadsheet, Worksheet
+from gspread.exceptions import WorksheetNotFound
+from gspread.utils import absolute_range_name, rowcol_to_a1
+
+from .cache import ReadCache
+from .columnar import DATE_FORMATS, typed_table
+from .sync_state import SyncStateStore, TabSyncResult, TabSyncState, row_hash
+from .transport import DEFAULT_REQUESTS_PER_MINUTE, RateLimitedHTTPClient, RetryPolicy, TokenBucket
 
 DEFAULT_SCOPES = [
     "https://www.googleapis.com/auth/spreadsheets",
     "https://www.googleapis.com/auth/drive",
 ]
 
+_T = TypeVar("_T")
+
 
 class GoogleSheetsGateway:
+    # Sheets API recommends keeping request payloads under ~2 MB.
+    MAX_REQUEST_BYTES = 2_000_000
+
     def __init__(
         self,
         spreadsheet_id: str,
         credentials_file: str,
         scopes: Sequence[str] | None = None,
+        requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+        max_workers: int = 4,
+        retry: RetryPolicy | None = None,
+        cache: ReadCache | None = None,
     ) -> None:
         if not spreadsheet_id:
             raise ValueError("spreadsheet_id is required")
@@ -31,44 +50,501 @@ class GoogleSheetsGateway:
         self._spreadsheet_id = spreadsheet_id
         self._credentials_file = str(credentials_path)
         self._scopes = list(scopes or DEFAULT_SCOPES)
-        self._client = gspread.service_account(filename=self._credentials_file, scopes=self._scopes)
-        self._spreadsheet: Spreadsheet = self._client.open_by_key(self._spreadsheet_id)
+        self._max_workers = max(1, max_workers)
+        self._cache = cache if cache is not None else ReadCache()
+        # One pooled session and one token bucket shared by every worker thread.
+        http_client = RateLimitedHTTPClient.with_options(
+            limiter=TokenBucket(requests_per_minute),
+            retry=retry,
+            pool_size=self._max_workers,
+        )
+        client = gspread.service_account(
+            filename=self._credentials_file, scopes=self._scopes, http_client=http_client
+        )
+        # None for gateways wrapping a spreadsheet opened elsewhere (from_spreadsheet).
+        self._client: gspread.Client | None = client
+        self._spreadsheet: Spreadsheet = client.open_by_key(self._spreadsheet_id)
+
+    @classmethod
+    def from_spreadsheet(
+        cls, spreadsheet: Spreadsheet, max_workers: int = 1, cache: ReadCache | None = None
+    ) -> GoogleSheetsGateway:
+        """Wrap an already opened spreadsheet (or a stand-in with the same API)."""
+        gateway = cls.__new__(cls)
+        gateway._spreadsheet_id = spreadsheet.id
+        gateway._credentials_file = ""
+        gateway._scopes = list(DEFAULT_SCOPES)
+        gateway._max_workers = max(1, max_workers)
+        gateway._cache = cache if cache is not None else ReadCache()
+        gateway._client = None
+        gateway._spreadsheet = spreadsheet
+        return gateway
+
+    @classmethod
+    def from_client(
+        cls,
+        client: gspread.Client,
+        spreadsheet_id: str,
+        max_workers: int = 4,
+        cache: ReadCache | None = None,
+    ) -> GoogleSheetsGateway:
+        """Open ``spreadsheet_id`` through an existing gspread client."""
+        spreadsheet = client.open_by_key(spreadsheet_id)
+        gateway = cls.from_spreadsheet(spreadsheet, max_workers=max_workers, cache=cache)
+        gateway._client = client
+        return gateway
+
+    @property
+    def cache(self) -> ReadCache:
+        return self._cache
+
+    @contextmanager
+    def read_batch(self) -> Iterator[GoogleSheetsGateway]:
+        """Check the spreadsheet revision once, then serve repeated reads from the cache.
+
+        Cached handles and values are dropped when the spreadsheet was modified
+        since the previous batch; inside the block only the TTL applies.
+        """
+        self._cache.sync_revision(self._spreadsheet.get_lastUpdateTime())
+        yield self
 
     def worksheet(self, tab_name: str) -> Worksheet:
-        return self._spreadsheet.worksheet(tab_name)
+        worksheets = self._cached_worksheets()
+        if tab_name not in worksheets:
+            raise WorksheetNotFound(tab_name)
+        return worksheets[tab_name]
 
     def list_tabs(self) -> list[str]:
-        return [ws.title for ws in self._spreadsheet.worksheets()]
+        return list(self._cached_worksheets())
 
     def read_records(self, tab_name: str) -> list[dict[str, Any]]:
-        ws = self.worksheet(tab_name)
-        return ws.get_all_records(default_blank="")
+        return self._cache.get_or_load(
+            ("records", tab_name),
+            lambda: self.worksheet(tab_name).get_all_records(default_blank=""),
+        )
 
     def read_values(self, tab_name: str, range_a1: str | None = None) -> list[list[Any]]:
-        ws = self.worksheet(tab_name)
-        if range_a1:
-            return ws.get(range_a1)
-        return ws.get_all_values()
+        def load() -> list[list[Any]]:
+            ws = self.worksheet(tab_name)
+            if range_a1:
+                return ws.get(range_a1)
+            return ws.get_all_values()
+
+        return self._cache.get_or_load(("values", tab_name, range_a1 or ""), load)
+
+    def read_many(
+        self, tab_names: Sequence[str], max_workers: int | None = None
+    ) -> dict[str, list[list[Any]]]:
+        """Read the values of several tabs concurrently; cached tabs come from memory."""
+        self._cached_worksheets()
+        values = self._map(self.read_values, tab_names, max_workers)
+        return dict(zip(tab_names, values))
 
     def clear_tab(self, tab_name: str) -> None:
         self.worksheet(tab_name).clear()
+        self._cache.invalidate_tabs([tab_name])
 
-    def write_records(self, tab_name: str, rows: Sequence[Mapping[str, Any]], clear_first: bool = True) -> int:
-        ws = self.worksheet(tab_name)
-        if clear_first:
-            ws.clear()
+    def write_records(
+        self,
+        tab_name: str,
+        rows: Sequence[Mapping[str, Any]],
+        clear_first: bool = True,
+        typed: bool = False,
+    ) -> int:
+        return self.write_many({tab_name: rows}, clear_first=clear_first, typed=typed)[tab_name]
+
+    def write_many(
+        self,
+        tabs: Mapping[str, Sequence[Mapping[str, Any]]],
+        clear_first: bool = True,
+        max_request_bytes: int | None = None,
+        typed: bool = False,
+    ) -> dict[str, int]:
+        """Write several tabs with one metadata read, one batch clear and batched value updates.
 
+        Tabs are grown first (one batch update) when the rows would not fit in
+        their grid. Value payloads larger than ``max_request_bytes`` are split
+        into several ``values:batchUpdate`` requests by row blocks.
+
+        With ``typed`` the records are converted column by column (numbers,
+        booleans, dates as serial numbers) and sent with RAW input, so Sheets
+        does not reparse every cell; date columns get a date number format.
+        """
+        worksheets = self._worksheets_for(tabs)
+        blocks = []
+        format_requests: list[dict[str, Any]] = []
+        for tab, rows in tabs.items():
+            if typed:
+                table = typed_table(rows)
+                values = table.values()
+                format_requests.extend(_date_format_requests(worksheets[tab], table.kinds))
+            else:
+                values = _records_to_values(rows)
+            if values:
+                blocks.append((tab, 1, values))
+        clear_ranges = [absolute_range_name(tab) for tab in tabs] if clear_first else []
+        self._send(
+            worksheets,
+            clear_ranges,
+            blocks,
+            max_request_bytes,
+            value_input_option="RAW" if typed else "USER_ENTERED",
+            extra_requests=format_requests,
+        )
+        self._cache.invalidate_tabs(tabs)
+        return {tab: len(rows) for tab, rows in tabs.items()}
+
+    def append_records(
+        self,
+        tab_name: str,
+        rows: Sequence[Mapping[str, Any]],
+        typed: bool = True,
+    ) -> int:
+        """Append rows below the existing data of ``tab_name`` without clearing it.
+
+        Values are aligned to the tab's header (row 1, read through the cache);
+        an empty tab gets the records' header first. Keys that are not in the
+        header raise ValueError.
+        """
         if not rows:
             return 0
+        worksheet = self.worksheet(tab_name)
+        existing = self.read_values(tab_name, "1:1")
+        header = [str(value) for value in existing[0]] if existing and existing[0] else []
+        keys = list(rows[0].keys())
+        unknown = [key for key in keys if header and key not in header]
+        if unknown:
+            raise ValueError(f"{tab_name}: columns not in sheet header: {', '.join(unknown)}")
+        columns = header or keys
+        aligned = [{column: row.get(column) for column in columns} for row in rows]
 
-        headers = list(rows[0].keys())
-        values = [headers]
-        for row in rows:
-            values.append([_normalize_value(row.get(header)) for header in headers])
+        if typed:
+            table = typed_table(aligned)
+            values = table.rows
+            if not header:
+                format_requests = _date_format_requests(worksheet, table.kinds)
+                if format_requests:
+                    self._spreadsheet.batch_update({"requests": format_requests})
+        else:
+            values = _records_to_values(aligned)[1:]
+        if not header:
+            values = [list(columns), *values]
 
-        ws.update(values, value_input_option="USER_ENTERED")
+        self._spreadsheet.values_append(
+            absolute_range_name(tab_name),
+            params={
+                "valueInputOption": "RAW" if typed else "USER_ENTERED",
+                "insertDataOption": "INSERT_ROWS",
+            },
+            body={"values": values},
+        )
+        self._cache.invalidate_tabs([tab_name])
+        # The header did not change: keep it cached so row-at-a-time logging costs one request.
+        self._cache.get_or_load(("values", tab_name, "1:1"), lambda: [list(columns)])
         return len(rows)
 
+    def write_stream(
+        self,
+        tab_name: str,
+        header: Sequence[str],
+        rows: Iterable[Sequence[Any]],
+        row_count: int,
+        chunk_rows: int = 5_000,
+        clear_first: bool = True,
+        max_request_bytes: int | None = None,
+    ) -> int:
+        """Upload ``rows`` under ``header`` holding at most ``chunk_rows`` rows in memory.
+
+        ``row_count`` (data rows, header excluded) sizes the grid with a single
+        resize before the first chunk; each chunk then goes to its own target
+        range. If the stream turns out longer or wider, the grid grows before
+        the chunk that needs it; if it is shorter and the tab was cleared, the
+        grid shrinks to the rows written. Returns the number of data rows written.
+        """
+        if chunk_rows < 1:
+            raise ValueError("chunk_rows must be at least 1")
+        if row_count < 0:
+            raise ValueError("row_count must be >= 0")
+        worksheet = self._worksheets_for([tab_name])[tab_name]
+        grid = (max(worksheet.row_count, row_count + 1), max(worksheet.col_count, len(header)))
+        resize = _grid_resize_request(worksheet, row_count + 1, len(header))
+        if resize is not None:
+            self._spreadsheet.batch_update({"requests": [resize]})
+            self._cache.invalidate_worksheets()
+        if clear_first:
+            self._spreadsheet.values_batch_clear(body={"ranges": [absolute_range_name(tab_name)]})
+        self._cache.invalidate_tabs([tab_name])
+
+        limit = max_request_bytes or self.MAX_REQUEST_BYTES
+        chunk: list[list[Any]] = [list(header)]
+        start_row = 1
+        written = 0
+        for row in rows:
+            chunk.append([_normalize_value(value) for value in row])
+            written += 1
+            if len(chunk) >= chunk_rows:
+                grid = self._fit_grid(worksheet, grid, start_row + len(chunk) - 1, chunk)
+                self._send_chunk(tab_name, start_row, chunk, limit)
+                start_row += len(chunk)
+                chunk = []
+        if chunk:
+            grid = self._fit_grid(worksheet, grid, start_row + len(chunk) - 1, chunk)
+            self._send_chunk(tab_name, start_row, chunk, limit)
+        if clear_first and grid[0] > written + 1:
+            self._spreadsheet.batch_update(
+                {"requests": [_grid_properties_request(worksheet, written + 1, grid[1])]}
+            )
+            self._cache.invalidate_worksheets()
+        return written
+
+    def write_diff(
+        self,
+        tabs: Mapping[str, Sequence[Mapping[str, Any]]],
+        store: SyncStateStore,
+        max_request_bytes: int | None = None,
+        force_full: bool = False,
+    ) -> dict[str, TabSyncResult]:
+        """Send only the rows that changed since the last sync recorded in ``store``.
+
+        A tab is cleared and rewritten only when it has no recorded state or its
+        header changed; otherwise changed rows go out as contiguous ranges and
+        rows that disappeared at the end are cleared. The store is updated and
+        saved once every request has succeeded.
+        """
+        worksheets = self._worksheets_for(tabs)
+        clear_ranges: list[str] = []
+        blocks: list[tuple[str, int, list[list[Any]]]] = []
+        results: dict[str, TabSyncResult] = {}
+        states: dict[str, TabSyncState] = {}
+
+        for tab, rows in tabs.items():
+            values = _records_to_values(rows)
+            state = TabSyncState(
+                header=[str(header) for header in values[0]] if values else [],
+                row_hashes=[row_hash(row) for row in values[1:]],
+            )
+            states[tab] = state
+            previous = None if force_full else store.get(self._spreadsheet_id, tab)
+
+            if previous is None or previous.header != state.header:
+                clear_ranges.append(absolute_range_name(tab))
+                if values:
+                    blocks.append((tab, 1, values))
+                results[tab] = TabSyncResult(tab, "full", len(rows), changed_rows=len(rows))
+                continue
+
+            changed = [
+                idx
+                for idx, digest in enumerate(state.row_hashes)
+                if idx >= len(previous.row_hashes) or previous.row_hashes[idx] != digest
+            ]
+            for first, last in _index_runs(changed):
+                # Row 1 holds the header, so data row ``idx`` lives on sheet row ``idx + 2``.
+                blocks.append((tab, first + 2, values[first + 1:last + 2]))
+            removed = max(0, len(previous.row_hashes) - len(state.row_hashes))
+            if removed:
+                first_row = len(state.row_hashes) + 2
+                last_row = len(previous.row_hashes) + 1
+                clear_ranges.append(absolute_range_name(tab, f"{first_row}:{last_row}"))
+            results[tab] = TabSyncResult(
+                tab,
+                "diff" if changed or removed else "unchanged",
+                len(rows),
+                changed_rows=len(changed),
+                cleared_rows=removed,
+            )
+
+        self._send(worksheets, clear_ranges, blocks, max_request_bytes)
+        self._cache.invalidate_tabs(tabs)
+        for tab, state in states.items():
+            store.put(self._spreadsheet_id, tab, state)
+        store.save()
+        return results
+
+    def _map(
+        self, function: Callable[[str], _T], tabs: Sequence[str], max_workers: int | None
+    ) -> list[_T]:
+        workers = min(max_workers or self._max_workers, len(tabs))
+        if workers <= 1:
+            return [function(tab) for tab in tabs]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gsheets") as pool:
+            return list(pool.map(function, tabs))
+
+    def _fit_grid(
+        self,
+        worksheet: Worksheet,
+        grid: tuple[int, int],
+        last_row: int,
+        rows: list[list[Any]],
+    ) -> tuple[int, int]:
+        """Grow the tracked ``(rows, cols)`` grid so ``rows`` ending at ``last_row`` fit."""
+        needed = (max(grid[0], last_row), max(grid[1], max(len(row) for row in rows)))
+        if needed != grid:
+            self._spreadsheet.batch_update(
+                {"requests": [_grid_properties_request(worksheet, *needed)]}
+            )
+            self._cache.invalidate_worksheets()
+        return needed
+
+    def _send_chunk(
+        self, tab_name: str, start_row: int, rows: list[list[Any]], max_request_bytes: int
+    ) -> None:
+        for data in _chunk_value_ranges([(tab_name, start_row, rows)], max_request_bytes):
+            self._spreadsheet.values_batch_update(
+                body={"valueInputOption": "USER_ENTERED", "data": data}
+            )
+
+    def _cached_worksheets(self) -> dict[str, Worksheet]:
+        worksheets = self._cache.worksheets()
+        if worksheets is None:
+            worksheets = {ws.title: ws for ws in self._spreadsheet.worksheets()}
+            self._cache.put_worksheets(worksheets)
+        return worksheets
+
+    def _worksheets_for(self, tabs: Iterable[str]) -> dict[str, Worksheet]:
+        # Writes size grids from fresh metadata; the refreshed handles also feed the cache.
+        worksheets = {ws.title: ws for ws in self._spreadsheet.worksheets()}
+        self._cache.put_worksheets(worksheets)
+        missing = [tab for tab in tabs if tab not in worksheets]
+        if missing:
+            raise WorksheetNotFound(", ".join(missing))
+        return worksheets
+
+    def _send(
+        self,
+        worksheets: Mapping[str, Worksheet],
+        clear_ranges: Sequence[str],
+        blocks: Sequence[tuple[str, int, list[list[Any]]]],
+        max_request_bytes: int | None,
+        value_input_option: str = "USER_ENTERED",
+        extra_requests: Sequence[Mapping[str, Any]] = (),
+    ) -> None:
+        extents: dict[str, tuple[int, int]] = {}
+        for tab, start_row, values in blocks:
+            rows, cols = extents.get(tab, (0, 0))
+            width = max((len(row) for row in values), default=0)
+            extents[tab] = (max(rows, start_row + len(values) - 1), max(cols, width))
+        resize_requests = [
+            request
+            for tab, (rows, cols) in extents.items()
+            if (request := _grid_resize_request(worksheets[tab], rows, cols)) is not None
+        ]
+        if resize_requests or extra_requests:
+            self._spreadsheet.batch_update({"requests": [*resize_requests, *extra_requests]})
+        if resize_requests:
+            self._cache.invalidate_worksheets()
+
+        if clear_ranges:
+            self._spreadsheet.values_batch_clear(body={"ranges": list(clear_ranges)})
+
+        limit = max_request_bytes or self.MAX_REQUEST_BYTES
+        for data in _chunk_value_ranges(blocks, limit):
+            self._spreadsheet.values_batch_update(
+                body={"valueInputOption": value_input_option, "data": data}
+            )
+
+
+def _records_to_values(rows: Sequence[Mapping[str, Any]]) -> list[list[Any]]:
+    if not rows:
+        return []
+    headers = list(rows[0].keys())
+    values: list[list[Any]] = [headers]
+    for row in rows:
+        values.append([_normalize_value(row.get(header)) for header in headers])
+    return values
+
+
+def _grid_resize_request(worksheet: Worksheet, rows: int, cols: int) -> dict[str, Any] | None:
+    if rows <= worksheet.row_count and cols <= worksheet.col_count:
+        return None
+    return _grid_properties_request(
+        worksheet, max(rows, worksheet.row_count), max(cols, worksheet.col_count)
+    )
+
+
+def _grid_properties_request(worksheet: Worksheet, rows: int, cols: int) -> dict[str, Any]:
+    return {
+        "updateSheetProperties": {
+            "properties": {
+                "sheetId": worksheet.id,
+                "gridProperties": {"rowCount": rows, "columnCount": cols},
+            },
+            "fields": "gridProperties.rowCount,gridProperties.columnCount",
+        }
+    }
+
+
+def _date_format_requests(worksheet: Worksheet, kinds: Sequence[str]) -> list[dict[str, Any]]:
+    return [
+        {
+            "repeatCell": {
+                "range": {
+                    "sheetId": worksheet.id,
+                    "startRowIndex": 1,
+                    "startColumnIndex": idx,
+                    "endColumnIndex": idx + 1,
+                },
+                "cell": {
+                    "userEnteredFormat": {
+                        "numberFormat": {
+                            "type": "DATE_TIME" if kind == "datetime" else "DATE",
+                            "pattern": DATE_FORMATS[kind],
+                        }
+                    }
+                },
+                "fields": "userEnteredFormat.numberFormat",
+            }
+        }
+        for idx, kind in enumerate(kinds)
+        if kind in DATE_FORMATS
+    ]
+
+
+def _chunk_value_ranges(
+    blocks: Iterable[tuple[str, int, list[list[Any]]]],
+    max_request_bytes: int,
+) -> Iterator[list[dict[str, Any]]]:
+    """Group ``(tab, start_row, rows)`` blocks into value-range lists that fit one request."""
+    data: list[dict[str, Any]] = []
+    request_bytes = 0
+    for tab, start_row, values in blocks:
+        block: list[list[Any]] = []
+        block_start = start_row
+        for row_index, row in enumerate(values, start=start_row):
+            row_bytes = len(json.dumps(row, ensure_ascii=False, default=str)) + 1
+            if block and request_bytes + row_bytes > max_request_bytes:
+                data.append(_value_range(tab, block_start, block))
+                yield data
+                data, request_bytes = [], 0
+                block, block_start = [], row_index
+            elif not block and data and request_bytes + row_bytes > max_request_bytes:
+                yield data
+                data, request_bytes = [], 0
+            block.append(row)
+            request_bytes += row_bytes
+        if block:
+            data.append(_value_range(tab, block_start, block))
+    if data:
+        yield data
+
+
+def _index_runs(indexes: Sequence[int]) -> Iterator[tuple[int, int]]:
+    """Collapse sorted indexes into inclusive ``(first, last)`` runs."""
+    run: tuple[int, int] | None = None
+    for index in indexes:
+        if run is not None and index == run[1] + 1:
+            run = (run[0], index)
+            continue
+        if run is not None:
+            yield run
+        run = (index, index)
+    if run is not None:
+        yield run
+
+
+def _value_range(tab: str, start_row: int, values: list[list[Any]]) -> dict[str, Any]:
+    return {"range": absolute_range_name(tab, rowcol_to_a1(start_row, 1)), "values": values}
+
 
 def _normalize_value(value: Any) -> Any:
     if value is None:
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Mapping, Sequence
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+# Sheets stores dates as days since 1899-12-30, like Excel.
+_SHEETS_EPOCH = pd.Timestamp("1899-12-30")
+_MAX_EXACT_INT = 2 ** 53
+_DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}$"
+_DATETIME_PATTERN = r"^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?$"
+# Leading zeros (SKUs, postal codes) must survive, so they keep the column as text.
+_LEADING_ZERO_PATTERN = r"^[+-]?0\d"
+
+DATE_FORMATS = {"date": "yyyy-mm-dd", "datetime": "yyyy-mm-dd hh:mm:ss"}
+
+
+@dataclass(frozen=True)
+class TypedTable:
+    header: list[str]
+    kinds: list[str]
+    rows: list[list[Any]]
+
+    def values(self) -> list[list[Any]]:
+        """Header plus typed data rows, ready for a RAW ``values`` payload."""
+        if not self.header:
+            return []
+        return [list(self.header), *self.rows]
+
+
+def typed_table(records: Sequence[Mapping[str, Any]] | pd.DataFrame) -> TypedTable:
+    """Convert records column by column, inferring number, bool, date, datetime or text."""
+    frame = records if isinstance(records, pd.DataFrame) else _records_frame(records)
+    if frame.empty and not len(frame.columns):
+        return TypedTable(header=[], kinds=[], rows=[])
+    header = [str(column) for column in frame.columns]
+    kinds: list[str] = []
+    columns: list[list[Any]] = []
+    for column in frame.columns:
+        kind, values = convert_column(frame[column])
+        kinds.append(kind)
+        columns.append(values)
+    rows = [list(row) for row in zip(*columns)] if columns else []
+    return TypedTable(header=header, kinds=kinds, rows=rows)
+
+
+def convert_column(values: Sequence[Any] | pd.Series) -> tuple[str, list[Any]]:
+    """Infer the kind of a column once and convert every cell; blanks become ``""``."""
+    series = pd.Series(values, dtype=object).reset_index(drop=True)
+    blank = series.isna() | (series.astype(str).str.strip() == "")
+    present = series[~blank]
+    if present.empty:
+        return "text", [""] * len(series)
+
+    text = present.astype(str).str.strip()
+    if present.map(lambda value: isinstance(value, (bool, np.bool_))).all() or (
+        text.str.upper().isin(("TRUE", "FALSE")).all()
+    ):
+        converted = text.str.upper() == "TRUE"
+        return "bool", _fill(len(series), present.index, converted.tolist())
+
+    if not text.str.match(_LEADING_ZERO_PATTERN).any():
+        numbers = pd.to_numeric(text, errors="coerce")
+        if numbers.notna().all() and np.isfinite(numbers.to_numpy(dtype=float)).all():
+            return "number", _fill(len(series), present.index, _numbers(numbers))
+
+    if present.map(lambda value: isinstance(value, (dt.date, np.datetime64))).all():
+        stamps = pd.to_datetime(present.tolist(), utc=True).to_series(index=present.index)
+        return _date_kind(stamps), _fill(len(series), present.index, _serials(stamps))
+    if text.str.match(_DATE_PATTERN).all():
+        stamps = pd.to_datetime(text, format="%Y-%m-%d", errors="coerce")
+        if stamps.notna().all():
+            return "date", _fill(len(series), present.index, _serials(stamps))
+    if text.str.match(_DATETIME_PATTERN).all():
+        stamps = pd.to_datetime(text, format="ISO8601", errors="coerce", utc=True)
+        if stamps.notna().all():
+            stamps = stamps.dt.tz_localize(None)
+            return "datetime", _fill(len(series), present.index, _serials(stamps))
+
+    return "text", _fill(len(series), present.index, present.astype(str).tolist())
+
+
+def _records_frame(records: Sequence[Mapping[str, Any]]) -> pd.DataFrame:
+    if not records:
+        return pd.DataFrame()
+    header = list(records[0].keys())
+    return pd.DataFrame(
+        {key: [row.get(key) for row in records] for key in header}, columns=header, dtype=object
+    )
+
+
+def _fill(size: int, index: pd.Index, values: list[Any]) -> list[Any]:
+    column: list[Any] = [""] * size
+    for position, value in zip(index, values):
+        column[position] = value
+    return column
+
+
+def _numbers(numbers: pd.Series) -> list[float | int]:
+    array = numbers.to_numpy(dtype=float)
+    integral = (np.mod(array, 1) == 0) & (np.abs(array) < _MAX_EXACT_INT)
+    return [int(value) if whole else value for value, whole in zip(array.tolist(), integral)]
+
+
+def _serials(stamps: pd.Series) -> list[float | int]:
+    if getattr(stamps.dt, "tz", None) is not None:
+        stamps = stamps.dt.tz_convert("UTC").dt.tz_localize(None)
+    days = (stamps - _SHEETS_EPOCH) / pd.Timedelta(days=1)
+    return _numbers(days)
+
+
+def _date_kind(stamps: pd.Series) -> str:
+    return "date" if (stamps.dt.normalize() == stamps).all() else "datetime"
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Sequence
+import hashlib
+import json
+import os
+import tempfile
+
+_STATE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class TabSyncState:
+    header: list[str]
+    row_hashes: list[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class TabSyncResult:
+    tab: str
+    mode: str
+    rows: int
+    changed_rows: int = 0
+    cleared_rows: int = 0
+
+
+def row_hash(row: Sequence[Any]) -> str:
+    encoded = json.dumps(list(row), ensure_ascii=False, default=str, separators=(",", ":"))
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class SyncStateStore:
+    """Header and per-row hashes of what was last written to each tab, kept in a JSON file."""
+
+    def __init__(self, path: Path | str) -> None:
+        self._path = Path(path)
+        self._spreadsheets: dict[str, dict[str, dict[str, Any]]] = {}
+        if self._path.exists():
+            data = json.loads(self._path.read_text(encoding="utf-8"))
+            if data.get("version") == _STATE_VERSION:
+                self._spreadsheets = data.get("spreadsheets", {})
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def get(self, spreadsheet_id: str, tab: str) -> TabSyncState | None:
+        entry = self._spreadsheets.get(spreadsheet_id, {}).get(tab)
+        if entry is None:
+            return None
+        return TabSyncState(header=list(entry["header"]), row_hashes=list(entry["row_hashes"]))
+
+    def put(self, spreadsheet_id: str, tab: str, state: TabSyncState) -> None:
+        self._spreadsheets.setdefault(spreadsheet_id, {})[tab] = {
+            "header": list(state.header),
+            "row_hashes": list(state.row_hashes),
+        }
+
+    def forget(self, spreadsheet_id: str, tab: str | None = None) -> None:
+        if tab is None:
+            self._spreadsheets.pop(spreadsheet_id, None)
+        else:
+            self._spreadsheets.get(spreadsheet_id, {}).pop(tab, None)
+
+    def save(self) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"version": _STATE_VERSION, "spreadsheets": self._spreadsheets}
+        fd, tmp_name = tempfile.mkstemp(dir=self._path.parent, prefix=f".{self._path.name}.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, ensure_ascii=True, separators=(",", ":"))
+            os.replace(tmp_name, self._path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
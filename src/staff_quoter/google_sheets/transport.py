@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Mapping
+from urllib.parse import urlsplit
+import datetime as dt
+import random
+import threading
+import time
+
+from google.auth.credentials import Credentials
+from gspread.exceptions import APIError
+from gspread.http_client import HTTPClient
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError
+import requests
+
+# Sheets API default quota: 60 read and 60 write requests per minute per user.
+DEFAULT_REQUESTS_PER_MINUTE = 60.0
+_GOOGLE_API_ROOTS = ("https://sheets.googleapis.com", "https://www.googleapis.com")
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+# POST endpoints that only read or clear, so sending them twice changes nothing.
+_IDEMPOTENT_POST_SUFFIXES = (
+    ":batchGet",
+    ":batchGetByDataFilter",
+    ":clear",
+    ":batchClear",
+    ":batchClearByDataFilter",
+)
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every request of a client.
+
+    Callers reserve a token under the lock and sleep outside it, so waiting
+    threads are served in arrival order and never exceed the refill rate.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+        capacity: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive")
+        self._rate = requests_per_minute / 60.0
+        self._capacity = float(capacity if capacity is not None else requests_per_minute)
+        if self._capacity < 1:
+            raise ValueError("capacity must allow at least one request")
+        self._tokens = self._capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, blocking until it is available; return the seconds waited."""
+        with self._lock:
+            self._refill()
+            self._tokens -= 1.0
+            wait = max(0.0, -self._tokens / self._rate)
+        if wait:
+            self._sleep(wait)
+        return wait
+
+    def drain(self) -> None:
+        """Empty the bucket so every thread slows down after the server pushed back."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 0.0)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 6
+    base_delay: float = 1.0
+    max_delay: float = 64.0
+    retry_statuses: frozenset[int] = frozenset({408, 429, 500, 502, 503, 504})
+
+    def delay(self, attempt: int, rng: random.Random, retry_after: float | None = None) -> float:
+        """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return max(rng.uniform(0.0, ceiling), min(retry_after or 0.0, self.max_delay))
+
+
+class RateLimitedHTTPClient(HTTPClient):
+    """gspread HTTP client with a pooled session, a shared token bucket and retry/backoff.
+
+    Idempotent requests are retried on any retryable status or connection
+    error. Requests that change data on every call (``values:append``,
+    ``batchUpdate``, ...) are only retried on 429, which the quota check
+    answers before the request is applied, or when the connection failed
+    before the request was sent.
+
+    ``api_root`` redirects Google API URLs to another host (a local stand-in server).
+    """
+
+    @classmethod
+    def with_options(cls, **options: Any) -> type[RateLimitedHTTPClient]:
+        """Subclass with keyword ``options`` bound, for gspread's ``http_client`` class argument."""
+
+        class _Configured(RateLimitedHTTPClient):
+            def __init__(self, auth: Credentials, session: Session | None = None) -> None:
+                super().__init__(auth, session, **options)
+
+        return _Configured
+
+    def __init__(
+        self,
+        auth: Credentials,
+        session: Session | None = None,
+        *,
+        limiter: TokenBucket | None = None,
+        retry: RetryPolicy | None = None,
+        pool_size: int = 10,
+        api_root: str | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: random.Random | None = None,
+    ) -> None:
+        super().__init__(auth, session)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.limiter = limiter or TokenBucket()
+        self.retry = retry or RetryPolicy()
+        self.retries = 0
+        self._api_root = api_root.rstrip("/") if api_root else None
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._counter_lock = threading.Lock()
+
+    def request(self, method: str, endpoint: str, *args: Any, **kwargs: Any) -> Response:
+        idempotent = _is_idempotent(method, endpoint)
+        endpoint = self._rewrite(endpoint)
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            try:
+                return super().request(method, endpoint, *args, **kwargs)
+            except APIError as error:
+                status = error.response.status_code
+                retryable = status in self.retry.retry_statuses and (idempotent or status == 429)
+                if not retryable or attempt + 1 >= self.retry.max_attempts:
+                    raise
+                if status == 429:
+                    self.limiter.drain()
+                delay = self.retry.delay(attempt, self._rng, _retry_after(error.response.headers))
+            except (requests.ConnectionError, requests.Timeout) as error:
+                retryable = idempotent or _never_sent(error)
+                if not retryable or attempt + 1 >= self.retry.max_attempts:
+                    raise
+                delay = self.retry.delay(attempt, self._rng)
+            with self._counter_lock:
+                self.retries += 1
+            self._sleep(delay)
+            attempt += 1
+
+    def _rewrite(self, endpoint: str) -> str:
+        if self._api_root:
+            for root in _GOOGLE_API_ROOTS:
+                if endpoint.startswith(root):
+                    return self._api_root + endpoint[len(root):]
+        return endpoint
+
+
+def _is_idempotent(method: str, endpoint: str) -> bool:
+    method = method.upper()
+    if method in _IDEMPOTENT_METHODS:
+        return True
+    return method == "POST" and urlsplit(endpoint).path.endswith(_IDEMPOTENT_POST_SUFFIXES)
+
+
+def _never_sent(error: requests.RequestException) -> bool:
+    """True when the connection failed before any byte of the request went out."""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    cause = error.args[0] if error.args else None
+    # requests wraps urllib3's MaxRetryError, whose ``reason`` is the real failure.
+    cause = getattr(cause, "reason", cause)
+    return isinstance(cause, ConnectTimeoutError)  # includes NewConnectionError
+
+
+def _retry_after(headers: Mapping[str, str]) -> float | None:
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=dt.timezone.utc)
+    return max(0.0, (when - dt.datetime.now(dt.timezone.utc)).total_seconds())
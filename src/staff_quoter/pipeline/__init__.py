@@ -1,10 +1,21 @@
+from .batch import BatchItemResult, BatchSummary
 from .formula_validator import WorkbookFormulaValidator
+from .ledger import QuoteLedger
 from .models import FormulaValidationReport, QuotePayload
-from .runner import QuotePipeline
+from .quote_store import QuoteRepository
+from .runner import PipelineResult, QuotePipeline, RenderedQuote
+from .workbook_reader import WorkbookSnapshot
 
 __all__ = [
+    "BatchItemResult",
+    "BatchSummary",
     "WorkbookFormulaValidator",
     "FormulaValidationReport",
+    "PipelineResult",
+    "QuoteLedger",
     "QuotePayload",
     "QuotePipeline",
+    "QuoteRepository",
+    "RenderedQuote",
+    "WorkbookSnapshot",
 ]
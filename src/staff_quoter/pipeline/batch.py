@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator
+import time
+
+from staff_quoter.config import Settings
+
+if TYPE_CHECKING:
+    from .runner import PipelineResult, QuotePipeline
+
+
+@dataclass(frozen=True)
+class BatchItemResult:
+    workbook_path: str
+    status: str
+    elapsed_seconds: float
+    result: PipelineResult | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "workbook_path": self.workbook_path,
+            "status": self.status,
+            "elapsed_seconds": round(self.elapsed_seconds, 4),
+            "result": asdict(self.result) if self.result is not None else None,
+            "error": self.error,
+        }
+
+
+@dataclass
+class BatchSummary:
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    elapsed_seconds: float = 0.0
+    failures: list[dict[str, str]] = field(default_factory=list)
+
+    def add(self, item: BatchItemResult) -> None:
+        self.total += 1
+        if item.ok:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+            self.failures.append({"workbook_path": item.workbook_path, "error": item.error or ""})
+
+    @property
+    def workbooks_per_second(self) -> float:
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.total / self.elapsed_seconds
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "total": self.total,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "elapsed_seconds": round(self.elapsed_seconds, 4),
+            "workbooks_per_second": round(self.workbooks_per_second, 4),
+            "failures": list(self.failures),
+        }
+
+
+def run_batch_item(
+    pipeline: QuotePipeline,
+    workbook_path: Path,
+    fail_on_formula_issues: bool,
+    recalc: str | None,
+) -> BatchItemResult:
+    started = time.perf_counter()
+    try:
+        future = pipeline.submit(
+            workbook_path,
+            fail_on_formula_issues=fail_on_formula_issues,
+            recalc=recalc,
+        )
+    except Exception as exc:
+        return failed_item(workbook_path, started, exc)
+    return finish_item(workbook_path, started, future)
+
+
+def iter_serial_results(
+    pipeline: QuotePipeline,
+    workbook_paths: Iterable[Path],
+    fail_on_formula_issues: bool,
+    recalc: str | None,
+) -> Iterator[BatchItemResult]:
+    """Run workbooks in-process, overlapping output writes with the next extraction."""
+    pending: deque[tuple[Path, float, Future[PipelineResult]]] = deque()
+    for workbook_path in workbook_paths:
+        started = time.perf_counter()
+        try:
+            future = pipeline.submit(
+                workbook_path,
+                fail_on_formula_issues=fail_on_formula_issues,
+                recalc=recalc,
+            )
+        except Exception as exc:
+            yield failed_item(workbook_path, started, exc)
+        else:
+            pending.append((workbook_path, started, future))
+
+        while pending and pending[0][2].done():
+            yield finish_item(*pending.popleft())
+
+    while pending:
+        yield finish_item(*pending.popleft())
+
+
+def finish_item(
+    workbook_path: Path,
+    started: float,
+    future: Future[PipelineResult],
+) -> BatchItemResult:
+    """Wait for a submitted workbook and wrap its outcome, failures included."""
+    try:
+        result = future.result()
+    except Exception as exc:
+        return failed_item(workbook_path, started, exc)
+    return BatchItemResult(
+        workbook_path=str(workbook_path),
+        status="ok",
+        elapsed_seconds=time.perf_counter() - started,
+        result=result,
+    )
+
+
+def failed_item(workbook_path: Path, started: float, exc: BaseException) -> BatchItemResult:
+    """Failed result for ``workbook_path``, timed from ``started`` (a perf_counter value)."""
+    return BatchItemResult(
+        workbook_path=str(workbook_path),
+        status="failed",
+        elapsed_seconds=time.perf_counter() - started,
+        error=_describe_error(exc),
+    )
+
+
+def lost_item(workbook_path: Path, started: float) -> BatchItemResult:
+    """Failed result for a workbook whose worker process died while quoting it."""
+    return failed_item(
+        workbook_path, started, RuntimeError("worker process died while quoting this workbook")
+    )
+
+
+class WorkerPool:
+    """Warm batch worker processes, each holding its own :class:`QuotePipeline`.
+
+    A worker that dies (segfault, OOM kill, ``os._exit``) breaks a
+    ``ProcessPoolExecutor`` for good; :meth:`restart` replaces it with a
+    fresh pool so callers can resubmit the work that was lost.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        workers: int,
+        recalc_workers: int = 0,
+        profile: bool = False,
+    ) -> None:
+        self._settings = settings
+        self._workers = workers
+        self._recalc_workers = recalc_workers
+        self._profile = profile
+        self.restarts = 0
+        self._executor = self._spawn()
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    def submit(
+        self,
+        workbook_path: Path,
+        fail_on_formula_issues: bool,
+        recalc: str | None,
+    ) -> Future[BatchItemResult]:
+        """Queue one workbook; raises ``BrokenProcessPool`` if the pool already broke."""
+        return self._executor.submit(_run_in_worker, workbook_path, fail_on_formula_issues, recalc)
+
+    def restart(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._spawn()
+        self.restarts += 1
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _spawn(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self._workers,
+            initializer=_init_worker,
+            initargs=(self._settings, self._recalc_workers, self._profile),
+        )
+
+
+def iter_pool_results(
+    settings: Settings,
+    workbook_paths: Iterable[Path],
+    workers: int,
+    fail_on_formula_issues: bool,
+    recalc: str | None,
+    recalc_workers: int = 0,
+    profile: bool = False,
+) -> Iterator[BatchItemResult]:
+    """Run workbooks on warm worker processes, isolating failures per workbook.
+
+    At most ``workers`` workbooks are in flight, so when a worker process dies
+    only those are affected: the pool is rebuilt and they are rerun one at a
+    time. A workbook that kills its worker while running alone is reported as
+    failed; every other workbook still gets its own result.
+    """
+    pool = WorkerPool(settings, workers, recalc_workers, profile)
+    queued: deque[Path] = deque(workbook_paths)
+    suspects: deque[Path] = deque()
+    in_flight: dict[Future[BatchItemResult], tuple[Path, float]] = {}
+    try:
+        while queued or suspects or in_flight:
+            broken = False
+            while not broken and (suspects or queued):
+                # Suspects run alone so a crash can be pinned on one workbook.
+                source = suspects if suspects else queued
+                if in_flight and (source is suspects or len(in_flight) >= workers):
+                    break
+                path = source.popleft()
+                started = time.perf_counter()
+                try:
+                    in_flight[pool.submit(path, fail_on_formula_issues, recalc)] = (path, started)
+                except BrokenProcessPool:
+                    source.appendleft(path)
+                    broken = True
+
+            if not broken:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if isinstance(future.exception(), BrokenProcessPool):
+                        broken = True
+                        continue
+                    path, started = in_flight.pop(future)
+                    yield _pool_item(future, path, started)
+            if not broken:
+                continue
+
+            lost = []
+            for future, (path, started) in list(in_flight.items()):
+                if future.done() and future.exception() is None:
+                    yield _pool_item(future, path, started)
+                else:
+                    lost.append((path, started))
+            in_flight.clear()
+            pool.restart()
+            if len(lost) == 1:
+                yield lost_item(*lost[0])
+            else:
+                suspects.extend(path for path, _ in lost)
+    finally:
+        pool.shutdown(wait=True)
+
+
+def _pool_item(future: Future[BatchItemResult], path: Path, started: float) -> BatchItemResult:
+    try:
+        return future.result()
+    except Exception as exc:
+        return failed_item(path, started, exc)
+
+
+_worker_pipeline: QuotePipeline | None = None
+
+
+def _init_worker(settings: Settings, recalc_workers: int, profile: bool = False) -> None:
+    global _worker_pipeline
+    from .runner import QuotePipeline
+
+    _worker_pipeline = QuotePipeline(settings, recalc_workers=recalc_workers, profile=profile)
+
+
+def _run_in_worker(
+    workbook_path: Path,
+    fail_on_formula_issues: bool,
+    recalc: str | None,
+) -> BatchItemResult:
+    if _worker_pipeline is None:
+        raise RuntimeError("batch worker was not initialized")
+    return run_batch_item(_worker_pipeline, workbook_path, fail_on_formula_issues, recalc)
+
+
+def _describe_error(exc: BaseException) -> str:
+    return f"{type(exc).__name__}: {exc}"
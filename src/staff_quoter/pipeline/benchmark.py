@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Mapping, cast
+import json
+import multiprocessing
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
+from staff_quoter.config import Settings
+
+from .formula_validator import WorkbookFormulaValidator
+from .pdf_renderer import QuotePdfRenderer
+from .quote_builder import QuotePayloadBuilder
+from .runner import QuotePipeline
+from .synthetic import SyntheticWorkbookSpec
+
+CASES = ("validator", "builder", "pdf_renderer", "pipeline")
+DEFAULT_THRESHOLD = 0.2
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    case: str
+    iterations: int
+    elapsed_seconds: float
+    # Process high-water mark; each case runs in a fresh process when isolated.
+    peak_rss_bytes: int | None = None
+
+    @property
+    def ops_per_second(self) -> float:
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.iterations / self.elapsed_seconds
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "case": self.case,
+            "iterations": self.iterations,
+            "elapsed_seconds": round(self.elapsed_seconds, 6),
+            "ops_per_second": round(self.ops_per_second, 4),
+            "peak_rss_bytes": self.peak_rss_bytes,
+        }
+
+
+def run_case(
+    case: str,
+    workbook_path: Path,
+    iterations: int,
+    min_seconds: float = 0.5,
+) -> BenchmarkResult:
+    """Time one case in this process, after one untimed warm-up.
+
+    Runs at least ``iterations`` times and keeps going until ``min_seconds``
+    have passed, so sub-millisecond cases are not dominated by timer noise.
+    """
+    if case not in CASES:
+        raise ValueError(f"Unknown benchmark case: {case}. Expected one of {', '.join(CASES)}.")
+    if iterations < 1:
+        raise ValueError("iterations must be >= 1")
+    with tempfile.TemporaryDirectory(prefix="staff-quoter-bench-") as tmp:
+        step, cleanup = _case_step(case, Path(workbook_path), Path(tmp))
+        try:
+            step()
+            runs = 0
+            elapsed = 0.0
+            started = time.perf_counter()
+            while runs < iterations or elapsed < min_seconds:
+                step()
+                runs += 1
+                elapsed = time.perf_counter() - started
+        finally:
+            cleanup()
+    return BenchmarkResult(case, runs, elapsed, _peak_rss_bytes())
+
+
+def run_suite(
+    workbook_path: Path,
+    cases: Iterable[str] = CASES,
+    iterations: int = 5,
+    isolate: bool = True,
+    min_seconds: float = 0.5,
+) -> list[BenchmarkResult]:
+    """Run each case; with ``isolate`` each gets a fresh spawned process so peak RSS is its own."""
+    results = []
+    for case in cases:
+        if not isolate:
+            results.append(run_case(case, workbook_path, iterations, min_seconds))
+            continue
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            future = executor.submit(run_case, case, workbook_path, iterations, min_seconds)
+            results.append(future.result())
+    return results
+
+
+def compare_to_baseline(
+    results: Iterable[BenchmarkResult],
+    baseline: Mapping[str, object],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[str]:
+    """Describe every case whose throughput dropped or peak RSS grew by more than ``threshold``."""
+    recorded = cast("Mapping[str, Mapping[str, Any]]", baseline.get("results", {}))
+    regressions = []
+    for result in results:
+        previous = recorded.get(result.case)
+        if previous is None:
+            continue
+        old_ops = float(previous["ops_per_second"])
+        if old_ops > 0 and result.ops_per_second < old_ops * (1 - threshold):
+            regressions.append(
+                f"{result.case}: throughput {result.ops_per_second:.2f} ops/s vs baseline "
+                f"{old_ops:.2f} ({result.ops_per_second / old_ops - 1:+.1%})"
+            )
+        old_rss = previous.get("peak_rss_bytes")
+        if old_rss and result.peak_rss_bytes and result.peak_rss_bytes > old_rss * (1 + threshold):
+            regressions.append(
+                f"{result.case}: peak RSS {result.peak_rss_bytes / 2**20:.1f} MiB vs baseline "
+                f"{old_rss / 2**20:.1f} MiB ({result.peak_rss_bytes / old_rss - 1:+.1%})"
+            )
+    return regressions
+
+
+def load_baseline(path: Path, spec: SyntheticWorkbookSpec) -> dict[str, object] | None:
+    """Stored baseline for ``spec``, or None when the file has none recorded for it."""
+    if not path.exists():
+        return None
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return data.get(spec.label)
+
+
+def write_baseline(
+    path: Path,
+    spec: SyntheticWorkbookSpec,
+    results: Iterable[BenchmarkResult],
+) -> None:
+    data = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+    data[spec.label] = {
+        "spec": spec.to_dict(),
+        "python": sys.version.split()[0],
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "results": {result.case: result.to_dict() for result in results},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def _case_step(
+    case: str,
+    workbook_path: Path,
+    workdir: Path,
+) -> tuple[Callable[[], object], Callable[[], None]]:
+    if case == "validator":
+        validator = WorkbookFormulaValidator()
+        return (lambda: validator.validate(workbook_path)), _noop
+    if case == "builder":
+        builder = QuotePayloadBuilder()
+        return (lambda: list(builder.build_many(workbook_path))), _noop
+    if case == "pdf_renderer":
+        renderer = QuotePdfRenderer()
+        payload = QuotePayloadBuilder().build_from_workbook(workbook_path)
+        return (lambda: renderer.render_bytes(payload)), _noop
+
+    pipeline = QuotePipeline(
+        Settings(
+            workspace_root=workdir,
+            google_credentials_file="",
+            google_sheets_id="",
+            xlsx_recalc_script=workdir / "recalc.py",
+            default_workbook=workbook_path,
+            output_json_dir=workdir / "json",
+            output_pdf_dir=workdir / "pdf",
+            quote_history_db=workdir / "history.sqlite3",
+        )
+    )
+    return (lambda: pipeline.run(workbook_path, fail_on_formula_issues=False)), pipeline.close
+
+
+def _noop() -> None:
+    return None
+
+
+def _peak_rss_bytes() -> int | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
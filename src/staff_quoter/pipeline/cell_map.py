@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class CellField:
+    name: str
+    sheet: str
+    cell: str
+    kind: str
+
+
+QUOTE_CELL_MAP: tuple[CellField, ...] = (
+    CellField("quote_id", "INPUT_QUOTE", "A2", "text"),
+    CellField("engine_type", "INPUT_QUOTE", "C2", "text"),
+    CellField("customer_name", "INPUT_QUOTE", "D2", "text"),
+    CellField("part_number", "INPUT_QUOTE", "G2", "text"),
+    CellField("total_cost", "CALC_OUTPUTS", "B2", "float"),
+    CellField("total_price", "CALC_OUTPUTS", "C2", "float"),
+    CellField("margin_pct", "CALC_OUTPUTS", "D2", "float"),
+    CellField("lead_time_weeks", "CALC_OUTPUTS", "E2", "float"),
+    CellField("moq", "CALC_OUTPUTS", "F2", "int"),
+    CellField("pdf_ready_flag", "QUOTE_OUTPUT", "C2", "bool"),
+)
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Iterable, Mapping
+import hashlib
+import json
+
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import column_index_from_string, coordinate_from_string
+
+from .formula_engine import CellRange, FormulaEngine
+from .workbook_reader import WorkbookSnapshot
+
+CellKey = tuple[str, str]
+
+# Version 2 keeps whole-column/row references unclamped.
+_GRAPH_VERSION = 2
+_EXPAND_AREA = 256
+
+
+def formula_fingerprint(snapshot: WorkbookSnapshot) -> str:
+    digest = hashlib.sha256()
+    for ws in snapshot.worksheets:
+        for coordinate, formula in ws.formulas:
+            digest.update(f"{ws.title}!{coordinate}={formula}\n".encode("utf-8"))
+    for name, text in sorted(snapshot.defined_names.items()):
+        digest.update(f"{name}:={text}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class DependencyGraph:
+    """Precedents and dependents of every formula cell in a workbook template.
+
+    Built once per template (and optionally saved next to it), the graph
+    answers "what has to be recomputed if this cell changes" without parsing
+    any formula again. Small ranges are indexed cell by cell; large ranges
+    are kept per sheet and matched by bounds.
+    """
+
+    def __init__(
+        self,
+        precedents: Mapping[CellKey, Iterable[CellRange]],
+        fingerprint: str = "",
+    ) -> None:
+        self.fingerprint = fingerprint
+        self._precedents: dict[CellKey, tuple[CellRange, ...]] = {
+            key: tuple(refs) for key, refs in precedents.items()
+        }
+        self._cell_dependents: dict[CellKey, list[CellKey]] = defaultdict(list)
+        self._range_dependents: dict[str, list[tuple[CellRange, CellKey]]] = defaultdict(list)
+        for key, refs in self._precedents.items():
+            for ref in refs:
+                self._index(ref, key)
+
+    @classmethod
+    def build(
+        cls,
+        snapshot: WorkbookSnapshot,
+        engine: FormulaEngine | None = None,
+    ) -> DependencyGraph:
+        engine = engine or FormulaEngine(snapshot)
+        precedents = {
+            (ws.title, coordinate): engine.references(ws.title, coordinate)
+            for ws in snapshot.worksheets
+            for coordinate, _formula in ws.formulas
+        }
+        return cls(precedents, fingerprint=formula_fingerprint(snapshot))
+
+    @classmethod
+    def load(cls, path: Path | str) -> DependencyGraph:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        if data.get("version") != _GRAPH_VERSION:
+            raise ValueError(f"Unsupported dependency graph version: {data.get('version')}")
+        precedents = {
+            (sheet, coordinate): [CellRange(*ref) for ref in refs]
+            for sheet, coordinate, refs in data["formulas"]
+        }
+        return cls(precedents, fingerprint=data.get("fingerprint", ""))
+
+    def save(self, path: Path | str) -> None:
+        data = {
+            "version": _GRAPH_VERSION,
+            "fingerprint": self.fingerprint,
+            "formulas": [
+                [
+                    sheet,
+                    coordinate,
+                    [[r.sheet, r.min_row, r.min_col, r.max_row, r.max_col] for r in refs],
+                ]
+                for (sheet, coordinate), refs in self._precedents.items()
+            ],
+        }
+        text = json.dumps(data, ensure_ascii=True, separators=(",", ":"))
+        Path(path).write_text(text, encoding="utf-8")
+
+    def matches(self, snapshot: WorkbookSnapshot) -> bool:
+        return self.fingerprint == formula_fingerprint(snapshot)
+
+    def __len__(self) -> int:
+        return len(self._precedents)
+
+    def __contains__(self, key: CellKey) -> bool:
+        return key in self._precedents
+
+    def precedents(self, sheet: str, coordinate: str) -> tuple[CellRange, ...]:
+        return self._precedents.get((sheet, coordinate), ())
+
+    def dependents(self, sheet: str, coordinate: str) -> list[CellKey]:
+        """Formula cells that read ``sheet!coordinate`` directly."""
+        found = list(self._cell_dependents.get((sheet, coordinate), ()))
+        ranges = self._range_dependents.get(sheet)
+        if ranges:
+            letters, row = coordinate_from_string(coordinate)
+            col = column_index_from_string(letters)
+            found.extend(key for ref, key in ranges if ref.contains(row, col))
+        return found
+
+    def downstream(self, cells: Iterable[CellKey]) -> list[CellKey]:
+        """Every formula cell that transitively depends on any of ``cells``."""
+        seen: set[CellKey] = set()
+        ordered: list[CellKey] = []
+        queue = deque(cells)
+        while queue:
+            sheet, coordinate = queue.popleft()
+            for dependent in self.dependents(sheet, coordinate):
+                if dependent not in seen:
+                    seen.add(dependent)
+                    ordered.append(dependent)
+                    queue.append(dependent)
+        return ordered
+
+    def _index(self, ref: CellRange, key: CellKey) -> None:
+        area = (ref.max_row - ref.min_row + 1) * (ref.max_col - ref.min_col + 1)
+        if area > _EXPAND_AREA:
+            self._range_dependents[ref.sheet].append((ref, key))
+            return
+        for row in range(ref.min_row, ref.max_row + 1):
+            for col in range(ref.min_col, ref.max_col + 1):
+                self._cell_dependents[ref.sheet, f"{get_column_letter(col)}{row}"].append(key)
+
+
+class IncrementalEvaluator:
+    """Keeps a workbook evaluated and recomputes only what an input change touches.
+
+    ``set_input`` invalidates the downstream formula cells of the changed cell;
+    they are re-evaluated lazily the next time they (or their dependents) are
+    read, everything else keeps its memoized value.
+    """
+
+    def __init__(self, snapshot: WorkbookSnapshot, graph: DependencyGraph | None = None) -> None:
+        self._engine = FormulaEngine(snapshot)
+        if graph is not None and graph.fingerprint and not graph.matches(snapshot):
+            raise ValueError("Dependency graph was built for a different workbook template.")
+        self.graph = graph or DependencyGraph.build(snapshot, self._engine)
+
+    @property
+    def engine(self) -> FormulaEngine:
+        return self._engine
+
+    def value(self, sheet: str, coordinate: str) -> object:
+        return self._engine.value(sheet, coordinate)
+
+    def evaluate(self, cells: Iterable[CellKey]) -> dict[CellKey, object]:
+        return self._engine.evaluate(cells)
+
+    def set_input(self, sheet: str, coordinate: str, value: object) -> list[CellKey]:
+        return self.set_inputs({(sheet, coordinate): value})
+
+    def set_inputs(self, values: Mapping[CellKey, object]) -> list[CellKey]:
+        """Apply input overrides and return the formula cells that were invalidated."""
+        changed: list[CellKey] = []
+        for (sheet, coordinate), value in values.items():
+            coordinate = coordinate.replace("$", "").upper()
+            self._engine.set_value(sheet, coordinate, value)
+            changed.append((sheet, coordinate))
+        dirty = self.graph.downstream(changed)
+        self._engine.invalidate(dirty)
+        return dirty
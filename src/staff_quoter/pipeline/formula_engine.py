@@ -0,0 +1,1559 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from decimal import (
+    ROUND_CEILING,
+    ROUND_DOWN,
+    ROUND_FLOOR,
+    ROUND_HALF_UP,
+    ROUND_UP,
+    Decimal,
+    InvalidOperation,
+)
+from typing import Any, Callable, Iterable, Iterator, Sequence, TypeGuard
+import math
+import operator
+import re
+import time
+
+from openpyxl.formula.tokenizer import Token, Tokenizer, TokenizerError
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import column_index_from_string, coordinate_from_string
+
+from .cell_map import CellField
+from .workbook_reader import WorkbookSnapshot
+
+ERROR_CODES = frozenset({"#NULL!", "#DIV/0!", "#VALUE!", "#REF!", "#NAME?", "#NUM!", "#N/A"})
+
+_MAX_ROW = 1048576
+_MAX_COL = 16384
+_SCAN_AREA = 256
+
+_REF_PART = r"\$?[A-Za-z]{1,3}\$?\d+|\$?[A-Za-z]{1,3}|\$?\d+"
+_REF_PATTERN = re.compile(
+    r"^(?:(?:'(?P<quoted>(?:[^']|'')+)'|(?P<sheet>[^'!\[\]]+))!)?"
+    rf"(?P<start>{_REF_PART})(?::(?P<end>{_REF_PART}))?$"
+)
+
+_INFIX_PRECEDENCE = {
+    "=": 1,
+    "<>": 1,
+    "<": 1,
+    ">": 1,
+    "<=": 1,
+    ">=": 1,
+    "&": 2,
+    "+": 3,
+    "-": 3,
+    "*": 4,
+    "/": 4,
+    "^": 5,
+}
+_COMPARISONS: dict[str, Callable[[Any, Any], bool]] = {
+    "=": operator.eq,
+    "<>": operator.ne,
+    "<": operator.lt,
+    ">": operator.gt,
+    "<=": operator.le,
+    ">=": operator.ge,
+}
+_FUNCTION_PREFIXES = ("_XLFN._XLWS.", "_XLFN.", "_XLWS.")
+
+
+@dataclass(frozen=True)
+class ExcelError:
+    code: str
+
+    def __str__(self) -> str:
+        return self.code
+
+
+class FormulaEvaluationError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class CellRange:
+    sheet: str
+    min_row: int
+    min_col: int
+    max_row: int
+    max_col: int
+
+    @property
+    def is_cell(self) -> bool:
+        return self.min_row == self.max_row and self.min_col == self.max_col
+
+    def contains(self, row: int, col: int) -> bool:
+        return self.min_row <= row <= self.max_row and self.min_col <= col <= self.max_col
+
+
+class RangeValue:
+    """A rectangular block of evaluated values, stored row by row."""
+
+    __slots__ = ("rows",)
+
+    def __init__(self, rows: list[list[object]]) -> None:
+        self.rows = rows
+
+    @property
+    def height(self) -> int:
+        return len(self.rows)
+
+    @property
+    def width(self) -> int:
+        return len(self.rows[0]) if self.rows else 0
+
+    def flat(self) -> Iterator[object]:
+        for row in self.rows:
+            yield from row
+
+    def column(self, index: int) -> list[object]:
+        return [row[index] for row in self.rows]
+
+    def __repr__(self) -> str:
+        return f"RangeValue({self.rows!r})"
+
+
+Node = tuple
+
+
+def parse_formula(formula: str, sheet: str) -> Node:
+    """Parse ``=...`` formula text into a small tuple-based syntax tree."""
+    try:
+        tokens = [tok for tok in Tokenizer(formula).items if tok.type != Token.WSPACE]
+    except TokenizerError as exc:
+        raise FormulaEvaluationError(f"Cannot tokenize formula {formula!r}: {exc}") from exc
+
+    parser = _Parser(tokens, sheet, formula)
+    node = parser.expression(0)
+    if parser.pos != len(tokens):
+        raise FormulaEvaluationError(f"Unexpected token in formula {formula!r}")
+    return node
+
+
+def parse_reference(text: str, sheet: str) -> CellRange | None:
+    match = _REF_PATTERN.match(text)
+    if match is None:
+        return None
+
+    quoted = match.group("quoted")
+    target_sheet = quoted.replace("''", "'") if quoted else (match.group("sheet") or sheet)
+    start = _reference_part(match.group("start"))
+    end_text = match.group("end")
+    if end_text is None:
+        if start[0] is None or start[1] is None:
+            return None
+        end = start
+    else:
+        end = _reference_part(end_text)
+        if (start[0] is None) != (end[0] is None) or (start[1] is None) != (end[1] is None):
+            return None
+
+    if start[0] is None or end[0] is None:
+        min_row, max_row = 1, _MAX_ROW
+    else:
+        min_row, max_row = sorted((start[0], end[0]))
+    if start[1] is None or end[1] is None:
+        min_col, max_col = 1, _MAX_COL
+    else:
+        min_col, max_col = sorted((start[1], end[1]))
+    return CellRange(target_sheet, min_row, min_col, max_row, max_col)
+
+
+def _reference_part(text: str) -> tuple[int | None, int | None]:
+    text = text.replace("$", "")
+    if text.isdigit():
+        return int(text), None
+    if text.isalpha():
+        return None, column_index_from_string(text.upper())
+    letters, row = coordinate_from_string(text.upper())
+    return row, column_index_from_string(letters)
+
+
+class _Parser:
+    def __init__(self, tokens: list[Token], sheet: str, formula: str) -> None:
+        self.tokens = tokens
+        self.pos = 0
+        self.sheet = sheet
+        self.formula = formula
+
+    def peek(self) -> Token | None:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self) -> Token:
+        token = self.peek()
+        if token is None:
+            raise FormulaEvaluationError(f"Unexpected end of formula {self.formula!r}")
+        self.pos += 1
+        return token
+
+    def expression(self, min_precedence: int) -> Node:
+        left = self.unary()
+        while True:
+            token = self.peek()
+            if token is None or token.type != Token.OP_IN:
+                return left
+            precedence = _INFIX_PRECEDENCE.get(token.value)
+            if precedence is None:
+                raise FormulaEvaluationError(
+                    f"Unsupported operator {token.value!r} in formula {self.formula!r}"
+                )
+            if precedence < min_precedence:
+                return left
+            self.pos += 1
+            left = ("op", token.value, left, self.expression(precedence + 1))
+
+    def unary(self) -> Node:
+        token = self.peek()
+        if token is not None and token.type == Token.OP_PRE:
+            self.pos += 1
+            operand = self.unary()
+            return ("neg", operand) if token.value == "-" else operand
+
+        node = self.primary()
+        while (token := self.peek()) is not None and token.type == Token.OP_POST:
+            self.pos += 1
+            node = ("pct", node)
+        return node
+
+    def primary(self) -> Node:
+        token = self.take()
+        if token.type == Token.OPERAND:
+            return self.operand(token)
+        if token.type == Token.FUNC and token.subtype == Token.OPEN:
+            return self.call(token.value[:-1].upper())
+        if token.type == Token.PAREN and token.subtype == Token.OPEN:
+            node = self.expression(0)
+            self.expect(Token.PAREN, Token.CLOSE)
+            return node
+        if token.type == Token.ARRAY and token.subtype == Token.OPEN:
+            return self.array()
+        raise FormulaEvaluationError(f"Unexpected {token.value!r} in formula {self.formula!r}")
+
+    def operand(self, token: Token) -> Node:
+        if token.subtype == Token.NUMBER:
+            return ("const", float(token.value))
+        if token.subtype == Token.TEXT:
+            return ("const", token.value[1:-1].replace('""', '"'))
+        if token.subtype == Token.LOGICAL:
+            return ("const", token.value.upper() == "TRUE")
+        if token.subtype == Token.ERROR:
+            return ("const", ExcelError(token.value.upper()))
+        reference = parse_reference(token.value, self.sheet)
+        if reference is None:
+            return ("name", token.value)
+        return ("ref", reference)
+
+    def call(self, name: str) -> Node:
+        for prefix in _FUNCTION_PREFIXES:
+            if name.startswith(prefix):
+                name = name[len(prefix):]
+                break
+
+        args: list[Node] = []
+        token = self.peek()
+        if token is not None and token.type == Token.FUNC and token.subtype == Token.CLOSE:
+            self.pos += 1
+            return ("call", name, ())
+
+        while True:
+            token = self.peek()
+            if token is not None and (
+                (token.type == Token.SEP and token.subtype == Token.ARG)
+                or (token.type == Token.FUNC and token.subtype == Token.CLOSE)
+            ):
+                args.append(("const", None))
+            else:
+                args.append(self.expression(0))
+            token = self.take()
+            if token.type == Token.SEP and token.subtype == Token.ARG:
+                continue
+            if token.type == Token.FUNC and token.subtype == Token.CLOSE:
+                return ("call", name, tuple(args))
+            raise FormulaEvaluationError(f"Unexpected {token.value!r} in formula {self.formula!r}")
+
+    def array(self) -> Node:
+        rows: list[list[object]] = [[]]
+        while True:
+            node = self.unary()
+            if node[0] == "neg" and node[1][0] == "const":
+                value = -node[1][1]
+            elif node[0] == "const":
+                value = node[1]
+            else:
+                raise FormulaEvaluationError(
+                    f"Array constants must be literals in {self.formula!r}"
+                )
+            rows[-1].append(value)
+
+            token = self.take()
+            if token.type == Token.ARRAY and token.subtype == Token.CLOSE:
+                break
+            if token.type == Token.SEP and token.subtype == Token.ROW:
+                rows.append([])
+            elif not (token.type == Token.SEP and token.subtype == Token.ARG):
+                raise FormulaEvaluationError(
+                    f"Unexpected {token.value!r} in formula {self.formula!r}"
+                )
+        if len({len(row) for row in rows}) != 1:
+            raise FormulaEvaluationError(f"Ragged array constant in formula {self.formula!r}")
+        return ("array", RangeValue(rows))
+
+    def expect(self, token_type: str, subtype: str) -> None:
+        token = self.take()
+        if token.type != token_type or token.subtype != subtype:
+            raise FormulaEvaluationError(f"Unexpected {token.value!r} in formula {self.formula!r}")
+
+
+class FormulaEngine:
+    """Evaluates workbook formulas in-process from a :class:`WorkbookSnapshot`.
+
+    Only the cells that are asked for, and the formula cells they depend on,
+    are parsed and evaluated; results are memoized for the engine's lifetime.
+    Dependencies are resolved with an explicit stack, so long calculation
+    chains do not hit the interpreter recursion limit.
+
+    Subclasses change how values are computed by overriding
+    :meth:`evaluate_node`, building on :func:`evaluate_operator`,
+    :func:`evaluate_unary` and :func:`call_function`.
+    """
+
+    def __init__(self, snapshot: WorkbookSnapshot) -> None:
+        self._snapshot = snapshot
+        self._formulas: dict[tuple[str, str], str] = {
+            (ws.title, coordinate): formula
+            for ws in snapshot.worksheets
+            for coordinate, formula in ws.formulas
+        }
+        self._names = {name.upper(): text for name, text in snapshot.defined_names.items()}
+        self._nodes: dict[tuple[str, str], Node] = {}
+        self._name_nodes: dict[str, Node] = {}
+        self._dependencies: dict[tuple[str, str], list[tuple[str, str]]] = {}
+        self._results: dict[tuple[str, str], object] = {}
+        self._overrides: dict[tuple[str, str], object] = {}
+        self._formula_cells: dict[str, list[tuple[int, int, str]]] = {}
+        self._extents: dict[str, tuple[int, int]] = {}
+        self.unsupported_functions: set[str] = set()
+
+    @property
+    def evaluated_cells(self) -> int:
+        return len(self._results)
+
+    def is_formula(self, sheet: str, coordinate: str) -> bool:
+        return (sheet, coordinate) in self._formulas
+
+    def formula_cells(self, sheet: str) -> list[tuple[int, int, str]]:
+        """``(row, col, coordinate)`` of every formula cell on ``sheet``."""
+        cells = self._formula_cells.get(sheet)
+        if cells is None:
+            cells = []
+            formulas = self._snapshot[sheet].formulas if sheet in self._snapshot else []
+            for coordinate, _formula in formulas:
+                cells.append((*_row_col(coordinate), coordinate))
+            self._formula_cells[sheet] = cells
+        return cells
+
+    def value(self, sheet: str, coordinate: str) -> object:
+        key = (sheet, coordinate.replace("$", "").upper())
+        if key not in self._formulas:
+            return self._constant(*key)
+        self._ensure(key)
+        return self._results[key]
+
+    def evaluate(self, cells: Iterable[tuple[str, str]]) -> dict[tuple[str, str], object]:
+        return {(sheet, coordinate): self.value(sheet, coordinate) for sheet, coordinate in cells}
+
+    def set_value(self, sheet: str, coordinate: str, value: object) -> None:
+        """Override a constant cell; callers must :meth:`invalidate` its dependents."""
+        key = (sheet, coordinate.replace("$", "").upper())
+        if key in self._formulas:
+            raise ValueError(f"{sheet}!{key[1]} holds a formula and cannot be set as an input.")
+        if sheet not in self._snapshot:
+            raise KeyError(f"Worksheet {sheet} does not exist.")
+        self._overrides[key] = value
+        extent = self._extents.get(sheet)
+        if extent is not None:
+            row, col = _row_col(key[1])
+            self._extents[sheet] = (max(extent[0], row), max(extent[1], col))
+
+    def invalidate(self, keys: Iterable[tuple[str, str]]) -> None:
+        for key in keys:
+            self._results.pop(key, None)
+
+    def references(self, sheet: str, coordinate: str) -> list[CellRange]:
+        """Ranges referenced by the formula in a cell, including through defined names.
+
+        Whole-column and whole-row references keep their full bounds: they
+        also cover cells past the current used range that an input may set.
+        """
+        key = (sheet, coordinate)
+        if key not in self._formulas:
+            return []
+        refs: list[CellRange] = []
+        self._collect_references(self._node(key), sheet, refs, set())
+        return refs
+
+    def precedents(self, sheet: str, coordinate: str) -> list[tuple[str, str]]:
+        """Formula cells the given cell reads directly."""
+        key = (sheet, coordinate)
+        dependencies = self._dependencies.get(key)
+        if dependencies is None:
+            seen: set[tuple[str, str]] = set()
+            dependencies = []
+            for ref in self.references(sheet, coordinate):
+                for dependency in self._formula_keys_in(ref):
+                    if dependency not in seen:
+                        seen.add(dependency)
+                        dependencies.append(dependency)
+            self._dependencies[key] = dependencies
+        return dependencies
+
+    def _ensure(self, key: tuple[str, str]) -> None:
+        stack = [key]
+        waiting: set[tuple[str, str]] = set()
+        while stack:
+            current = stack[-1]
+            if current in self._results:
+                stack.pop()
+                continue
+            pending = [dep for dep in self.precedents(*current) if dep not in self._results]
+            if pending:
+                if current in waiting:
+                    raise FormulaEvaluationError(
+                        f"Circular reference through {current[0]}!{current[1]}"
+                    )
+                waiting.add(current)
+                stack.extend(reversed(pending))
+                continue
+            waiting.discard(current)
+            stack.pop()
+            self._results[current] = self._evaluate_cell(current)
+
+    def _evaluate_cell(self, key: tuple[str, str]) -> object:
+        return _finalize(self.evaluate_node(self._node(key), key[0]))
+
+    def _node(self, key: tuple[str, str]) -> Node:
+        node = self._nodes.get(key)
+        if node is None:
+            node = parse_formula(self._formulas[key], key[0])
+            self._nodes[key] = node
+        return node
+
+    def _name_node(self, name: str, sheet: str) -> Node | None:
+        upper = name.upper()
+        if upper not in self._names:
+            return None
+        node = self._name_nodes.get(upper)
+        if node is None:
+            node = parse_formula(f"={self._names[upper]}", sheet)
+            self._name_nodes[upper] = node
+        return node
+
+    def _collect_references(
+        self,
+        node: Node,
+        sheet: str,
+        refs: list[CellRange],
+        names_seen: set[str],
+    ) -> None:
+        kind = node[0]
+        if kind == "ref":
+            refs.append(node[1])
+        elif kind == "name":
+            upper = node[1].upper()
+            if upper in names_seen:
+                return
+            names_seen.add(upper)
+            name_node = self._name_node(node[1], sheet)
+            if name_node is not None:
+                self._collect_references(name_node, sheet, refs, names_seen)
+        elif kind in ("neg", "pct"):
+            self._collect_references(node[1], sheet, refs, names_seen)
+        elif kind == "op":
+            self._collect_references(node[2], sheet, refs, names_seen)
+            self._collect_references(node[3], sheet, refs, names_seen)
+        elif kind == "call":
+            for arg in node[2]:
+                self._collect_references(arg, sheet, refs, names_seen)
+
+    def _formula_keys_in(self, ref: CellRange) -> Iterator[tuple[str, str]]:
+        if ref.is_cell:
+            key = (ref.sheet, f"{get_column_letter(ref.min_col)}{ref.min_row}")
+            if key in self._formulas:
+                yield key
+            return
+
+        area = (ref.max_row - ref.min_row + 1) * (ref.max_col - ref.min_col + 1)
+        if area <= _SCAN_AREA:
+            for row in range(ref.min_row, ref.max_row + 1):
+                for col in range(ref.min_col, ref.max_col + 1):
+                    key = (ref.sheet, f"{get_column_letter(col)}{row}")
+                    if key in self._formulas:
+                        yield key
+            return
+
+        for row, col, coordinate in self.formula_cells(ref.sheet):
+            if ref.contains(row, col):
+                yield ref.sheet, coordinate
+
+    def _extent(self, sheet: str) -> tuple[int, int]:
+        """Used range of ``sheet``: snapshot values, formulas and overridden inputs."""
+        extent = self._extents.get(sheet)
+        if extent is None:
+            max_row = max_col = 1
+            coordinates = [coordinate for name, coordinate in self._overrides if name == sheet]
+            if sheet in self._snapshot:
+                ws = self._snapshot[sheet]
+                coordinates.extend(ws.values)
+                coordinates.extend(coordinate for coordinate, _formula in ws.formulas)
+            for coordinate in coordinates:
+                row, col = _row_col(coordinate)
+                max_row = max(max_row, row)
+                max_col = max(max_col, col)
+            extent = (max_row, max_col)
+            self._extents[sheet] = extent
+        return extent
+
+    def _clamp(self, ref: CellRange) -> CellRange:
+        if ref.max_row < _MAX_ROW and ref.max_col < _MAX_COL:
+            return ref
+        max_row, max_col = self._extent(ref.sheet)
+        return CellRange(
+            ref.sheet,
+            ref.min_row,
+            ref.min_col,
+            min(ref.max_row, max(max_row, ref.min_row)),
+            min(ref.max_col, max(max_col, ref.min_col)),
+        )
+
+    def _constant(self, sheet: str, coordinate: str) -> object:
+        if (sheet, coordinate) in self._overrides:
+            return self._overrides[sheet, coordinate]
+        if sheet not in self._snapshot:
+            return ExcelError("#REF!")
+        value = self._snapshot[sheet].values.get(coordinate)
+        if isinstance(value, str) and value in ERROR_CODES:
+            return ExcelError(value)
+        return value
+
+    def _cell(self, sheet: str, row: int, col: int) -> object:
+        key = (sheet, f"{get_column_letter(col)}{row}")
+        if key not in self._formulas:
+            return self._constant(*key)
+        if key not in self._results:
+            self._ensure(key)
+        return self._results[key]
+
+    def evaluate_node(self, node: Node, sheet: str) -> object:
+        """Value of a parsed formula node; the extension point for other evaluators."""
+        kind = node[0]
+        if kind == "const":
+            return node[1]
+        if kind == "ref":
+            ref = self._clamp(node[1])
+            if ref.sheet not in self._snapshot:
+                return ExcelError("#REF!")
+            if ref.is_cell:
+                return self._cell(ref.sheet, ref.min_row, ref.min_col)
+            return RangeValue(
+                [
+                    [self._cell(ref.sheet, row, col) for col in range(ref.min_col, ref.max_col + 1)]
+                    for row in range(ref.min_row, ref.max_row + 1)
+                ]
+            )
+        if kind == "op":
+            left, right = self.evaluate_node(node[2], sheet), self.evaluate_node(node[3], sheet)
+            return evaluate_operator(node[1], left, right)
+        if kind == "call":
+            return self._call(node[1], node[2], sheet)
+        if kind in ("neg", "pct"):
+            return evaluate_unary(kind, self.evaluate_node(node[1], sheet))
+        if kind == "array":
+            return node[1]
+        if kind == "name":
+            name_node = self._name_node(node[1], sheet)
+            if name_node is None:
+                return ExcelError("#NAME?")
+            return self.evaluate_node(name_node, sheet)
+        raise FormulaEvaluationError(f"Unknown formula node {kind!r}")
+
+    def _call(self, name: str, args: tuple[Node, ...], sheet: str) -> object:
+        kind = function_kind(name)
+        if kind is None:
+            self.unsupported_functions.add(name)
+            return ExcelError("#NAME?")
+        if kind == "lazy":
+            return call_lazy_function(
+                name, lambda index: self.evaluate_node(args[index], sheet), len(args)
+            )
+        return call_function(name, [self.evaluate_node(arg, sheet) for arg in args])
+
+
+def function_kind(name: str) -> str | None:
+    """How the engine calls worksheet function ``name``, or None when it is not implemented.
+
+    ``"lazy"`` functions (IF, IFERROR, ...) evaluate their own arguments on
+    demand; ``"eager"`` ones receive them already evaluated.
+    """
+    if name in _LAZY_FUNCTIONS:
+        return "lazy"
+    if name in _FUNCTIONS:
+        return "eager"
+    return None
+
+
+def call_function(name: str, args: list[object]) -> object:
+    """Apply an eager worksheet function to evaluated arguments.
+
+    Python arithmetic failures come back as Excel errors (``#DIV/0!``, ``#NUM!``, ...).
+    """
+    function = _FUNCTIONS.get(name)
+    if function is None:
+        return ExcelError("#NAME?")
+    return _guarded(function, args)
+
+
+def call_lazy_function(name: str, arg: Callable[[int], object], count: int) -> object:
+    """Apply a lazy worksheet function; ``arg(index)`` evaluates one argument on demand."""
+    function = _LAZY_FUNCTIONS.get(name)
+    if function is None:
+        return ExcelError("#NAME?")
+    return _guarded(function, arg, count)
+
+
+def evaluate_operator(op: str, left: object, right: object) -> object:
+    """Apply a binary operator, element by element when either side is a range."""
+    return _binary(op, left, right)
+
+
+def evaluate_unary(kind: str, value: object) -> object:
+    """Apply a ``"neg"`` or ``"pct"`` node to a value or, element by element, a range."""
+    if kind == "neg":
+        return _elementwise(_negate, value)
+    if kind == "pct":
+        return _elementwise(_percent, value)
+    raise FormulaEvaluationError(f"Unknown unary node {kind!r}")
+
+
+def recalc_snapshot(snapshot: WorkbookSnapshot, cell_map: Sequence[CellField]) -> dict[str, object]:
+    """Evaluate the formulas behind ``cell_map`` and write the results into ``snapshot``.
+
+    Every formula cell in a mapped column at or below the mapped row is a
+    target, so multi-quote workbooks are recalculated row by row as well.
+    The status is ``"failed"`` when a target evaluates to an Excel error or
+    an unsupported function was reached; ``failed_targets`` lists the former.
+    """
+    started = time.perf_counter()
+    engine = FormulaEngine(snapshot)
+
+    targets: list[tuple[str, str]] = []
+    for field in cell_map:
+        if field.sheet not in snapshot:
+            continue
+        letters, first_row = coordinate_from_string(field.cell)
+        column = column_index_from_string(letters)
+        targets.extend(
+            (field.sheet, coordinate)
+            for row, col, coordinate in engine.formula_cells(field.sheet)
+            if col == column and row >= first_row
+        )
+
+    failed_targets = []
+    for (sheet, coordinate), value in engine.evaluate(targets).items():
+        values = snapshot[sheet].values
+        if value is None:
+            values.pop(coordinate, None)
+        elif isinstance(value, ExcelError):
+            values[coordinate] = str(value)
+            failed_targets.append(f"{sheet}!{coordinate}: {value}")
+        else:
+            values[coordinate] = value
+
+    failed = bool(failed_targets or engine.unsupported_functions)
+    return {
+        "status": "failed" if failed else "ok",
+        "engine": "native",
+        "target_cells": len(targets),
+        "evaluated_cells": engine.evaluated_cells,
+        "unsupported_functions": sorted(engine.unsupported_functions),
+        "failed_targets": failed_targets,
+        "elapsed_seconds": round(time.perf_counter() - started, 4),
+    }
+
+
+class _Propagate(Exception):
+    def __init__(self, error: ExcelError) -> None:
+        super().__init__(error.code)
+        self.error = error
+
+
+def _guarded(function: Callable[..., object], *args: object) -> object:
+    """Call a worksheet function, turning Python arithmetic failures into Excel errors."""
+    try:
+        return function(*args)
+    except _Propagate as exc:
+        return exc.error
+    except FormulaEvaluationError:
+        raise
+    except ZeroDivisionError:
+        return ExcelError("#DIV/0!")
+    except IndexError:
+        return ExcelError("#VALUE!")
+    except (OverflowError, InvalidOperation, ValueError):
+        return ExcelError("#NUM!")
+
+
+def _finalize(value: object) -> object:
+    if isinstance(value, RangeValue):
+        value = value.rows[0][0] if value.rows and value.rows[0] else None
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            return ExcelError("#NUM!")
+        if value == 0:
+            return 0.0
+    return value
+
+
+def _scalar(value: object) -> object:
+    if isinstance(value, RangeValue):
+        if value.height == 1 and value.width == 1:
+            return value.rows[0][0]
+        return ExcelError("#VALUE!")
+    return value
+
+
+def _is_number(value: object) -> TypeGuard[float | int]:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _to_number(value: object) -> float | int | ExcelError:
+    if isinstance(value, bool):
+        return int(value)
+    if value is None:
+        return 0
+    if isinstance(value, (int, float, ExcelError)):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            return ExcelError("#VALUE!")
+    return ExcelError("#VALUE!")
+
+
+def _to_text(value: object) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float):
+        if value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+        return format(value, ".15g").upper()
+    return str(value)
+
+
+def _to_bool(value: object) -> bool | ExcelError:
+    if isinstance(value, (bool, ExcelError)):
+        return value
+    if value is None:
+        return False
+    if isinstance(value, (int, float)):
+        return value != 0
+    if isinstance(value, str) and value.strip().upper() in ("TRUE", "FALSE"):
+        return value.strip().upper() == "TRUE"
+    return ExcelError("#VALUE!")
+
+
+def _number(value: object) -> float | int:
+    number = _to_number(_scalar(value))
+    if isinstance(number, ExcelError):
+        raise _Propagate(number)
+    return number
+
+
+def _integer(value: object) -> int:
+    return math.trunc(_number(value))
+
+
+def _text(value: object) -> str:
+    value = _scalar(value)
+    if isinstance(value, ExcelError):
+        raise _Propagate(value)
+    return _to_text(value)
+
+
+def _boolean(value: object) -> bool:
+    flag = _to_bool(_scalar(value))
+    if isinstance(flag, ExcelError):
+        raise _Propagate(flag)
+    return flag
+
+
+def _as_range(value: object) -> RangeValue:
+    return value if isinstance(value, RangeValue) else RangeValue([[value]])
+
+
+def _type_rank(value: object) -> int:
+    if isinstance(value, bool):
+        return 2
+    if isinstance(value, str):
+        return 1
+    return 0
+
+
+def _comparable(value: object, other: object) -> object:
+    if value is None:
+        if isinstance(other, str):
+            return ""
+        if isinstance(other, bool):
+            return False
+        return 0
+    return value
+
+
+def _compare(op: str, left: object, right: object) -> bool:
+    left, right = _comparable(left, right), _comparable(right, left)
+    left_rank, right_rank = _type_rank(left), _type_rank(right)
+    if left_rank != right_rank:
+        return _COMPARISONS[op](left_rank, right_rank)
+    if left_rank == 1:
+        return _COMPARISONS[op](str(left).lower(), str(right).lower())
+    return _COMPARISONS[op](left, right)
+
+
+def _elementwise(function: Callable[[object], object], value: object) -> object:
+    if isinstance(value, RangeValue):
+        return RangeValue([[function(item) for item in row] for row in value.rows])
+    return function(value)
+
+
+def _negate(value: object) -> object:
+    number = _to_number(value)
+    return number if isinstance(number, ExcelError) else -number
+
+
+def _percent(value: object) -> object:
+    number = _to_number(value)
+    return number if isinstance(number, ExcelError) else number / 100
+
+
+def _binary(op: str, left: object, right: object) -> object:
+    if isinstance(left, RangeValue) or isinstance(right, RangeValue):
+        left_range, right_range = _as_range(left), _as_range(right)
+        height = max(left_range.height, right_range.height)
+        width = max(left_range.width, right_range.width)
+        return RangeValue(
+            [
+                [
+                    _binary_scalar(
+                        op,
+                        _broadcast(left_range, row, col),
+                        _broadcast(right_range, row, col),
+                    )
+                    for col in range(width)
+                ]
+                for row in range(height)
+            ]
+        )
+    return _binary_scalar(op, left, right)
+
+
+def _broadcast(value: RangeValue, row: int, col: int) -> object:
+    row = 0 if value.height == 1 else row
+    col = 0 if value.width == 1 else col
+    if row >= value.height or col >= value.width:
+        return ExcelError("#N/A")
+    return value.rows[row][col]
+
+
+def _binary_scalar(op: str, left: object, right: object) -> object:
+    if isinstance(left, ExcelError):
+        return left
+    if isinstance(right, ExcelError):
+        return right
+    if op == "&":
+        return _to_text(left) + _to_text(right)
+    if op in _COMPARISONS:
+        return _compare(op, left, right)
+
+    a, b = _to_number(left), _to_number(right)
+    if isinstance(a, ExcelError):
+        return a
+    if isinstance(b, ExcelError):
+        return b
+    if op == "+":
+        return a + b
+    if op == "-":
+        return a - b
+    if op == "*":
+        return a * b
+    if op == "/":
+        return ExcelError("#DIV/0!") if b == 0 else a / b
+    if a == 0 and b < 0:
+        return ExcelError("#DIV/0!")
+    try:
+        result = float(a) ** b
+    except (OverflowError, ZeroDivisionError):
+        return ExcelError("#NUM!")
+    return ExcelError("#NUM!") if isinstance(result, complex) else result
+
+
+def _numbers(args: Sequence[object]) -> list[float | int]:
+    """SUM-style argument expansion: ranges contribute numbers only, scalars are coerced."""
+    numbers: list[float | int] = []
+    for arg in args:
+        if isinstance(arg, RangeValue):
+            for value in arg.flat():
+                if isinstance(value, ExcelError):
+                    raise _Propagate(value)
+                if _is_number(value):
+                    numbers.append(value)
+        elif arg is not None:
+            numbers.append(_number(arg))
+    return numbers
+
+
+def _decimal(value: float | int) -> Decimal:
+    return Decimal(repr(value)) if isinstance(value, float) else Decimal(value)
+
+
+def _round_to(number: float | int, digits: int, rounding: str) -> float:
+    quantum = Decimal(1).scaleb(-digits)
+    return float(_decimal(number).quantize(quantum, rounding=rounding))
+
+
+def _round_multiple(number: float | int, significance: float | int, rounding: str) -> float:
+    if significance == 0:
+        return 0.0
+    step = _decimal(significance)
+    return float((_decimal(number) / step).to_integral_value(rounding=rounding) * step)
+
+
+def _fn_round(args: list[object]) -> object:
+    return _round_to(_number(args[0]), _integer(args[1]), ROUND_HALF_UP)
+
+
+def _fn_roundup(args: list[object]) -> object:
+    return _round_to(_number(args[0]), _integer(args[1]), ROUND_UP)
+
+
+def _fn_rounddown(args: list[object]) -> object:
+    return _round_to(_number(args[0]), _integer(args[1]), ROUND_DOWN)
+
+
+def _fn_trunc(args: list[object]) -> object:
+    digits = _integer(args[1]) if len(args) > 1 else 0
+    return _round_to(_number(args[0]), digits, ROUND_DOWN)
+
+
+def _fn_ceiling(args: list[object]) -> object:
+    number = _number(args[0])
+    significance = _number(args[1]) if len(args) > 1 else 1
+    if number > 0 and significance < 0:
+        return ExcelError("#NUM!")
+    return _round_multiple(number, significance, ROUND_CEILING)
+
+
+def _fn_floor(args: list[object]) -> object:
+    number = _number(args[0])
+    significance = _number(args[1]) if len(args) > 1 else 1
+    if significance == 0:
+        return ExcelError("#DIV/0!")
+    if number > 0 and significance < 0:
+        return ExcelError("#NUM!")
+    return _round_multiple(number, significance, ROUND_FLOOR)
+
+
+def _fn_ceiling_math(args: list[object]) -> object:
+    number = _number(args[0])
+    significance = abs(_number(args[1])) if len(args) > 1 and args[1] is not None else 1
+    away = len(args) > 2 and number < 0 and _number(args[2]) != 0
+    return _round_multiple(number, significance, ROUND_FLOOR if away else ROUND_CEILING)
+
+
+def _fn_floor_math(args: list[object]) -> object:
+    number = _number(args[0])
+    significance = abs(_number(args[1])) if len(args) > 1 and args[1] is not None else 1
+    toward_zero = len(args) > 2 and number < 0 and _number(args[2]) != 0
+    return _round_multiple(number, significance, ROUND_CEILING if toward_zero else ROUND_FLOOR)
+
+
+def _fn_mround(args: list[object]) -> object:
+    number, multiple = _number(args[0]), _number(args[1])
+    if number * multiple < 0:
+        return ExcelError("#NUM!")
+    return _round_multiple(number, multiple, ROUND_HALF_UP)
+
+
+def _fn_mod(args: list[object]) -> object:
+    number, divisor = _number(args[0]), _number(args[1])
+    if divisor == 0:
+        return ExcelError("#DIV/0!")
+    return number - divisor * math.floor(number / divisor)
+
+
+def _fn_sqrt(args: list[object]) -> object:
+    number = _number(args[0])
+    return ExcelError("#NUM!") if number < 0 else math.sqrt(number)
+
+
+def _fn_average(args: list[object]) -> object:
+    numbers = _numbers(args)
+    return sum(numbers) / len(numbers) if numbers else ExcelError("#DIV/0!")
+
+
+def _fn_count(args: list[object]) -> object:
+    count = 0
+    for arg in args:
+        if isinstance(arg, RangeValue):
+            count += sum(1 for value in arg.flat() if _is_number(value))
+        elif arg is not None and not isinstance(_to_number(arg), ExcelError):
+            count += 1
+    return count
+
+
+def _fn_counta(args: list[object]) -> object:
+    count = 0
+    for arg in args:
+        if isinstance(arg, RangeValue):
+            count += sum(1 for value in arg.flat() if value is not None)
+        elif arg is not None:
+            count += 1
+    return count
+
+
+def _fn_product(args: list[object]) -> object:
+    # Excel returns 0, not the empty product 1, when no argument holds a number.
+    numbers = _numbers(args)
+    return math.prod(numbers) if numbers else 0
+
+
+def _fn_sumproduct(args: list[object]) -> object:
+    arrays = [_as_range(arg) for arg in args]
+    shape = (arrays[0].height, arrays[0].width)
+    if any((array.height, array.width) != shape for array in arrays):
+        return ExcelError("#VALUE!")
+    total: float | int = 0
+    for values in zip(*(list(array.flat()) for array in arrays)):
+        product: float | int = 1
+        for value in values:
+            if isinstance(value, ExcelError):
+                return value
+            product *= value if _is_number(value) else 0
+        total += product
+    return total
+
+
+def _logical_values(args: list[object]) -> list[bool]:
+    flags: list[bool] = []
+    for arg in args:
+        if isinstance(arg, RangeValue):
+            for value in arg.flat():
+                if isinstance(value, ExcelError):
+                    raise _Propagate(value)
+                if isinstance(value, (bool, int, float)):
+                    flags.append(bool(value))
+        elif arg is not None:
+            flags.append(_boolean(arg))
+    if not flags:
+        raise _Propagate(ExcelError("#VALUE!"))
+    return flags
+
+
+def _wildcard_pattern(text: str) -> re.Pattern[str]:
+    parts: list[str] = []
+    escaped = False
+    for char in text:
+        if escaped:
+            parts.append(re.escape(char))
+            escaped = False
+        elif char == "~":
+            escaped = True
+        elif char == "*":
+            parts.append(".*")
+        elif char == "?":
+            parts.append(".")
+        else:
+            parts.append(re.escape(char))
+    return re.compile("".join(parts), re.IGNORECASE | re.DOTALL)
+
+
+def _criteria_predicate(criteria: object) -> Callable[[object], bool]:
+    criteria = _scalar(criteria)
+    if isinstance(criteria, ExcelError):
+        raise _Propagate(criteria)
+    if not isinstance(criteria, str):
+        target = _to_number(criteria)
+        return lambda value: _is_number(value) and value == target
+
+    op = "="
+    for candidate in (">=", "<=", "<>", ">", "<", "="):
+        if criteria.startswith(candidate):
+            op, criteria = candidate, criteria[len(candidate):]
+            break
+
+    try:
+        number = float(criteria)
+    except ValueError:
+        number = None
+    if number is not None:
+        if op == "<>":
+            return lambda value: not (_is_number(value) and value == number)
+        return lambda value: _is_number(value) and _COMPARISONS[op](value, number)
+
+    if criteria == "":
+        if op == "<>":
+            return lambda value: value not in (None, "")
+        return lambda value: value in (None, "")
+
+    if op in ("=", "<>"):
+        pattern = _wildcard_pattern(criteria)
+
+        def _matches(value: object) -> bool:
+            return isinstance(value, str) and pattern.fullmatch(value) is not None
+
+        return _matches if op == "=" else (lambda value: not _matches(value))
+
+    lowered = criteria.lower()
+    return lambda value: isinstance(value, str) and _COMPARISONS[op](value.lower(), lowered)
+
+
+def _criteria_mask(pairs: Sequence[tuple[object, object]]) -> tuple[tuple[int, int], list[bool]]:
+    mask: list[bool] | None = None
+    shape: tuple[int, int] | None = None
+    for criteria_range, criteria in pairs:
+        values = _as_range(criteria_range)
+        if shape is None:
+            shape = (values.height, values.width)
+        elif (values.height, values.width) != shape:
+            raise _Propagate(ExcelError("#VALUE!"))
+        predicate = _criteria_predicate(criteria)
+        matches = [predicate(value) for value in values.flat()]
+        mask = matches if mask is None else [a and b for a, b in zip(mask, matches)]
+    assert shape is not None and mask is not None
+    return shape, mask
+
+
+def _masked_numbers(values: object, shape: tuple[int, int], mask: list[bool]) -> list[float | int]:
+    values = _as_range(values)
+    if (values.height, values.width) != shape:
+        raise _Propagate(ExcelError("#VALUE!"))
+    numbers: list[float | int] = []
+    for value, selected in zip(values.flat(), mask):
+        if not selected:
+            continue
+        if isinstance(value, ExcelError):
+            raise _Propagate(value)
+        if _is_number(value):
+            numbers.append(value)
+    return numbers
+
+
+def _criteria_pairs(args: Sequence[object]) -> list[tuple[object, object]]:
+    if len(args) < 2 or len(args) % 2:
+        raise IndexError("criteria arguments come in pairs")
+    return [(args[idx], args[idx + 1]) for idx in range(0, len(args), 2)]
+
+
+def _fn_sumif(args: list[object]) -> object:
+    shape, mask = _criteria_mask([(args[0], args[1])])
+    sum_range = args[2] if len(args) > 2 and args[2] is not None else args[0]
+    return sum(_masked_numbers(sum_range, shape, mask))
+
+
+def _fn_sumifs(args: list[object]) -> object:
+    shape, mask = _criteria_mask(_criteria_pairs(args[1:]))
+    return sum(_masked_numbers(args[0], shape, mask))
+
+
+def _fn_countif(args: list[object]) -> object:
+    return sum(_criteria_mask([(args[0], args[1])])[1])
+
+
+def _fn_countifs(args: list[object]) -> object:
+    return sum(_criteria_mask(_criteria_pairs(args))[1])
+
+
+def _fn_averageif(args: list[object]) -> object:
+    shape, mask = _criteria_mask([(args[0], args[1])])
+    numbers = _masked_numbers(args[2] if len(args) > 2 else args[0], shape, mask)
+    return sum(numbers) / len(numbers) if numbers else ExcelError("#DIV/0!")
+
+
+def _fn_averageifs(args: list[object]) -> object:
+    shape, mask = _criteria_mask(_criteria_pairs(args[1:]))
+    numbers = _masked_numbers(args[0], shape, mask)
+    return sum(numbers) / len(numbers) if numbers else ExcelError("#DIV/0!")
+
+
+def _fn_maxifs(args: list[object]) -> object:
+    shape, mask = _criteria_mask(_criteria_pairs(args[1:]))
+    return max(_masked_numbers(args[0], shape, mask), default=0)
+
+
+def _fn_minifs(args: list[object]) -> object:
+    shape, mask = _criteria_mask(_criteria_pairs(args[1:]))
+    return min(_masked_numbers(args[0], shape, mask), default=0)
+
+
+def _lookup_value(value: object) -> object:
+    value = _scalar(value)
+    if isinstance(value, ExcelError):
+        raise _Propagate(value)
+    return value
+
+
+def _values_equal(value: object, lookup: object, wildcards: bool) -> bool:
+    if isinstance(lookup, str):
+        if not isinstance(value, str):
+            return False
+        if wildcards and any(char in lookup for char in "*?~"):
+            return _wildcard_pattern(lookup).fullmatch(value) is not None
+        return value.lower() == lookup.lower()
+    if value is None or _type_rank(value) != _type_rank(lookup):
+        return False
+    return value == lookup
+
+
+def _row_col(coordinate: str) -> tuple[int, int]:
+    letters, row = coordinate_from_string(coordinate)
+    return row, column_index_from_string(letters)
+
+
+def _exact_position(values: Sequence[object], lookup: object, wildcards: bool = True) -> int | None:
+    for index, value in enumerate(values):
+        if _values_equal(value, lookup, wildcards):
+            return index
+    return None
+
+
+def _approximate_position(
+    values: Sequence[object],
+    lookup: object,
+    descending: bool = False,
+) -> int | None:
+    found = None
+    for index, value in enumerate(values):
+        if value is None or isinstance(value, ExcelError):
+            continue
+        if _type_rank(value) != _type_rank(lookup):
+            continue
+        if _compare(">=" if descending else "<=", value, lookup):
+            found = index
+        else:
+            break
+    return found
+
+
+def _fn_vlookup(args: list[object]) -> object:
+    lookup = _lookup_value(args[0])
+    table = _as_range(args[1])
+    column = _integer(args[2])
+    approximate = len(args) < 4 or (args[3] is not None and _boolean(args[3]))
+    if column < 1:
+        return ExcelError("#VALUE!")
+    if column > table.width:
+        return ExcelError("#REF!")
+
+    keys = table.column(0)
+    position = _approximate_position(keys, lookup) if approximate else _exact_position(keys, lookup)
+    if position is None:
+        return ExcelError("#N/A")
+    return table.rows[position][column - 1]
+
+
+def _fn_hlookup(args: list[object]) -> object:
+    lookup = _lookup_value(args[0])
+    table = _as_range(args[1])
+    row = _integer(args[2])
+    approximate = len(args) < 4 or (args[3] is not None and _boolean(args[3]))
+    if row < 1:
+        return ExcelError("#VALUE!")
+    if row > table.height:
+        return ExcelError("#REF!")
+
+    keys = table.rows[0]
+    position = _approximate_position(keys, lookup) if approximate else _exact_position(keys, lookup)
+    if position is None:
+        return ExcelError("#N/A")
+    return table.rows[row - 1][position]
+
+
+def _fn_match(args: list[object]) -> object:
+    lookup = _lookup_value(args[0])
+    values = _as_range(args[1])
+    if values.height > 1 and values.width > 1:
+        return ExcelError("#N/A")
+    match_type = _integer(args[2]) if len(args) > 2 and args[2] is not None else 1
+    flat = list(values.flat())
+    if match_type == 0:
+        position = _exact_position(flat, lookup)
+    else:
+        position = _approximate_position(flat, lookup, descending=match_type < 0)
+    return ExcelError("#N/A") if position is None else position + 1
+
+
+def _fn_index(args: list[object]) -> object:
+    array = _as_range(args[0])
+    row = _integer(args[1]) if len(args) > 1 and args[1] is not None else 0
+    col = _integer(args[2]) if len(args) > 2 and args[2] is not None else 0
+    if len(args) == 2 and array.height == 1:
+        row, col = 1, row
+    if row < 0 or col < 0 or row > array.height or col > array.width:
+        return ExcelError("#REF!")
+    if row == 0 and col == 0:
+        return array
+    if row == 0:
+        return RangeValue([[value] for value in array.column(col - 1)])
+    if col == 0:
+        if array.width == 1:
+            return array.rows[row - 1][0]
+        return RangeValue([list(array.rows[row - 1])])
+    return array.rows[row - 1][col - 1]
+
+
+def _fn_xlookup(args: list[object]) -> object:
+    lookup = _lookup_value(args[0])
+    lookup_array = _as_range(args[1])
+    return_array = _as_range(args[2])
+    if_not_found = args[3] if len(args) > 3 and args[3] is not None else ExcelError("#N/A")
+    match_mode = _integer(args[4]) if len(args) > 4 and args[4] is not None else 0
+    search_mode = _integer(args[5]) if len(args) > 5 and args[5] is not None else 1
+
+    vertical = lookup_array.width == 1
+    keys = lookup_array.column(0) if vertical else list(lookup_array.rows[0])
+    indexes = list(range(len(keys)))
+    if search_mode < 0:
+        indexes.reverse()
+
+    position = None
+    for index in indexes:
+        if _values_equal(keys[index], lookup, wildcards=match_mode == 2):
+            position = index
+            break
+    if position is None and match_mode in (-1, 1):
+        best = None
+        for index in indexes:
+            key = keys[index]
+            if key is None or isinstance(key, ExcelError) or _type_rank(key) != _type_rank(lookup):
+                continue
+            if not _compare("<" if match_mode == -1 else ">", key, lookup):
+                continue
+            if best is None or _compare(">" if match_mode == -1 else "<", key, keys[best]):
+                best = index
+        position = best
+    if position is None:
+        return if_not_found
+
+    if vertical:
+        if position >= return_array.height:
+            return ExcelError("#VALUE!")
+        if return_array.width == 1:
+            return return_array.rows[position][0]
+        return RangeValue([list(return_array.rows[position])])
+    if position >= return_array.width:
+        return ExcelError("#VALUE!")
+    if return_array.height == 1:
+        return return_array.rows[0][position]
+    return RangeValue([[value] for value in return_array.column(position)])
+
+
+def _fn_concatenate(args: list[object]) -> object:
+    return "".join(_text(arg) for arg in args)
+
+
+def _fn_concat(args: list[object]) -> object:
+    parts: list[str] = []
+    for arg in args:
+        for value in _as_range(arg).flat():
+            parts.append(_text(value))
+    return "".join(parts)
+
+
+def _fn_textjoin(args: list[object]) -> object:
+    delimiter = _text(args[0])
+    ignore_empty = _boolean(args[1])
+    parts: list[str] = []
+    for arg in args[2:]:
+        for value in _as_range(arg).flat():
+            text = _text(value)
+            if text or not ignore_empty:
+                parts.append(text)
+    return delimiter.join(parts)
+
+
+def _fn_left(args: list[object]) -> object:
+    count = _integer(args[1]) if len(args) > 1 else 1
+    return ExcelError("#VALUE!") if count < 0 else _text(args[0])[:count]
+
+
+def _fn_right(args: list[object]) -> object:
+    count = _integer(args[1]) if len(args) > 1 else 1
+    if count < 0:
+        return ExcelError("#VALUE!")
+    text = _text(args[0])
+    return text[len(text) - count:] if count else ""
+
+
+def _fn_mid(args: list[object]) -> object:
+    start, count = _integer(args[1]), _integer(args[2])
+    if start < 1 or count < 0:
+        return ExcelError("#VALUE!")
+    return _text(args[0])[start - 1:start - 1 + count]
+
+
+def _fn_trim(args: list[object]) -> object:
+    return " ".join(part for part in _text(args[0]).split(" ") if part)
+
+
+def _fn_substitute(args: list[object]) -> object:
+    text, old, new = _text(args[0]), _text(args[1]), _text(args[2])
+    if not old:
+        return text
+    if len(args) < 4:
+        return text.replace(old, new)
+    instance = _integer(args[3])
+    if instance < 1:
+        return ExcelError("#VALUE!")
+    position = -1
+    for _ in range(instance):
+        position = text.find(old, position + 1)
+        if position < 0:
+            return text
+    return text[:position] + new + text[position + len(old):]
+
+
+def _fn_value(args: list[object]) -> object:
+    value = _scalar(args[0])
+    if _is_number(value):
+        return value
+    text = _text(value).strip().replace(",", "")
+    try:
+        if text.endswith("%"):
+            return float(text[:-1]) / 100
+        return float(text)
+    except ValueError:
+        return ExcelError("#VALUE!")
+
+
+def _is_check(predicate: Callable[[object], bool]) -> Callable[[list[object]], object]:
+    return lambda args: predicate(_scalar(args[0]))
+
+
+def _lazy_if(arg: Callable[[int], object], count: int) -> object:
+    condition = _boolean(arg(0))
+    if condition:
+        return arg(1) if count > 1 else True
+    return arg(2) if count > 2 else False
+
+
+def _lazy_iferror(arg: Callable[[int], object], count: int) -> object:
+    value = arg(0)
+    return arg(1) if isinstance(_scalar(value), ExcelError) else value
+
+
+def _lazy_ifna(arg: Callable[[int], object], count: int) -> object:
+    value = arg(0)
+    scalar = _scalar(value)
+    return arg(1) if isinstance(scalar, ExcelError) and scalar.code == "#N/A" else value
+
+
+def _lazy_ifs(arg: Callable[[int], object], count: int) -> object:
+    for index in range(0, count - 1, 2):
+        if _boolean(arg(index)):
+            return arg(index + 1)
+    return ExcelError("#N/A")
+
+
+def _lazy_choose(arg: Callable[[int], object], count: int) -> object:
+    index = _integer(arg(0))
+    if index < 1 or index >= count:
+        return ExcelError("#VALUE!")
+    return arg(index)
+
+
+def _lazy_switch(arg: Callable[[int], object], count: int) -> object:
+    value = _lookup_value(arg(0))
+    for index in range(1, count - 1, 2):
+        candidate = _lookup_value(arg(index))
+        if _compare("=", value, candidate):
+            return arg(index + 1)
+    return arg(count - 1) if count % 2 == 0 else ExcelError("#N/A")
+
+
+_FUNCTIONS: dict[str, Callable[[list[object]], object]] = {
+    "SUM": lambda args: sum(_numbers(args)),
+    "MIN": lambda args: min(_numbers(args), default=0),
+    "MAX": lambda args: max(_numbers(args), default=0),
+    "AVERAGE": _fn_average,
+    "COUNT": _fn_count,
+    "COUNTA": _fn_counta,
+    "PRODUCT": _fn_product,
+    "SUMPRODUCT": _fn_sumproduct,
+    "SUMIF": _fn_sumif,
+    "SUMIFS": _fn_sumifs,
+    "COUNTIF": _fn_countif,
+    "COUNTIFS": _fn_countifs,
+    "AVERAGEIF": _fn_averageif,
+    "AVERAGEIFS": _fn_averageifs,
+    "MAXIFS": _fn_maxifs,
+    "MINIFS": _fn_minifs,
+    "ROUND": _fn_round,
+    "ROUNDUP": _fn_roundup,
+    "ROUNDDOWN": _fn_rounddown,
+    "TRUNC": _fn_trunc,
+    "INT": lambda args: math.floor(_number(args[0])),
+    "CEILING": _fn_ceiling,
+    "CEILING.MATH": _fn_ceiling_math,
+    "FLOOR": _fn_floor,
+    "FLOOR.MATH": _fn_floor_math,
+    "MROUND": _fn_mround,
+    "ABS": lambda args: abs(_number(args[0])),
+    "SIGN": lambda args: (_number(args[0]) > 0) - (_number(args[0]) < 0),
+    "MOD": _fn_mod,
+    "POWER": lambda args: _binary_scalar("^", _number(args[0]), _number(args[1])),
+    "SQRT": _fn_sqrt,
+    "AND": lambda args: all(_logical_values(args)),
+    "OR": lambda args: any(_logical_values(args)),
+    "XOR": lambda args: sum(_logical_values(args)) % 2 == 1,
+    "NOT": lambda args: not _boolean(args[0]),
+    "TRUE": lambda args: True,
+    "FALSE": lambda args: False,
+    "NA": lambda args: ExcelError("#N/A"),
+    "ISBLANK": _is_check(lambda value: value is None),
+    "ISNUMBER": _is_check(_is_number),
+    "ISTEXT": _is_check(lambda value: isinstance(value, str)),
+    "ISLOGICAL": _is_check(lambda value: isinstance(value, bool)),
+    "ISERROR": _is_check(lambda value: isinstance(value, ExcelError)),
+    "ISNA": _is_check(lambda value: isinstance(value, ExcelError) and value.code == "#N/A"),
+    "VLOOKUP": _fn_vlookup,
+    "HLOOKUP": _fn_hlookup,
+    "MATCH": _fn_match,
+    "INDEX": _fn_index,
+    "XLOOKUP": _fn_xlookup,
+    "CONCATENATE": _fn_concatenate,
+    "CONCAT": _fn_concat,
+    "TEXTJOIN": _fn_textjoin,
+    "LEFT": _fn_left,
+    "RIGHT": _fn_right,
+    "MID": _fn_mid,
+    "LEN": lambda args: len(_text(args[0])),
+    "UPPER": lambda args: _text(args[0]).upper(),
+    "LOWER": lambda args: _text(args[0]).lower(),
+    "PROPER": lambda args: _text(args[0]).title(),
+    "TRIM": _fn_trim,
+    "SUBSTITUTE": _fn_substitute,
+    "VALUE": _fn_value,
+    "SINGLE": lambda args: _scalar(args[0]),
+}
+
+_LAZY_FUNCTIONS: dict[str, Callable[[Callable[[int], object], int], object]] = {
+    "IF": _lazy_if,
+    "IFERROR": _lazy_iferror,
+    "IFNA": _lazy_ifna,
+    "IFS": _lazy_ifs,
+    "CHOOSE": _lazy_choose,
+    "SWITCH": _lazy_switch,
+}
@@ -1,24 +1,42 @@
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import re
+import zipfile
 
 from openpyxl import load_workbook
 
 from .models import FormulaIssue, FormulaValidationReport
+from .workbook_reader import SheetPart, WorkbookSnapshot, iter_sheet_formulas, read_workbook_parts
+
+
+BAD_TOKENS = ("#REF!", "#DIV/0!", "#VALUE!", "#N/A", "#NAME?")
+
+_BAD_TOKEN_PATTERN = re.compile("|".join(re.escape(token) for token in BAD_TOKENS), re.IGNORECASE)
+_SHEET_REF_PATTERN = re.compile(r"(?:'([^']+)'|([A-Za-z_][A-Za-z0-9_]*))!")
+_STRING_LITERAL_PATTERN = re.compile(r'"(?:[^"]|"")*"')
 
 
 class WorkbookFormulaValidator:
-    BAD_TOKENS = ["#REF!", "#DIV/0!", "#VALUE!", "#N/A", "#NAME?"]
+    ENGINES = ("openpyxl", "stream")
 
-    _SHEET_REF_PATTERN = re.compile(r"(?:'([^']+)'|([A-Za-z_][A-Za-z0-9_]*))!")
-    _STRING_LITERAL_PATTERN = re.compile(r'"(?:[^"]|"")*"')
+    def __init__(self, engine: str = "openpyxl", workers: int = 1) -> None:
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown validator engine: {engine}. Expected one of {self.ENGINES}.")
+        self._engine = engine
+        self._workers = workers
 
     def validate(self, workbook_path: Path | str) -> FormulaValidationReport:
         workbook_path = Path(workbook_path)
+        if self._workers > 1:
+            return self._validate_parallel(workbook_path)
+        if self._engine == "stream":
+            return self._validate_stream(workbook_path)
+
         wb = load_workbook(workbook_path, data_only=False, read_only=True)
 
-        known_sheets = set(wb.sheetnames)
+        templates = _FormulaTemplateCache(set(wb.sheetnames))
         total_formulas = 0
         issues: list[FormulaIssue] = []
 
@@ -32,39 +50,170 @@ class WorkbookFormulaValidator:
                         continue
 
                     total_formulas += 1
-                    upper_formula = value.upper()
-
-                    for token in self.BAD_TOKENS:
-                        if token in upper_formula:
-                            issues.append(
-                                FormulaIssue(
-                                    sheet=ws.title,
-                                    cell=cell.coordinate,
-                                    code="ERROR_TOKEN",
-                                    detail=f"Found token {token}",
-                                )
-                            )
-
-                    formula_without_strings = self._STRING_LITERAL_PATTERN.sub("", value)
-                    for match in self._SHEET_REF_PATTERN.finditer(formula_without_strings):
-                        ref_sheet = (match.group(1) or match.group(2) or "").strip()
-                        if ref_sheet and ref_sheet not in known_sheets:
-                            issues.append(
-                                FormulaIssue(
-                                    sheet=ws.title,
-                                    cell=cell.coordinate,
-                                    code="UNKNOWN_SHEET_REF",
-                                    detail=f"Unknown sheet reference: {ref_sheet}",
-                                )
-                            )
+                    templates.check(ws.title, cell.coordinate, value, issues)
 
         wb.close()
+        return self._report(workbook_path, total_formulas, issues, templates)
+
+    def _validate_stream(self, workbook_path: Path) -> FormulaValidationReport:
+        total_formulas = 0
+        issues: list[FormulaIssue] = []
+
+        with zipfile.ZipFile(workbook_path) as archive:
+            parts = read_workbook_parts(archive)
+            templates = _FormulaTemplateCache(set(parts.sheetnames))
+            for sheet_part in parts.worksheets:
+                with archive.open(sheet_part.part_name) as stream:
+                    for coordinate, formula in iter_sheet_formulas(stream):
+                        total_formulas += 1
+                        templates.check(sheet_part.title, coordinate, formula, issues)
+
+        return self._report(workbook_path, total_formulas, issues, templates)
+
+    def _validate_parallel(self, workbook_path: Path) -> FormulaValidationReport:
+        with zipfile.ZipFile(workbook_path) as archive:
+            parts = read_workbook_parts(archive)
+        known_sheets = set(parts.sheetnames)
+
+        workers = min(self._workers, len(parts.worksheets))
+        if workers <= 1:
+            return self._validate_stream(workbook_path)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_validate_sheet_part, workbook_path, sheet_part, known_sheets)
+                for sheet_part in parts.worksheets
+            ]
+            sheet_results = [future.result() for future in futures]
+
+        total_formulas = 0
+        issues: list[FormulaIssue] = []
+        templates: set[str] = set()
+        for sheet_total, sheet_issues, sheet_templates in sheet_results:
+            total_formulas += sheet_total
+            issues.extend(sheet_issues)
+            templates |= sheet_templates
+
         return FormulaValidationReport(
             workbook_path=str(workbook_path),
             total_formulas=total_formulas,
             issues=_dedupe_issues(issues),
+            formula_templates=len(templates),
         )
 
+    def validate_snapshot(self, snapshot: WorkbookSnapshot) -> FormulaValidationReport:
+        templates = _FormulaTemplateCache(set(snapshot.sheetnames))
+        total_formulas = 0
+        issues: list[FormulaIssue] = []
+
+        for ws in snapshot.worksheets:
+            for coordinate, formula in ws.formulas:
+                total_formulas += 1
+                templates.check(ws.title, coordinate, formula, issues)
+
+        return self._report(snapshot.workbook_path, total_formulas, issues, templates)
+
+    def _report(
+        self,
+        workbook_path: Path | str,
+        total_formulas: int,
+        issues: list[FormulaIssue],
+        templates: _FormulaTemplateCache,
+    ) -> FormulaValidationReport:
+        return FormulaValidationReport(
+            workbook_path=str(workbook_path),
+            total_formulas=total_formulas,
+            issues=_dedupe_issues(issues),
+            formula_templates=len(templates),
+        )
+
+
+def analyze_formula(formula: str, known_sheets: set[str]) -> tuple[tuple[str, str], ...]:
+    """``(code, detail)`` findings for one formula: error tokens and unknown sheet refs."""
+    findings: list[tuple[str, str]] = []
+
+    found_tokens = {match.group(0).upper() for match in _BAD_TOKEN_PATTERN.finditer(formula)}
+    for token in BAD_TOKENS:
+        if token in found_tokens:
+            findings.append(("ERROR_TOKEN", f"Found token {token}"))
+
+    formula_without_strings = _STRING_LITERAL_PATTERN.sub("", formula)
+    for match in _SHEET_REF_PATTERN.finditer(formula_without_strings):
+        ref_sheet = (match.group(1) or match.group(2) or "").strip()
+        if ref_sheet and ref_sheet not in known_sheets:
+            findings.append(("UNKNOWN_SHEET_REF", f"Unknown sheet reference: {ref_sheet}"))
+
+    return tuple(findings)
+
+
+class _FormulaTemplateCache:
+    """Memoizes formula analysis per position-independent formula template.
+
+    Formulas dragged across a sheet only differ in their cell references and
+    neither check looks at those, so every cell sharing a template reuses the
+    findings of the first cell analyzed.
+    """
+
+    def __init__(self, known_sheets: set[str]) -> None:
+        self._known_sheets = known_sheets
+        self._findings: dict[str, tuple[tuple[str, str], ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._findings)
+
+    @property
+    def templates(self) -> set[str]:
+        return set(self._findings)
+
+    def check(self, sheet: str, coordinate: str, formula: str, issues: list[FormulaIssue]) -> None:
+        template = formula_template(formula)
+        findings = self._findings.get(template)
+        if findings is None:
+            findings = analyze_formula(formula, self._known_sheets)
+            self._findings[template] = findings
+
+        for code, detail in findings:
+            issues.append(FormulaIssue(sheet=sheet, cell=coordinate, code=code, detail=detail))
+
+
+_REF_PLACEHOLDER = "RC"
+_CELL_REF = r"(?<![A-Za-z0-9_.$])(?<!#[Nn]/)\$?[A-Za-z]{1,3}\$?\d+(?![A-Za-z0-9_(!])"
+_CELL_REF_PATTERN = re.compile(_CELL_REF)
+_QUOTED_OR_CELL_REF_PATTERN = re.compile(r"""("(?:[^"]|"")*"|'(?:[^']|'')*')|""" + _CELL_REF)
+
+
+def formula_template(formula: str) -> str:
+    """Return ``formula`` with every A1 cell reference replaced by ``RC``.
+
+    This is the R1C1 form of the formula with the offsets dropped: string
+    literals and quoted sheet names are kept verbatim.
+    """
+    if '"' not in formula and "'" not in formula:
+        return _CELL_REF_PATTERN.sub(_REF_PLACEHOLDER, formula)
+    return _QUOTED_OR_CELL_REF_PATTERN.sub(_keep_quoted, formula)
+
+
+def _keep_quoted(match: re.Match[str]) -> str:
+    return match.group(1) or _REF_PLACEHOLDER
+
+
+def _validate_sheet_part(
+    workbook_path: Path,
+    sheet_part: SheetPart,
+    known_sheets: set[str],
+) -> tuple[int, list[FormulaIssue], set[str]]:
+    templates = _FormulaTemplateCache(known_sheets)
+    total_formulas = 0
+    issues: list[FormulaIssue] = []
+
+    with zipfile.ZipFile(workbook_path) as archive:
+        with archive.open(sheet_part.part_name) as stream:
+            for coordinate, formula in iter_sheet_formulas(stream):
+                total_formulas += 1
+                templates.check(sheet_part.title, coordinate, formula, issues)
+
+    return total_formulas, issues, templates.templates
+
 
 def _dedupe_issues(issues: list[FormulaIssue]) -> list[FormulaIssue]:
     unique: dict[tuple[str, str, str, str], FormulaIssue] = {}
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Iterator
+import json
+import os
+import threading
+import time
+import uuid
+
+from .models import QuotePayload
+
+SEGMENT_SUFFIX = ".jsonl"
+INDEX_SUFFIX = ".idx"
+DEFAULT_SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class LedgerEntry:
+    quote_id: str
+    customer_name: str
+    part_number: str
+    segment: Path
+    offset: int
+    length: int
+    committed_ns: int
+
+
+class QuoteLedger:
+    """Append-only JSONL quote ledger with a side index by quote id, customer and part.
+
+    Each writer (one per process) appends to its own segments under
+    ``segments/`` and records ``offset``/``length`` of every line in a matching
+    index file under ``index/``, so concurrent batch workers never share a file.
+    A record is indexed only after its line is fsynced, which means the index
+    never points at missing data. Readers load the index files once (and
+    incrementally on ``refresh``) and then seek straight to a quote.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        writer_id: str | None = None,
+        segment_max_bytes: int = DEFAULT_SEGMENT_MAX_BYTES,
+    ) -> None:
+        self._root = Path(root)
+        self._segments_dir = self._root / "segments"
+        self._index_dir = self._root / "index"
+        self._writer_id = writer_id or f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._segment_max_bytes = segment_max_bytes
+        self._write_lock = threading.Lock()
+        self._segment: IO[bytes] | None = None
+        self._index: IO[bytes] | None = None
+        self._segment_path: Path | None = None
+        self._segment_seq = 0
+
+        self._read_lock = threading.Lock()
+        self._index_offsets: dict[Path, int] = {}
+        self._by_quote: dict[str, LedgerEntry] = {}
+        self._by_customer: dict[str, dict[str, None]] = {}
+        self._by_part: dict[str, dict[str, None]] = {}
+
+    @classmethod
+    def load(cls, root: Path) -> QuoteLedger:
+        """Open an existing ledger for lookups, with every index file loaded."""
+        ledger = cls(root)
+        ledger.refresh()
+        return ledger
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def append(self, payload: QuotePayload) -> LedgerEntry:
+        line = json.dumps(payload.to_dict(), ensure_ascii=True, separators=(",", ":")) + "\n"
+        data = line.encode("utf-8")
+        with self._write_lock:
+            segment, index, segment_path = self._writable(len(data))
+            offset = segment.tell()
+            segment.write(data)
+            segment.flush()
+            os.fsync(segment.fileno())
+
+            entry = LedgerEntry(
+                quote_id=payload.quote_id,
+                customer_name=payload.customer_name,
+                part_number=payload.part_number,
+                segment=segment_path,
+                offset=offset,
+                length=len(data),
+                committed_ns=time.time_ns(),
+            )
+            index.write(_index_line(entry))
+            index.flush()
+            os.fsync(index.fileno())
+        with self._read_lock:
+            self._add(entry)
+        return entry
+
+    def close(self) -> None:
+        with self._write_lock:
+            self._close_segment()
+
+    def refresh(self) -> int:
+        """Load index lines written since the last call (by any writer); return how many."""
+        loaded = 0
+        if not self._index_dir.exists():
+            return loaded
+        with self._read_lock:
+            for index_path in sorted(self._index_dir.glob(f"*{INDEX_SUFFIX}")):
+                start = self._index_offsets.get(index_path, 0)
+                with index_path.open("rb") as fh:
+                    fh.seek(start)
+                    for raw in fh:
+                        if not raw.endswith(b"\n"):
+                            break  # a writer is mid-append; pick it up next time
+                        start += len(raw)
+                        record = json.loads(raw)
+                        segment = self._segments_dir / f"{index_path.stem}{SEGMENT_SUFFIX}"
+                        self._add(
+                            LedgerEntry(
+                                quote_id=record["quote_id"],
+                                customer_name=record["customer_name"],
+                                part_number=record["part_number"],
+                                segment=segment,
+                                offset=record["offset"],
+                                length=record["length"],
+                                committed_ns=record["committed_ns"],
+                            )
+                        )
+                        loaded += 1
+                self._index_offsets[index_path] = start
+        return loaded
+
+    def entry(self, quote_id: str) -> LedgerEntry | None:
+        return self._by_quote.get(quote_id)
+
+    def get(self, quote_id: str) -> dict[str, Any] | None:
+        """Latest record for ``quote_id``: one dict lookup and one positioned read."""
+        entry = self._by_quote.get(quote_id)
+        if entry is None:
+            return None
+        return self._read(entry)
+
+    def find(
+        self,
+        customer_name: str | None = None,
+        part_number: str | None = None,
+    ) -> list[dict[str, Any]]:
+        if customer_name is None and part_number is None:
+            raise ValueError("customer_name or part_number is required")
+        quote_ids: dict[str, None] | None = None
+        for index, key in ((self._by_customer, customer_name), (self._by_part, part_number)):
+            if key is None:
+                continue
+            matches = index.get(key, {})
+            quote_ids = matches if quote_ids is None else {
+                quote_id: None for quote_id in quote_ids if quote_id in matches
+            }
+        return [self._read(self._by_quote[quote_id]) for quote_id in quote_ids or {}]
+
+    def scan(self) -> Iterator[dict[str, Any]]:
+        """Every committed record, segment by segment (including superseded versions)."""
+        if not self._segments_dir.exists():
+            return
+        for segment in sorted(self._segments_dir.glob(f"*{SEGMENT_SUFFIX}")):
+            with segment.open("rb") as fh:
+                for raw in fh:
+                    if raw.endswith(b"\n"):
+                        yield json.loads(raw)
+
+    def __len__(self) -> int:
+        return len(self._by_quote)
+
+    def __contains__(self, quote_id: object) -> bool:
+        return quote_id in self._by_quote
+
+    def _writable(self, size: int) -> tuple[IO[bytes], IO[bytes], Path]:
+        if self._segment is not None and self._index is not None and self._segment_path:
+            used = self._segment.tell()
+            if used == 0 or used + size <= self._segment_max_bytes:
+                return self._segment, self._index, self._segment_path
+        self._close_segment()
+        self._segments_dir.mkdir(parents=True, exist_ok=True)
+        self._index_dir.mkdir(parents=True, exist_ok=True)
+        self._segment_seq += 1
+        name = f"{self._writer_id}-{self._segment_seq:06d}"
+        segment_path = self._segments_dir / f"{name}{SEGMENT_SUFFIX}"
+        self._segment = segment_path.open("ab")
+        self._index = (self._index_dir / f"{name}{INDEX_SUFFIX}").open("ab")
+        self._segment_path = segment_path
+        return self._segment, self._index, segment_path
+
+    def _close_segment(self) -> None:
+        for handle in (self._segment, self._index):
+            if handle is not None:
+                handle.close()
+        self._segment = self._index = None
+        self._segment_path = None
+
+    def _add(self, entry: LedgerEntry) -> None:
+        current = self._by_quote.get(entry.quote_id)
+        if current is not None and current.committed_ns > entry.committed_ns:
+            return
+        self._by_quote[entry.quote_id] = entry
+        self._by_customer.setdefault(entry.customer_name, {})[entry.quote_id] = None
+        self._by_part.setdefault(entry.part_number, {})[entry.quote_id] = None
+        if current is not None:
+            if current.customer_name != entry.customer_name:
+                self._by_customer.get(current.customer_name, {}).pop(entry.quote_id, None)
+            if current.part_number != entry.part_number:
+                self._by_part.get(current.part_number, {}).pop(entry.quote_id, None)
+
+    @staticmethod
+    def _read(entry: LedgerEntry) -> dict[str, Any]:
+        with entry.segment.open("rb") as fh:
+            fh.seek(entry.offset)
+            return json.loads(fh.read(entry.length))
+
+
+def _index_line(entry: LedgerEntry) -> bytes:
+    record = {
+        "quote_id": entry.quote_id,
+        "customer_name": entry.customer_name,
+        "part_number": entry.part_number,
+        "offset": entry.offset,
+        "length": entry.length,
+        "committed_ns": entry.committed_ns,
+    }
+    return (json.dumps(record, ensure_ascii=True, separators=(",", ":")) + "\n").encode("utf-8")
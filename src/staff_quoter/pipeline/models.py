@@ -18,15 +18,24 @@ class FormulaValidationReport:
     workbook_path: str
     total_formulas: int
     issues: list[FormulaIssue]
+    formula_templates: int = 0
 
     @property
     def has_errors(self) -> bool:
         return len(self.issues) > 0
 
+    @property
+    def template_hit_rate(self) -> float:
+        if self.total_formulas == 0:
+            return 0.0
+        return (self.total_formulas - self.formula_templates) / self.total_formulas
+
     def to_dict(self) -> dict[str, object]:
         return {
             "workbook_path": self.workbook_path,
             "total_formulas": self.total_formulas,
+            "formula_templates": self.formula_templates,
+            "template_hit_rate": round(self.template_hit_rate, 4),
             "issue_count": len(self.issues),
             "issues": [asdict(issue) for issue in self.issues],
         }
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+import json
+import os
+import tempfile
+import threading
+
+from .ledger import QuoteLedger
+from .models import QuotePayload
+from .pdf_renderer import QuotePdfRenderer
+from .profiling import StageProfiler, StageSpan
+
+JSON_MODES = ("ledger", "files")
+
+
+@dataclass(frozen=True)
+class CommittedArtifacts:
+    json_output_path: Path
+    pdf_output_path: Path
+    json_committed_at_utc: str
+    pdf_committed_at_utc: str
+    json_offset: int | None = None
+    spans: tuple[StageSpan, ...] = ()
+    pdf_bytes: bytes = field(default=b"", repr=False)
+
+
+class QuoteOutputStage:
+    """Writes quote JSON and PDF artifacts on a bounded background executor.
+
+    ``submit`` blocks once ``max_pending`` quotes are in flight, so a fast
+    producer cannot queue unbounded work. PDFs (and JSON in ``"files"`` mode)
+    are written to a temp file in their target directory, fsynced and renamed
+    into place, so readers never observe a partially written file. In the
+    default ``"ledger"`` mode the JSON is appended to a :class:`QuoteLedger`
+    under ``json_dir`` instead of one file per quote.
+    """
+
+    def __init__(
+        self,
+        json_dir: Path,
+        pdf_dir: Path,
+        renderer: QuotePdfRenderer,
+        max_workers: int = 2,
+        max_pending: int = 8,
+        json_mode: str = "ledger",
+    ) -> None:
+        if json_mode not in JSON_MODES:
+            raise ValueError(
+                f"Unknown JSON output mode: {json_mode}. Expected one of {', '.join(JSON_MODES)}."
+            )
+        self._json_dir = json_dir
+        self._ledger = QuoteLedger(json_dir) if json_mode == "ledger" else None
+        self._pdf_dir = pdf_dir
+        self._renderer = renderer
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="quote-output"
+        )
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, payload: QuotePayload, profile: bool = False) -> Future[CommittedArtifacts]:
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(
+                self._write, payload, StageProfiler(profile, measure_memory=False)
+            )
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+        if self._ledger is not None and wait:
+            self._ledger.close()
+
+    def _write(self, payload: QuotePayload, profiler: StageProfiler) -> CommittedArtifacts:
+        json_offset = None
+        with profiler.stage("json_write"):
+            if self._ledger is not None:
+                entry = self._ledger.append(payload)
+                json_path, json_offset = entry.segment, entry.offset
+                json_committed_at = datetime.now(timezone.utc).isoformat()
+            else:
+                json_data = json.dumps(payload.to_dict(), ensure_ascii=True, separators=(",", ":"))
+                json_path = self._json_dir / f"{payload.quote_id}.json"
+                json_committed_at = atomic_write_bytes(json_path, json_data.encode("utf-8"))
+
+        pdf_path = self._pdf_dir / f"{payload.quote_id}.pdf"
+        with profiler.stage("pdf_render"):
+            pdf_bytes = self._renderer.render_bytes(payload)
+        with profiler.stage("pdf_write"):
+            pdf_committed_at = atomic_write_bytes(pdf_path, pdf_bytes)
+
+        return CommittedArtifacts(
+            json_output_path=json_path,
+            pdf_output_path=pdf_path,
+            json_committed_at_utc=json_committed_at,
+            pdf_committed_at_utc=pdf_committed_at,
+            json_offset=json_offset,
+            spans=tuple(profiler.spans),
+            pdf_bytes=pdf_bytes,
+        )
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> str:
+    """Write ``data`` to ``path`` via an fsynced temp file and rename; returns the commit time.
+
+    The parent directory is (re)created if missing and fsynced after the
+    rename, so the new directory entry survives a crash as well.
+    """
+    try:
+        fd, tmp_name = _mkstemp_next_to(path)
+    except FileNotFoundError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = _mkstemp_next_to(path)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    _fsync_dir(path.parent)
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _mkstemp_next_to(path: Path) -> tuple[int, str]:
+    return tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+
+
+def _fsync_dir(directory: Path) -> None:
+    if not hasattr(os, "O_DIRECTORY"):
+        return  # Windows cannot open a directory; NTFS journals the rename itself
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
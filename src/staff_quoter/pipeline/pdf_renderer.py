@@ -1,48 +1,112 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Callable, Iterable
+import io
 
 from reportlab.lib.pagesizes import LETTER
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.pdfgen.canvas import Canvas
 
 from .models import QuotePayload
 
+_LEFT = 72
+_TITLE = "Staff Quoter - Quote Summary"
+_GENERATED_LABEL = "Generated UTC: "
+_FORM_NAME = "QuoteChrome"
+
+_FIELDS: list[tuple[str, Callable[[QuotePayload], str]]] = [
+    ("Quote ID", lambda payload: payload.quote_id),
+    ("Engine", lambda payload: payload.engine_type),
+    ("Customer", lambda payload: payload.customer_name),
+    ("Part Number", lambda payload: payload.part_number),
+    ("Total Cost", lambda payload: f"{payload.total_cost:,.2f}"),
+    ("Total Price", lambda payload: f"{payload.total_price:,.2f}"),
+    ("Margin %", lambda payload: f"{payload.margin_pct:.4f}"),
+    ("Lead Time (weeks)", lambda payload: f"{payload.lead_time_weeks:.2f}"),
+    ("MOQ", lambda payload: str(payload.moq)),
+    ("PDF Ready", lambda payload: "TRUE" if payload.pdf_ready_flag else "FALSE"),
+]
+
 
 class QuotePdfRenderer:
+    """Renders quote summaries on top of a static page template.
+
+    The title and labels are drawn once per document as a reusable form
+    XObject, so each quote page only draws its own values.
+    """
+
+    def __init__(self) -> None:
+        _, height = LETTER
+        y = height - 72
+        self._title_y = y
+        y -= 26
+        self._generated_y = y
+        self._generated_x = _LEFT + stringWidth(_GENERATED_LABEL, "Helvetica", 10)
+
+        y -= 28
+        self._field_layout: list[tuple[str, float, float, Callable[[QuotePayload], str]]] = []
+        for label, formatter in _FIELDS:
+            label_text = f"{label}: "
+            value_x = _LEFT + stringWidth(label_text, "Helvetica", 11)
+            self._field_layout.append((label_text, value_x, y, formatter))
+            y -= 20
+
     def render(self, payload: QuotePayload, output_path: Path | str) -> Path:
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
+        return self._render_file(payload, output_path)
 
-        canvas = Canvas(str(output_path), pagesize=LETTER)
-        width, height = LETTER
+    def render_bytes(self, payload: QuotePayload) -> bytes:
+        canvas = Canvas(io.BytesIO(), pagesize=LETTER)
+        self._define_chrome(canvas)
+        self._draw_page(canvas, payload)
+        return canvas.getpdfdata()
 
-        y = height - 72
-        canvas.setFont("Helvetica-Bold", 16)
-        canvas.drawString(72, y, "Staff Quoter - Quote Summary")
+    def render_many(
+        self,
+        payloads: Iterable[QuotePayload],
+        output_dir: Path | str,
+        filename: Callable[[QuotePayload], str] = lambda payload: f"{payload.quote_id}.pdf",
+    ) -> list[Path]:
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        return [self._render_file(payload, output_dir / filename(payload)) for payload in payloads]
 
-        y -= 26
-        canvas.setFont("Helvetica", 10)
-        canvas.drawString(72, y, f"Generated UTC: {payload.generated_at_utc}")
+    def render_combined(self, payloads: Iterable[QuotePayload], output_path: Path | str) -> Path:
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        y -= 28
-        lines = [
-            ("Quote ID", payload.quote_id),
-            ("Engine", payload.engine_type),
-            ("Customer", payload.customer_name),
-            ("Part Number", payload.part_number),
-            ("Total Cost", f"{payload.total_cost:,.2f}"),
-            ("Total Price", f"{payload.total_price:,.2f}"),
-            ("Margin %", f"{payload.margin_pct:.4f}"),
-            ("Lead Time (weeks)", f"{payload.lead_time_weeks:.2f}"),
-            ("MOQ", str(payload.moq)),
-            ("PDF Ready", "TRUE" if payload.pdf_ready_flag else "FALSE"),
-        ]
+        canvas = Canvas(str(output_path), pagesize=LETTER)
+        self._define_chrome(canvas)
+        for payload in payloads:
+            self._draw_page(canvas, payload)
+        canvas.save()
+        return output_path
+
+    def _render_file(self, payload: QuotePayload, output_path: Path) -> Path:
+        canvas = Canvas(str(output_path), pagesize=LETTER)
+        self._define_chrome(canvas)
+        self._draw_page(canvas, payload)
+        canvas.save()
+        return output_path
 
+    def _define_chrome(self, canvas: Canvas) -> None:
+        canvas.beginForm(_FORM_NAME)
+        canvas.setFont("Helvetica-Bold", 16)
+        canvas.drawString(_LEFT, self._title_y, _TITLE)
+        canvas.setFont("Helvetica", 10)
+        canvas.drawString(_LEFT, self._generated_y, _GENERATED_LABEL)
         canvas.setFont("Helvetica", 11)
-        for label, value in lines:
-            canvas.drawString(72, y, f"{label}: {value}")
-            y -= 20
+        for label_text, _, y, _ in self._field_layout:
+            canvas.drawString(_LEFT, y, label_text)
+        canvas.endForm()
 
+    def _draw_page(self, canvas: Canvas, payload: QuotePayload) -> None:
+        canvas.doForm(_FORM_NAME)
+        canvas.setFont("Helvetica", 10)
+        canvas.drawString(self._generated_x, self._generated_y, payload.generated_at_utc)
+        canvas.setFont("Helvetica", 11)
+        for _, value_x, y, formatter in self._field_layout:
+            canvas.drawString(value_x, y, formatter(payload))
         canvas.showPage()
-        canvas.save()
-        return output_path
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Mapping, cast
+import threading
+import time
+import tracemalloc
+
+METRIC_PREFIX = "staff_quoter"
+
+# Held by the one stage currently owning the process-wide tracemalloc peak.
+_peak_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class StageSpan:
+    stage: str
+    wall_seconds: float
+    cpu_seconds: float
+    # Peak traced allocations above the level at stage start (None without tracemalloc).
+    peak_memory_bytes: int | None = None
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "stage": self.stage,
+            "wall_seconds": round(self.wall_seconds, 6),
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "peak_memory_bytes": self.peak_memory_bytes,
+        }
+
+
+class StageProfiler:
+    """Collects stage spans for one pipeline call; a disabled profiler records nothing.
+
+    CPU time is measured per thread, so output stages running on the writer
+    threads are not charged for the caller's work. Memory peaks come from
+    tracemalloc, whose peak is process wide and reset per stage, so only one
+    stage in the process measures it at a time: a stage that starts while
+    another is measuring, or a profiler built with ``measure_memory=False``
+    (the background output stages), records ``None``. A measured peak still
+    includes what other threads allocate during the stage.
+    """
+
+    def __init__(self, enabled: bool = True, measure_memory: bool = True) -> None:
+        self.enabled = enabled
+        self.measure_memory = measure_memory
+        self.spans: list[StageSpan] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        measuring = (
+            self.measure_memory and tracemalloc.is_tracing() and _peak_lock.acquire(blocking=False)
+        )
+        baseline = 0
+        if measuring:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        wall_started = time.perf_counter()
+        cpu_started = time.thread_time()
+        try:
+            yield
+        finally:
+            peak = None
+            if measuring:
+                peak = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+                _peak_lock.release()
+            self.spans.append(
+                StageSpan(
+                    stage=name,
+                    wall_seconds=time.perf_counter() - wall_started,
+                    cpu_seconds=time.thread_time() - cpu_started,
+                    peak_memory_bytes=peak,
+                )
+            )
+
+
+def to_prometheus(profiles: Iterable[Mapping[str, object]]) -> str:
+    """Render ``PipelineResult.profile`` dicts as Prometheus text exposition.
+
+    Stage timings and span counts are summed per stage, memory is the max
+    peak per stage, and the numeric workbook context is summed across results.
+    """
+    wall: dict[str, float] = {}
+    cpu: dict[str, float] = {}
+    count: dict[str, int] = {}
+    peak: dict[str, int] = {}
+    context_totals: dict[str, float] = {}
+    for profile in profiles:
+        stages = cast("list[dict[str, Any]]", profile.get("stages", []))
+        for span in stages:
+            stage = str(span["stage"])
+            wall[stage] = wall.get(stage, 0.0) + float(span["wall_seconds"])
+            cpu[stage] = cpu.get(stage, 0.0) + float(span["cpu_seconds"])
+            count[stage] = count.get(stage, 0) + 1
+            if span.get("peak_memory_bytes") is not None:
+                peak[stage] = max(peak.get(stage, 0), int(span["peak_memory_bytes"]))
+        context = cast("dict[str, object]", profile.get("context", {}))
+        for key, value in context.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                context_totals[key] = context_totals.get(key, 0) + value
+
+    lines: list[str] = []
+    _metric(lines, "stage_wall_seconds_total", "counter", "Wall time per pipeline stage.", wall)
+    _metric(lines, "stage_cpu_seconds_total", "counter", "Thread CPU time per pipeline stage.", cpu)
+    _metric(lines, "stage_spans_total", "counter", "Profiled spans per pipeline stage.", count)
+    _metric(
+        lines, "stage_peak_memory_bytes", "gauge", "Max traced memory peak per stage.", peak
+    )
+    for key, value in sorted(context_totals.items()):
+        name = f"{METRIC_PREFIX}_{key}_total"
+        lines.append(f"# HELP {name} Sum of {key} across profiled quotes.")
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _metric(
+    lines: list[str],
+    name: str,
+    kind: str,
+    help_text: str,
+    values: Mapping[str, float | int],
+) -> None:
+    if not values:
+        return
+    metric = f"{METRIC_PREFIX}_{name}"
+    lines.append(f"# HELP {metric} {help_text}")
+    lines.append(f"# TYPE {metric} {kind}")
+    for stage, value in sorted(values.items()):
+        lines.append(f'{metric}{{stage="{_label(stage)}"}} {_number(value)}')
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float | int) -> str:
+    return repr(round(value, 6)) if isinstance(value, float) else str(value)
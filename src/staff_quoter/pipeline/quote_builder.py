@@ -1,38 +1,85 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Any, Callable, Iterator, Sequence
 
-from openpyxl import load_workbook
+from openpyxl.utils.cell import coordinate_from_string
 
+from .cell_map import QUOTE_CELL_MAP, CellField
 from .models import QuotePayload
+from .workbook_reader import WorkbookSnapshot, read_cells, read_columns
 
 
 class QuotePayloadBuilder:
+    def __init__(self, cell_map: Sequence[CellField] = QUOTE_CELL_MAP) -> None:
+        self._cell_map = tuple(cell_map)
+
+    @property
+    def cell_map(self) -> tuple[CellField, ...]:
+        return self._cell_map
+
     def build_from_workbook(self, workbook_path: Path | str) -> QuotePayload:
-        workbook_path = Path(workbook_path)
-        wb = load_workbook(workbook_path, data_only=True, read_only=True)
-
-        input_ws = wb["INPUT_QUOTE"]
-        calc_ws = wb["CALC_OUTPUTS"]
-        quote_ws = wb["QUOTE_OUTPUT"]
-
-        quote_id = _to_text(input_ws["A2"].value) or "UNKNOWN"
-        payload = QuotePayload(
-            quote_id=quote_id,
-            engine_type=_to_text(input_ws["C2"].value),
-            customer_name=_to_text(input_ws["D2"].value),
-            part_number=_to_text(input_ws["G2"].value),
-            total_cost=_to_float(calc_ws["B2"].value),
-            total_price=_to_float(calc_ws["C2"].value),
-            margin_pct=_to_float(calc_ws["D2"].value),
-            lead_time_weeks=_to_float(calc_ws["E2"].value),
-            moq=_to_int(calc_ws["F2"].value),
-            pdf_ready_flag=_to_bool(quote_ws["C2"].value),
-            generated_at_utc=QuotePayload.now_iso(),
-        )
-
-        wb.close()
-        return payload
+        values = read_cells(workbook_path, [(field.sheet, field.cell) for field in self._cell_map])
+        return self._build(lambda sheet, cell: values.get((sheet, cell)))
+
+    def build_from_snapshot(self, snapshot: WorkbookSnapshot) -> QuotePayload:
+        return self._build(lambda sheet, cell: snapshot[sheet].value(cell))
+
+    def build_many(self, workbook_path: Path | str) -> Iterator[QuotePayload]:
+        columns = read_columns(workbook_path, self._column_refs())
+        yield from self._build_rows(columns)
+
+    def build_many_from_snapshot(self, snapshot: WorkbookSnapshot) -> Iterator[QuotePayload]:
+        yield from self._build_rows(snapshot.read_columns(self._column_refs()))
+
+    def _column_refs(self) -> list[tuple[str, str, int]]:
+        refs = []
+        for field in self._cell_map:
+            letters, row = coordinate_from_string(field.cell)
+            refs.append((field.sheet, letters.upper(), row))
+        return refs
+
+    def _build_rows(
+        self,
+        columns: dict[tuple[str, str, int], list[object]],
+    ) -> Iterator[QuotePayload]:
+        # pandas is only needed for multi-quote workbooks.
+        from .quote_columns import coerce_column
+
+        refs = dict(zip((field.name for field in self._cell_map), self._column_refs()))
+        raw = {name: columns[ref] for name, ref in refs.items()}
+        if not raw.get("quote_id"):
+            return
+        first_row = refs["quote_id"][2]
+
+        key_sheet = next(field.sheet for field in self._cell_map if field.name == "quote_id")
+        key_columns = [raw[field.name] for field in self._cell_map if field.sheet == key_sheet]
+        data_rows = [
+            idx
+            for idx in range(len(raw["quote_id"]))
+            if any(column[idx] not in (None, "") for column in key_columns)
+        ]
+        if not data_rows:
+            return
+
+        coerced = {
+            field.name: coerce_column([raw[field.name][idx] for idx in data_rows], field.kind)
+            for field in self._cell_map
+        }
+        generated_at_utc = QuotePayload.now_iso()
+        for position, idx in enumerate(data_rows):
+            fields: dict[str, Any] = {name: values[position] for name, values in coerced.items()}
+            # Keep blank-id rows apart; they would otherwise share one output file.
+            fields["quote_id"] = fields["quote_id"] or f"UNKNOWN-{first_row + idx}"
+            yield QuotePayload(**fields, generated_at_utc=generated_at_utc)
+
+    def _build(self, cell_value: Callable[[str, str], object]) -> QuotePayload:
+        fields: dict[str, Any] = {
+            field.name: _COERCERS[field.kind](cell_value(field.sheet, field.cell))
+            for field in self._cell_map
+        }
+        fields["quote_id"] = fields["quote_id"] or "UNKNOWN"
+        return QuotePayload(**fields, generated_at_utc=QuotePayload.now_iso())
 
 
 def _to_text(value: object) -> str:
@@ -55,7 +102,7 @@ def _to_int(value: object) -> int:
         return 0
     try:
         return int(float(value))
-    except (TypeError, ValueError):
+    except (TypeError, ValueError, OverflowError):
         return 0
 
 
@@ -65,3 +112,20 @@ def _to_bool(value: object) -> bool:
     if value is None:
         return False
     return str(value).strip().upper() == "TRUE"
+
+
+_COERCERS: dict[str, Callable[[object], object]] = {
+    "text": _to_text,
+    "float": _to_float,
+    "int": _to_int,
+    "bool": _to_bool,
+}
+
+
+def coerce_cell(value: object, kind: str) -> object:
+    """Coerce one raw cell value to a payload field of ``kind``."""
+    try:
+        coercer = _COERCERS[kind]
+    except KeyError:
+        raise ValueError(f"Unknown cell field kind: {kind}") from None
+    return coercer(value)
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from .quote_builder import coerce_cell
+
+_INT64_LIMIT = 2.0**63
+
+
+def coerce_column(values: Sequence[object], kind: str) -> list[object]:
+    """Column-wise equivalent of the per-cell ``_to_*`` helpers in quote_builder."""
+    series = pd.Series(values, dtype=object)
+    if kind == "text":
+        return series.fillna("").astype(str).tolist()
+    if kind == "bool":
+        text = series.fillna("").astype(str).str.strip().str.upper()
+        return (text == "TRUE").tolist()
+
+    if kind not in ("float", "int"):
+        raise ValueError(f"Unknown cell field kind: {kind}")
+    numbers = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float, copy=True)
+    # Non-finite results (bad text, inf, nan) and ints past int64 are rare;
+    # those cells go through the scalar coercer so both paths agree.
+    slow = ~np.isfinite(numbers)
+    if kind == "float":
+        coerced: list[object] = numbers.tolist()
+    else:
+        slow |= np.abs(numbers) >= _INT64_LIMIT
+        coerced = np.trunc(np.where(slow, 0.0, numbers)).astype(np.int64).tolist()
+    for idx in np.flatnonzero(slow).tolist():
+        coerced[idx] = coerce_cell(values[idx], kind)
+    return coerced
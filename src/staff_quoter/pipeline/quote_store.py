@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from dataclasses import fields
+from pathlib import Path
+from typing import Iterable
+import hashlib
+import json
+import math
+import sqlite3
+import threading
+
+from .models import QuotePayload
+
+_SCHEMA_VERSION = 1
+_FIELDS = [field.name for field in fields(QuotePayload)]
+# generated_at_utc changes on every run, so it is left out of the content hash.
+_HASHED_FIELDS = [name for name in _FIELDS if name != "generated_at_utc"]
+# SQLite turns NaN into NULL, which the NOT NULL REAL columns reject, so NaN is stored as text.
+_REAL_FIELDS = ("total_cost", "total_price", "margin_pct", "lead_time_weeks")
+_NAN_TEXT = "NaN"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quotes (
+    id INTEGER PRIMARY KEY,
+    quote_id TEXT NOT NULL,
+    engine_type TEXT NOT NULL,
+    customer_name TEXT NOT NULL,
+    part_number TEXT NOT NULL,
+    total_cost REAL NOT NULL,
+    total_price REAL NOT NULL,
+    margin_pct REAL NOT NULL,
+    lead_time_weeks REAL NOT NULL,
+    moq INTEGER NOT NULL,
+    pdf_ready_flag INTEGER NOT NULL,
+    generated_at_utc TEXT NOT NULL,
+    content_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS quotes_quote_id ON quotes (quote_id, id);
+CREATE INDEX IF NOT EXISTS quotes_customer ON quotes (customer_name, generated_at_utc);
+CREATE INDEX IF NOT EXISTS quotes_part_number ON quotes (part_number, generated_at_utc);
+CREATE INDEX IF NOT EXISTS quotes_engine_type ON quotes (engine_type, generated_at_utc);
+CREATE INDEX IF NOT EXISTS quotes_generated_at ON quotes (generated_at_utc);
+"""
+
+# Only the newest stored version of each quote_id counts as "current".
+_IS_LATEST = "q.id = (SELECT MAX(h.id) FROM quotes h WHERE h.quote_id = q.quote_id)"
+
+
+def content_hash(payload: QuotePayload) -> str:
+    # getattr instead of to_dict(): asdict() deep-copies and dominates bulk inserts.
+    canonical = json.dumps(
+        [getattr(payload, name) for name in _HASHED_FIELDS], separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class QuoteRepository:
+    """Quote history in a local SQLite database (WAL mode, safe for several processes).
+
+    Every stored row is one version of a quote. A payload whose content (all
+    fields but ``generated_at_utc``) matches the latest stored version of the
+    same ``quote_id`` is skipped, so unchanged requotes are not stored twice.
+    """
+
+    def __init__(self, path: Path | str, timeout: float = 30.0) -> None:
+        self._path = Path(path)
+        if str(self._path) != ":memory:":
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self._path), timeout=timeout, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version > _SCHEMA_VERSION:
+                raise ValueError(
+                    f"Quote history schema v{version} is newer than supported v{_SCHEMA_VERSION}"
+                )
+            with self._conn:
+                self._conn.executescript(_SCHEMA)
+                self._conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def add(self, payload: QuotePayload) -> bool:
+        return self.add_many([payload]) == 1
+
+    def add_many(self, payloads: Iterable[QuotePayload]) -> int:
+        """Store new versions in one transaction; return how many rows were inserted."""
+        rows = []
+        heads: dict[str, str | None] = {}
+        with self._lock, self._conn:
+            # Take the write lock before reading the heads, so two processes storing the
+            # same quote cannot both see the old head and insert duplicate versions.
+            self._conn.execute("BEGIN IMMEDIATE")
+            for payload in payloads:
+                digest = content_hash(payload)
+                if payload.quote_id not in heads:
+                    heads[payload.quote_id] = self._latest_hash(payload.quote_id)
+                if heads[payload.quote_id] == digest:
+                    continue
+                heads[payload.quote_id] = digest
+                rows.append([*(_sql_value(getattr(payload, name)) for name in _FIELDS), digest])
+            self._conn.executemany(
+                f"INSERT INTO quotes ({', '.join(_FIELDS)}, content_hash) "
+                f"VALUES ({', '.join('?' for _ in range(len(_FIELDS) + 1))})",
+                rows,
+            )
+        return len(rows)
+
+    def latest(self, quote_id: str) -> QuotePayload | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM quotes WHERE quote_id = ? ORDER BY id DESC LIMIT 1", (quote_id,)
+            ).fetchone()
+        return _payload(row) if row is not None else None
+
+    def history(self, quote_id: str) -> list[QuotePayload]:
+        """Every stored version of ``quote_id``, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM quotes WHERE quote_id = ? ORDER BY id", (quote_id,)
+            ).fetchall()
+        return [_payload(row) for row in rows]
+
+    def latest_for_customer(self, customer_name: str, limit: int = 50) -> list[QuotePayload]:
+        return self.query(customer_name=customer_name, limit=limit)
+
+    def query(
+        self,
+        customer_name: str | None = None,
+        part_number: str | None = None,
+        engine_type: str | None = None,
+        since_utc: str | None = None,
+        limit: int = 100,
+    ) -> list[QuotePayload]:
+        """Current version of matching quotes, newest ``generated_at_utc`` first."""
+        filters = [_IS_LATEST]
+        params: list[object] = []
+        for column, value in (
+            ("customer_name", customer_name),
+            ("part_number", part_number),
+            ("engine_type", engine_type),
+        ):
+            if value is not None:
+                filters.append(f"q.{column} = ?")
+                params.append(value)
+        if since_utc is not None:
+            filters.append("q.generated_at_utc >= ?")
+            params.append(since_utc)
+        params.append(limit)
+        sql = (
+            f"SELECT q.* FROM quotes q WHERE {' AND '.join(filters)} "
+            "ORDER BY q.generated_at_utc DESC, q.id DESC LIMIT ?"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [_payload(row) for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM quotes").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _latest_hash(self, quote_id: str) -> str | None:
+        row = self._conn.execute(
+            "SELECT content_hash FROM quotes WHERE quote_id = ? ORDER BY id DESC LIMIT 1",
+            (quote_id,),
+        ).fetchone()
+        return row[0] if row is not None else None
+
+
+def _sql_value(value: object) -> object:
+    return _NAN_TEXT if isinstance(value, float) and math.isnan(value) else value
+
+
+def _payload(row: sqlite3.Row) -> QuotePayload:
+    data = {name: row[name] for name in _FIELDS}
+    for name in _REAL_FIELDS:
+        if data[name] == _NAN_TEXT:
+            data[name] = math.nan
+    data["pdf_ready_flag"] = bool(data["pdf_ready_flag"])
+    return QuotePayload(**data)
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from pathlib import Path
+import itertools
+import json
+import os
+import queue
+import selectors
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+_WORKER_SCRIPT = Path(__file__).with_name("recalc_worker.py")
+
+
+class RecalcWorkerError(RuntimeError):
+    pass
+
+
+class _RecalcWorker:
+    def __init__(self, python: str, script_path: Path) -> None:
+        self._process = subprocess.Popen(
+            [python, str(_WORKER_SCRIPT), str(script_path)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            start_new_session=True,
+        )
+        self._buffer = b""
+
+    @property
+    def pid(self) -> int:
+        return self._process.pid
+
+    def request(self, job: dict[str, object], timeout: float) -> dict[str, object]:
+        assert self._process.stdin is not None
+        try:
+            self._process.stdin.write(json.dumps(job, ensure_ascii=True).encode("utf-8") + b"\n")
+            self._process.stdin.flush()
+        except (BrokenPipeError, OSError) as exc:
+            raise RecalcWorkerError(
+                f"recalc worker {self.pid} is not accepting jobs: {exc}"
+            ) from exc
+
+        line = self._read_line(time.monotonic() + timeout)
+        return json.loads(line)
+
+    def kill(self) -> None:
+        if self._process.poll() is None:
+            try:
+                os.killpg(self._process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                self._process.kill()
+        self._process.wait()
+        for stream in (self._process.stdin, self._process.stdout):
+            if stream is not None:
+                stream.close()
+
+    def close(self) -> None:
+        if self._process.stdin is not None and not self._process.stdin.closed:
+            self._process.stdin.close()
+        try:
+            self._process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.kill()
+            return
+        if self._process.stdout is not None:
+            self._process.stdout.close()
+
+    def _read_line(self, deadline: float) -> bytes:
+        assert self._process.stdout is not None
+        fd = self._process.stdout.fileno()
+        with selectors.DefaultSelector() as selector:
+            selector.register(fd, selectors.EVENT_READ)
+            while b"\n" not in self._buffer:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"recalc worker {self.pid} timed out")
+                if not selector.select(remaining):
+                    continue
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    raise RecalcWorkerError(
+                        f"recalc worker {self.pid} exited with code {self._process.wait()}"
+                    )
+                self._buffer += chunk
+
+        line, _, self._buffer = self._buffer.partition(b"\n")
+        return line
+
+
+class RecalcWorkerPool:
+    """Keeps ``size`` recalc worker processes warm and hands workbooks to them.
+
+    Jobs that exceed ``job_timeout`` kill their worker (and anything it
+    spawned); crashed or killed workers are replaced before the next job. If a
+    replacement cannot be started its slot stays in the pool and the spawn is
+    retried by the next job, so the pool never shrinks. A job that waits more
+    than ``job_timeout`` for a free worker fails instead of blocking forever.
+    """
+
+    def __init__(
+        self,
+        script_path: Path,
+        size: int = 2,
+        job_timeout: float = 120.0,
+        recalc_timeout: int = 60,
+        python: str = sys.executable,
+    ) -> None:
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self._script_path = script_path
+        self._job_timeout = job_timeout
+        self._recalc_timeout = recalc_timeout
+        self._python = python
+        self._job_ids = itertools.count(1)
+        # None marks a slot whose worker still has to be (re)started.
+        self._idle: queue.Queue[_RecalcWorker | None] = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._workers: set[_RecalcWorker] = set()
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+    def recalc(self, workbook_path: Path | str) -> dict[str, object]:
+        if self._closed:
+            raise RuntimeError("recalc pool is closed")
+
+        try:
+            slot = self._idle.get(timeout=self._job_timeout)
+        except queue.Empty:
+            return {
+                "status": "failed",
+                "reason": f"no recalc worker became free within {self._job_timeout:g}s",
+            }
+        if slot is None:
+            try:
+                slot = self._spawn()
+            except OSError as exc:
+                self._idle.put(None)
+                return {"status": "failed", "reason": f"could not start a recalc worker: {exc}"}
+        worker = slot
+        job = {
+            "id": next(self._job_ids),
+            "workbook": str(workbook_path),
+            "timeout": self._recalc_timeout,
+        }
+        started = time.monotonic()
+        try:
+            response = worker.request(job, self._job_timeout)
+        except TimeoutError:
+            self._recycle(worker)
+            return {
+                "status": "failed",
+                "reason": f"recalc timed out after {self._job_timeout:g}s",
+                "worker_pid": worker.pid,
+            }
+        except (RecalcWorkerError, json.JSONDecodeError) as exc:
+            self._recycle(worker)
+            return {"status": "failed", "reason": str(exc), "worker_pid": worker.pid}
+
+        self._idle.put(worker)
+        response.pop("id", None)
+        response["worker_pid"] = worker.pid
+        response["elapsed_seconds"] = round(time.monotonic() - started, 4)
+        return response
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.close()
+
+    def __enter__(self) -> RecalcWorkerPool:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _spawn(self) -> _RecalcWorker:
+        worker = _RecalcWorker(self._python, self._script_path)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _recycle(self, worker: _RecalcWorker) -> None:
+        worker.kill()
+        with self._lock:
+            self._workers.discard(worker)
+            if self._closed:
+                return
+        try:
+            replacement = self._spawn()
+        except OSError:
+            replacement = None
+        self._idle.put(replacement)
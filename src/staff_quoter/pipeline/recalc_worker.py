@@ -0,0 +1,96 @@
+"""Long-lived recalc worker spoken to over stdin/stdout JSON lines.
+
+Run as ``python recalc_worker.py <recalc_script>``. Each request line is
+``{"id": ..., "workbook": ..., "timeout": ...}`` and gets exactly one response
+line. The recalc script is imported once; when it exposes
+``recalc(filename, timeout)`` the call happens in-process, otherwise the
+script is run as a subprocess per job like the pipeline did before.
+
+This file only uses the standard library so it can be started without the
+package on ``sys.path``.
+"""
+from __future__ import annotations
+
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Any, Callable
+import importlib.util
+import io
+import json
+import subprocess
+import sys
+import traceback
+
+
+def _load_recalc(script_path: Path) -> Callable[..., Any] | None:
+    spec = importlib.util.spec_from_file_location("xlsx_recalc_script", script_path)
+    if spec is None or spec.loader is None:
+        return None
+    module = importlib.util.module_from_spec(spec)
+    sys.path.insert(0, str(script_path.parent))
+    spec.loader.exec_module(module)
+    recalc = getattr(module, "recalc", None)
+    return recalc if callable(recalc) else None
+
+
+def _run_in_process(recalc: Callable[..., Any], workbook: str, timeout: int) -> dict[str, object]:
+    captured_stdout = io.StringIO()
+    captured_stderr = io.StringIO()
+    return_code = 0
+    parsed: object = None
+    try:
+        with redirect_stdout(captured_stdout), redirect_stderr(captured_stderr):
+            parsed = recalc(workbook, timeout)
+    except Exception:
+        return_code = 1
+        captured_stderr.write(traceback.format_exc())
+
+    return {
+        "status": "ok" if return_code == 0 else "failed",
+        "return_code": return_code,
+        "stdout": captured_stdout.getvalue().strip(),
+        "stderr": captured_stderr.getvalue().strip(),
+        "parsed": parsed if isinstance(parsed, dict) else None,
+    }
+
+
+def _run_subprocess(script_path: Path, workbook: str, timeout: int) -> dict[str, object]:
+    completed = subprocess.run(
+        [sys.executable, str(script_path), workbook, str(timeout)],
+        capture_output=True,
+        text=True,
+    )
+    return {
+        "status": "ok" if completed.returncode == 0 else "failed",
+        "return_code": completed.returncode,
+        "stdout": completed.stdout.strip(),
+        "stderr": completed.stderr.strip(),
+        "parsed": None,
+    }
+
+
+def main() -> int:
+    script_path = Path(sys.argv[1])
+    protocol_out = sys.stdout
+    # Anything the recalc script prints must not end up on the protocol stream.
+    sys.stdout = sys.stderr
+    recalc = _load_recalc(script_path)
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        job = json.loads(line)
+        workbook = str(job["workbook"])
+        timeout = int(job.get("timeout", 60))
+        if recalc is not None:
+            response = _run_in_process(recalc, workbook, timeout)
+        else:
+            response = _run_subprocess(script_path, workbook, timeout)
+        response["id"] = job.get("id")
+        protocol_out.write(json.dumps(response, ensure_ascii=True, default=str) + "\n")
+        protocol_out.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,17 +1,31 @@
 from __future__ import annotations
 
-from dataclasses import asdict, dataclass
+from concurrent.futures import Future
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterable, Iterator
 import json
+import sqlite3
 import subprocess
 import sys
+import tracemalloc
+import warnings
 
 from staff_quoter.config import Settings
 
+from .batch import BatchItemResult, iter_pool_results, iter_serial_results
+from .formula_engine import recalc_snapshot
 from .formula_validator import WorkbookFormulaValidator
-from .models import FormulaValidationReport
+from .models import FormulaValidationReport, QuotePayload
+from .output_stage import CommittedArtifacts, QuoteOutputStage
 from .pdf_renderer import QuotePdfRenderer
+from .profiling import StageProfiler
 from .quote_builder import QuotePayloadBuilder
+from .quote_store import QuoteRepository
+from .recalc_pool import RecalcWorkerPool
+from .workbook_reader import WorkbookSnapshot
+
+RECALC_MODES = ("libreoffice", "native")
 
 
 @dataclass(frozen=True)
@@ -21,56 +35,264 @@ class PipelineResult:
     json_output_path: str
     pdf_output_path: str
     recalc_output: dict[str, object] | None
+    json_committed_at_utc: str | None = None
+    pdf_committed_at_utc: str | None = None
+    json_offset: int | None = None
+    # {"stages": [...], "context": {...}} when the pipeline runs with profile=True.
+    profile: dict[str, object] | None = None
+
+
+@dataclass(frozen=True)
+class RenderedQuote:
+    result: PipelineResult
+    payload: QuotePayload
+    pdf_bytes: bytes
 
 
 class QuotePipeline:
-    def __init__(self, settings: Settings) -> None:
+    """Validates a quote workbook and writes its JSON and PDF outputs.
+
+    ``recalc`` selects how formula results are refreshed before extraction:
+    ``"libreoffice"`` runs the external recalc script (``run_recalc=True`` is
+    the legacy spelling), ``"native"`` evaluates the formulas behind the cell
+    map in-process, and ``None`` trusts the cached values.
+
+    With ``profile=True`` every result carries per-stage wall time, CPU time and
+    peak traced memory (tracemalloc is started for the pipeline's lifetime).
+    """
+
+    RECALC_TIMEOUT_SECONDS = 60
+
+    def __init__(self, settings: Settings, recalc_workers: int = 0, profile: bool = False) -> None:
         self._settings = settings
+        self._recalc_workers = recalc_workers
+        self._profile = profile
+        self._started_tracemalloc = profile and not tracemalloc.is_tracing()
+        if self._started_tracemalloc:
+            tracemalloc.start()
+        self._recalc_pool: RecalcWorkerPool | None = None
         self._validator = WorkbookFormulaValidator()
         self._builder = QuotePayloadBuilder()
         self._pdf_renderer = QuotePdfRenderer()
+        self._output_stage = QuoteOutputStage(
+            settings.output_json_dir,
+            settings.output_pdf_dir,
+            self._pdf_renderer,
+            json_mode=settings.output_json_mode,
+        )
+        self._history: QuoteRepository | None = None
+        if settings.quote_history_db is not None:
+            self._history = QuoteRepository(settings.quote_history_db)
 
     def run(
         self,
         workbook_path: Path | str,
         fail_on_formula_issues: bool = True,
         run_recalc: bool = False,
+        recalc: str | None = None,
     ) -> PipelineResult:
+        return self.submit(workbook_path, fail_on_formula_issues, run_recalc, recalc).result()
+
+    def submit(
+        self,
+        workbook_path: Path | str,
+        fail_on_formula_issues: bool = True,
+        run_recalc: bool = False,
+        recalc: str | None = None,
+    ) -> Future[PipelineResult]:
+        """Extract and validate synchronously, then hand the outputs to the output stage.
+
+        The returned future resolves once the JSON and PDF are committed, so the
+        caller can move on to the next workbook while they are written.
+        """
+        return _pipeline_result(
+            self._submit_rendered(
+                Path(workbook_path), fail_on_formula_issues, recalc_mode(run_recalc, recalc)
+            )
+        )
+
+    def run_rendered(
+        self,
+        workbook_path: Path | str,
+        fail_on_formula_issues: bool = True,
+        recalc: str | None = None,
+    ) -> RenderedQuote:
+        """Like :meth:`run`, also returning the payload and PDF bytes this call produced.
+
+        Outputs are named after the quote id, so reading them back from disk
+        could return the artifacts of a concurrent run of the same quote.
+        """
+        return self._submit_rendered(
+            Path(workbook_path), fail_on_formula_issues, recalc_mode(False, recalc)
+        ).result()
+
+    def run_many(
+        self,
+        workbook_path: Path | str,
+        fail_on_formula_issues: bool = True,
+        run_recalc: bool = False,
+        recalc: str | None = None,
+    ) -> list[PipelineResult]:
         workbook_path = Path(workbook_path)
-        recalc_output = self._run_recalc_if_requested(workbook_path, run_recalc)
+        profiler = StageProfiler(self._profile)
+        snapshot, formula_report, recalc_output = self._load_and_validate(
+            workbook_path, fail_on_formula_issues, recalc_mode(run_recalc, recalc), profiler
+        )
+
+        with profiler.stage("build"):
+            payloads = list(self._builder.build_many_from_snapshot(snapshot))
+        with profiler.stage("history"):
+            self._record_history(payloads)
+        # Workbook-level stages and context go on the first result only, so summing
+        # the profiles of a multi-quote run does not count them once per quote.
+        futures = [
+            self._submit_outputs(
+                workbook_path,
+                payload,
+                formula_report,
+                recalc_output,
+                profiler if idx == 0 else StageProfiler(self._profile),
+                _context(snapshot, formula_report, len(payloads)) if idx == 0 else {"quotes": 1},
+            )
+            for idx, payload in enumerate(payloads)
+        ]
+        return [future.result().result for future in futures]
+
+    @property
+    def history(self) -> QuoteRepository | None:
+        return self._history
+
+    def close(self) -> None:
+        self._output_stage.shutdown()
+        if self._history is not None:
+            self._history.close()
+        if self._recalc_pool is not None:
+            self._recalc_pool.close()
+            self._recalc_pool = None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _load_and_validate(
+        self,
+        workbook_path: Path,
+        fail_on_formula_issues: bool,
+        recalc: str | None,
+        profiler: StageProfiler,
+    ) -> tuple[WorkbookSnapshot, FormulaValidationReport, dict[str, object] | None]:
+        recalc_output = None
+        if recalc == "libreoffice":
+            with profiler.stage("recalc"):
+                recalc_output = self._run_recalc_if_requested(workbook_path, True)
 
-        formula_report = self._validator.validate(workbook_path)
+        with profiler.stage("load"):
+            snapshot = WorkbookSnapshot.load(workbook_path)
+
+        with profiler.stage("validate"):
+            formula_report = self._validator.validate_snapshot(snapshot)
         if fail_on_formula_issues and formula_report.has_errors:
             raise ValueError(
                 f"Formula validation failed with {len(formula_report.issues)} issues."
             )
+        if recalc == "native":
+            with profiler.stage("recalc"):
+                recalc_output = recalc_snapshot(snapshot, self._builder.cell_map)
+            if recalc_output["status"] != "ok":
+                # A mapped cell left as an error string would be coerced to 0 in the payload.
+                raise ValueError(_native_recalc_failure(recalc_output))
+        return snapshot, formula_report, recalc_output
 
-        payload = self._builder.build_from_workbook(workbook_path)
+    def _record_history(self, payloads: list[QuotePayload]) -> None:
+        # One transaction per workbook: batch workers are never closed, so nothing is buffered.
+        # History is a side record; a locked or broken database must not cost the outputs.
+        if self._history is None:
+            return
+        try:
+            self._history.add_many(payloads)
+        except sqlite3.Error as exc:
+            warnings.warn(f"Quote history not recorded: {exc}", RuntimeWarning, stacklevel=2)
 
-        json_output_path = self._write_json(payload)
-        pdf_output_path = self._write_pdf(payload)
+    def _submit_rendered(
+        self,
+        workbook_path: Path,
+        fail_on_formula_issues: bool,
+        recalc: str | None,
+    ) -> Future[RenderedQuote]:
+        profiler = StageProfiler(self._profile)
+        snapshot, formula_report, recalc_output = self._load_and_validate(
+            workbook_path, fail_on_formula_issues, recalc, profiler
+        )
 
-        return PipelineResult(
-            workbook_path=str(workbook_path),
-            formula_report=formula_report.to_dict(),
-            json_output_path=str(json_output_path),
-            pdf_output_path=str(pdf_output_path),
-            recalc_output=recalc_output,
+        with profiler.stage("build"):
+            payload = self._builder.build_from_snapshot(snapshot)
+        with profiler.stage("history"):
+            self._record_history([payload])
+        return self._submit_outputs(
+            workbook_path,
+            payload,
+            formula_report,
+            recalc_output,
+            profiler,
+            _context(snapshot, formula_report, 1),
         )
 
-    def _write_json(self, payload: object) -> Path:
-        data = payload.to_json()  # type: ignore[attr-defined]
-        output_dir = self._settings.output_json_dir
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = output_dir / f"{payload.quote_id}.json"  # type: ignore[attr-defined]
-        output_path.write_text(data, encoding="utf-8")
-        return output_path
+    def _submit_outputs(
+        self,
+        workbook_path: Path,
+        payload: QuotePayload,
+        formula_report: FormulaValidationReport,
+        recalc_output: dict[str, object] | None,
+        profiler: StageProfiler,
+        context: dict[str, object],
+    ) -> Future[RenderedQuote]:
+        rendered: Future[RenderedQuote] = Future()
+        report = formula_report.to_dict()
+
+        def _finish(artifacts_future: Future[CommittedArtifacts]) -> None:
+            try:
+                artifacts = artifacts_future.result()
+            except BaseException as exc:
+                rendered.set_exception(exc)
+                return
+            result = PipelineResult(
+                workbook_path=str(workbook_path),
+                formula_report=report,
+                json_output_path=str(artifacts.json_output_path),
+                pdf_output_path=str(artifacts.pdf_output_path),
+                recalc_output=recalc_output,
+                json_committed_at_utc=artifacts.json_committed_at_utc,
+                pdf_committed_at_utc=artifacts.pdf_committed_at_utc,
+                json_offset=artifacts.json_offset,
+                profile=_profile(profiler, artifacts, context) if self._profile else None,
+            )
+            rendered.set_result(RenderedQuote(result, payload, artifacts.pdf_bytes))
+
+        self._output_stage.submit(payload, profile=self._profile).add_done_callback(_finish)
+        return rendered
 
-    def _write_pdf(self, payload: object) -> Path:
-        output_dir = self._settings.output_pdf_dir
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = output_dir / f"{payload.quote_id}.pdf"  # type: ignore[attr-defined]
-        return self._pdf_renderer.render(payload, output_path)
+    def run_batch(
+        self,
+        workbook_paths: Iterable[Path | str],
+        workers: int = 1,
+        fail_on_formula_issues: bool = True,
+        run_recalc: bool = False,
+        recalc: str | None = None,
+    ) -> Iterator[BatchItemResult]:
+        paths = [Path(path) for path in workbook_paths]
+        mode = recalc_mode(run_recalc, recalc)
+        if workers <= 1:
+            yield from iter_serial_results(self, paths, fail_on_formula_issues, mode)
+            return
+
+        yield from iter_pool_results(
+            self._settings,
+            paths,
+            workers,
+            fail_on_formula_issues,
+            mode,
+            recalc_workers=1 if self._recalc_workers > 0 else 0,
+            profile=self._profile,
+        )
 
     def _run_recalc_if_requested(
         self,
@@ -87,13 +309,37 @@ class QuotePipeline:
                 "reason": f"recalc script not found: {script_path}",
             }
 
+        if self._recalc_workers > 0:
+            if self._recalc_pool is None:
+                self._recalc_pool = RecalcWorkerPool(
+                    script_path,
+                    size=self._recalc_workers,
+                    job_timeout=self.RECALC_TIMEOUT_SECONDS * 2,
+                    recalc_timeout=self.RECALC_TIMEOUT_SECONDS,
+                )
+            recalc_output = self._recalc_pool.recalc(workbook_path)
+            if recalc_output.get("parsed") is None and "stdout" in recalc_output:
+                recalc_output["parsed"] = _parse_json_output(str(recalc_output["stdout"]))
+            return recalc_output
+
         command = [
             sys.executable,
             str(script_path),
             str(workbook_path),
-            "60",
+            str(self.RECALC_TIMEOUT_SECONDS),
         ]
-        completed = subprocess.run(command, capture_output=True, text=True)
+        try:
+            completed = subprocess.run(
+                command,
+                capture_output=True,
+                text=True,
+                timeout=self.RECALC_TIMEOUT_SECONDS * 2,
+            )
+        except subprocess.TimeoutExpired:
+            return {
+                "status": "failed",
+                "reason": f"recalc timed out after {self.RECALC_TIMEOUT_SECONDS * 2}s",
+            }
 
         parsed: dict[str, object] | None = _parse_json_output(completed.stdout)
         return {
@@ -105,6 +351,69 @@ class QuotePipeline:
         }
 
 
+def recalc_mode(run_recalc: bool, recalc: str | None) -> str | None:
+    """One of RECALC_MODES or None, folding in the legacy ``run_recalc`` flag."""
+    if recalc is None:
+        return "libreoffice" if run_recalc else None
+    if recalc not in RECALC_MODES:
+        raise ValueError(
+            f"Unknown recalc mode: {recalc}. Expected one of {', '.join(RECALC_MODES)}."
+        )
+    return recalc
+
+
+def _native_recalc_failure(recalc_output: dict[str, object]) -> str:
+    details = []
+    for key, label in (
+        ("failed_targets", "error cells"),
+        ("unsupported_functions", "unsupported functions"),
+    ):
+        values = recalc_output.get(key)
+        if isinstance(values, list) and values:
+            details.append(f"{label}: {', '.join(str(value) for value in values)}")
+    return f"Native recalc failed ({'; '.join(details)})."
+
+
+def _pipeline_result(rendered: Future[RenderedQuote]) -> Future[PipelineResult]:
+    result: Future[PipelineResult] = Future()
+
+    def _done(done: Future[RenderedQuote]) -> None:
+        try:
+            result.set_result(done.result().result)
+        except BaseException as exc:
+            result.set_exception(exc)
+
+    rendered.add_done_callback(_done)
+    return result
+
+
+def _context(
+    snapshot: WorkbookSnapshot,
+    formula_report: FormulaValidationReport,
+    quotes: int,
+) -> dict[str, object]:
+    try:
+        workbook_bytes = snapshot.workbook_path.stat().st_size
+    except OSError:
+        workbook_bytes = 0
+    return {
+        "workbook_bytes": workbook_bytes,
+        "sheets": len(snapshot.sheetnames),
+        "formula_cells": snapshot.total_formulas,
+        "formula_templates": formula_report.formula_templates,
+        "quotes": quotes,
+    }
+
+
+def _profile(
+    profiler: StageProfiler,
+    artifacts: CommittedArtifacts,
+    context: dict[str, object],
+) -> dict[str, object]:
+    spans = [*profiler.spans, *artifacts.spans]
+    return {"stages": [span.to_dict() for span in spans], "context": context}
+
+
 def _parse_json_output(stdout: str) -> dict[str, object] | None:
     text = stdout.strip()
     if not text:
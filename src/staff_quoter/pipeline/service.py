@@ -0,0 +1,484 @@
+from __future__ import annotations
+
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Mapping
+from urllib.parse import parse_qs, urlsplit
+import asyncio
+import base64
+import json
+import re
+import tempfile
+import time
+import zipfile
+
+from openpyxl import load_workbook
+
+from staff_quoter.config import Settings
+
+from .profiling import METRIC_PREFIX
+from .runner import QuotePipeline, recalc_mode
+
+DEFAULT_MAX_BODY_BYTES = 20 * 1024 * 1024
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+LATENCY_QUANTILES = (0.5, 0.9, 0.99)
+
+_CELL_PATTERN = re.compile(r"^[A-Z]{1,3}[1-9][0-9]{0,6}$")
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    415: "Unsupported Media Type",
+    422: "Unprocessable Entity",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+
+
+@dataclass(frozen=True)
+class HTTPResponse:
+    status: int
+    body: bytes = b""
+    content_type: str = "application/json"
+    headers: Mapping[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def json(
+        cls,
+        status: int,
+        data: object,
+        headers: Mapping[str, str] | None = None,
+    ) -> HTTPResponse:
+        body = json.dumps(data, ensure_ascii=True, separators=(",", ":")).encode("utf-8")
+        return cls(status, body, headers=dict(headers or {}))
+
+    def encode(self, keep_alive: bool) -> bytes:
+        lines = [
+            f"HTTP/1.1 {self.status} {_REASONS.get(self.status, 'Unknown')}",
+            f"Content-Type: {self.content_type}",
+            f"Content-Length: {len(self.body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+            *(f"{name}: {value}" for name, value in self.headers.items()),
+        ]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + self.body
+
+
+class QuoteService:
+    """Asyncio HTTP front end for :class:`QuotePipeline` (stdlib only, meant for localhost).
+
+    ``POST /quote`` takes either the workbook bytes or a JSON body
+    ``{"input_quote": {"H2": 40, ...}}`` whose cells are written into the
+    template workbook and recalculated natively. It answers with the payload,
+    the formula report and the PDF (base64, or the raw bytes with
+    ``?format=pdf``). Quotes are also committed to the configured JSON/PDF
+    outputs, exactly like the CLI.
+
+    Extraction, validation and rendering run in a pool of ``workers`` warm
+    processes, so the event loop only parses HTTP. At most ``max_queue``
+    quotes may be admitted (running or waiting for a worker); beyond that
+    requests get 503. A quote slower than ``request_timeout`` gets 504 but
+    keeps its slot until the worker actually finishes. If a worker process
+    dies, the quote it was running gets 503 and the pool is replaced and
+    warmed up again. ``GET /metrics`` reports latency percentiles, queue depth
+    and responses by status in Prometheus text format.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        workers: int = 2,
+        max_queue: int = 16,
+        request_timeout: float = 30.0,
+        max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+        recalc: str | None = None,
+        fail_on_formula_issues: bool = True,
+        template: Path | str | None = None,
+        latency_window: int = 1024,
+    ) -> None:
+        if workers < 1 or max_queue < 1:
+            raise ValueError("workers and max_queue must be >= 1")
+        self._settings = settings
+        self._workers = workers
+        self._max_queue = max_queue
+        self._request_timeout = request_timeout
+        self._max_body_bytes = max_body_bytes
+        self._recalc = recalc_mode(False, recalc)
+        self._fail_on_formula_issues = fail_on_formula_issues
+        self._template = Path(template) if template is not None else settings.default_workbook
+        self._executor: ProcessPoolExecutor | None = None
+        self._warming: asyncio.Future | None = None
+        self._server: asyncio.Server | None = None
+
+        self._admitted = 0
+        self._latencies: deque[float] = deque(maxlen=latency_window)
+        self._responses: Counter[int] = Counter()
+
+    @property
+    def admitted(self) -> int:
+        """Quotes running or waiting for a worker."""
+        return self._admitted
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> tuple[str, int]:
+        """Start the worker pool (warmed up) and listen; return the bound address."""
+        self._executor = self._spawn_executor()
+        await self._warm(self._executor)
+        self._server = await asyncio.start_server(
+            self._handle_connection, host, port, limit=64 * 1024
+        )
+        bound = self._server.sockets[0].getsockname()
+        return bound[0], bound[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            raise RuntimeError("QuoteService.start() must be awaited first")
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._warming is not None:
+            self._warming.cancel()
+            self._warming = None
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.get_running_loop().run_in_executor(
+                None, lambda: executor.shutdown(wait=True, cancel_futures=True)
+            )
+
+    async def handle(
+        self,
+        method: str,
+        target: str,
+        headers: Mapping[str, str],
+        body: bytes,
+    ) -> HTTPResponse:
+        url = urlsplit(target)
+        if url.path == "/quote":
+            if method != "POST":
+                return HTTPResponse.json(405, {"error": "use POST"}, {"Allow": "POST"})
+            started = time.perf_counter()
+            response = await self._quote(headers, body, parse_qs(url.query))
+            self._latencies.append(time.perf_counter() - started)
+            return response
+        if url.path in ("/metrics", "/healthz"):
+            if method != "GET":
+                return HTTPResponse.json(405, {"error": "use GET"}, {"Allow": "GET"})
+            if url.path == "/healthz":
+                return HTTPResponse.json(200, {"status": "ok", "admitted": self._admitted})
+            return HTTPResponse(200, self.metrics().encode("utf-8"), "text/plain; version=0.0.4")
+        return HTTPResponse.json(404, {"error": f"no route for {url.path}"})
+
+    def metrics(self) -> str:
+        latencies = sorted(self._latencies)
+        queue_depth = max(0, self._admitted - self._workers)
+        lines = [
+            f"# HELP {METRIC_PREFIX}_http_quote_latency_seconds Latency of recent /quote requests.",
+            f"# TYPE {METRIC_PREFIX}_http_quote_latency_seconds summary",
+        ]
+        for quantile in LATENCY_QUANTILES:
+            value = _percentile(latencies, quantile)
+            lines.append(
+                f'{METRIC_PREFIX}_http_quote_latency_seconds{{quantile="{quantile:g}"}} '
+                f"{value:.6f}"
+            )
+        lines += [
+            f"{METRIC_PREFIX}_http_quote_latency_seconds_sum {sum(latencies):.6f}",
+            f"{METRIC_PREFIX}_http_quote_latency_seconds_count {len(latencies)}",
+            f"# HELP {METRIC_PREFIX}_http_queue_depth Admitted quotes waiting for a worker.",
+            f"# TYPE {METRIC_PREFIX}_http_queue_depth gauge",
+            f"{METRIC_PREFIX}_http_queue_depth {queue_depth}",
+            f"# HELP {METRIC_PREFIX}_http_in_flight Admitted quotes, running or queued.",
+            f"# TYPE {METRIC_PREFIX}_http_in_flight gauge",
+            f"{METRIC_PREFIX}_http_in_flight {self._admitted}",
+            f"# HELP {METRIC_PREFIX}_http_queue_limit Admission limit before 503.",
+            f"# TYPE {METRIC_PREFIX}_http_queue_limit gauge",
+            f"{METRIC_PREFIX}_http_queue_limit {self._max_queue}",
+            f"# HELP {METRIC_PREFIX}_http_responses_total /quote responses by status.",
+            f"# TYPE {METRIC_PREFIX}_http_responses_total counter",
+        ]
+        for status, count in sorted(self._responses.items()):
+            lines.append(f'{METRIC_PREFIX}_http_responses_total{{status="{status}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    async def _quote(
+        self,
+        headers: Mapping[str, str],
+        body: bytes,
+        query: Mapping[str, list[str]],
+    ) -> HTTPResponse:
+        response = self._admit_and_parse(headers, body)
+        if isinstance(response, HTTPResponse):
+            self._responses[response.status] += 1
+            return response
+        kind, data = response
+
+        if self._executor is None:
+            raise RuntimeError("QuoteService.start() must be awaited first")
+        try:
+            job = self._submit(kind, data)
+        except BrokenProcessPool:
+            response = _worker_died()
+            self._responses[response.status] += 1
+            return response
+        executor = self._executor
+        self._admitted += 1
+        pending = asyncio.wrap_future(job)
+        # Released when the worker is done, not when the caller gives up waiting.
+        pending.add_done_callback(self._release)
+        try:
+            result = await asyncio.wait_for(asyncio.shield(pending), self._request_timeout)
+        except TimeoutError:
+            job.cancel()  # only succeeds while the quote is still waiting for a worker
+            response = HTTPResponse.json(
+                504, {"error": f"quote did not finish within {self._request_timeout:g}s"}
+            )
+        except BrokenProcessPool:
+            # The quote may be what killed the worker, so it is not retried here.
+            self._restart_workers(executor)
+            response = _worker_died()
+        except (ValueError, KeyError, zipfile.BadZipFile) as exc:
+            response = HTTPResponse.json(422, {"error": f"{type(exc).__name__}: {exc}"})
+        except Exception as exc:
+            response = HTTPResponse.json(500, {"error": f"{type(exc).__name__}: {exc}"})
+        else:
+            response = _quote_response(result, query.get("format", ["json"])[0])
+        self._responses[response.status] += 1
+        return response
+
+    def _submit(self, kind: str, data: Any) -> Future:
+        assert self._executor is not None
+        executor = self._executor
+        args = (kind, data, self._fail_on_formula_issues, self._recalc)
+        try:
+            return executor.submit(_quote_in_worker, *args)
+        except BrokenProcessPool:
+            # Broke while idle: this quote never ran, so it goes straight to a fresh pool.
+            self._restart_workers(executor)
+            return self._executor.submit(_quote_in_worker, *args)
+
+    def _spawn_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self._workers,
+            initializer=_init_service_worker,
+            initargs=(self._settings, self._template),
+        )
+
+    async def _warm(self, executor: ProcessPoolExecutor) -> None:
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(loop.run_in_executor(executor, _warm_up) for _ in range(self._workers))
+        )
+
+    def _restart_workers(self, broken: ProcessPoolExecutor) -> None:
+        # Every quote on a broken pool fails with it; only the first one to notice replaces it.
+        if self._executor is not broken:
+            return
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._spawn_executor()
+        self._warming = asyncio.ensure_future(self._warm(self._executor))
+        self._warming.add_done_callback(_ignore_result)
+
+    def _admit_and_parse(
+        self,
+        headers: Mapping[str, str],
+        body: bytes,
+    ) -> HTTPResponse | tuple[str, Any]:
+        if self._admitted >= self._max_queue:
+            return HTTPResponse.json(
+                503, {"error": f"quote queue is full ({self._max_queue})"}, {"Retry-After": "1"}
+            )
+        content_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+        if content_type == "application/json":
+            try:
+                document = json.loads(body)
+            except json.JSONDecodeError as exc:
+                return HTTPResponse.json(400, {"error": f"invalid JSON: {exc}"})
+            inputs = document.get("input_quote") if isinstance(document, dict) else None
+            if not isinstance(inputs, dict) or not inputs:
+                return HTTPResponse.json(
+                    400, {"error": 'expected {"input_quote": {"<cell>": <value>, ...}}'}
+                )
+            bad = [cell for cell in inputs if not _CELL_PATTERN.match(str(cell))]
+            if bad:
+                return HTTPResponse.json(400, {"error": f"invalid cell references: {bad}"})
+            return "inputs", inputs
+        if content_type not in (XLSX_CONTENT_TYPE, "application/octet-stream", ""):
+            return HTTPResponse.json(415, {"error": f"unsupported content type {content_type}"})
+        if not body.startswith(b"PK"):
+            return HTTPResponse.json(400, {"error": "body is not an .xlsx workbook"})
+        return "workbook", body
+
+    def _release(self, pending: asyncio.Future) -> None:
+        self._admitted -= 1
+        if not pending.cancelled():
+            pending.exception()  # mark retrieved when the caller already got a 504
+
+    async def _handle_connection(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                request = _parse_head(head)
+                if request is None:
+                    writer.write(HTTPResponse.json(400, {"error": "bad request"}).encode(False))
+                    break
+                method, target, version, headers = request
+
+                response = None
+                if "transfer-encoding" in headers:
+                    response = HTTPResponse.json(411, {"error": "send Content-Length"})
+                length = headers.get("content-length", "0")
+                if not length.isdigit():
+                    response = HTTPResponse.json(400, {"error": "invalid Content-Length"})
+                elif int(length) > self._max_body_bytes:
+                    response = HTTPResponse.json(
+                        413, {"error": f"body exceeds {self._max_body_bytes} bytes"}
+                    )
+                if response is not None:
+                    writer.write(response.encode(False))
+                    break
+                body = await reader.readexactly(int(length))
+
+                try:
+                    response = await self.handle(method, target, headers, body)
+                except Exception as exc:
+                    response = HTTPResponse.json(500, {"error": f"{type(exc).__name__}: {exc}"})
+                keep_alive = version == "HTTP/1.1" and headers.get("connection") != "close"
+                writer.write(response.encode(keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+def _parse_head(head: bytes) -> tuple[str, str, str, dict[str, str]] | None:
+    try:
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")
+        method, target, version = request_line.split(" ")
+    except ValueError:
+        return None
+    headers = {}
+    for line in header_lines:
+        if not line:
+            continue
+        name, sep, value = line.partition(":")
+        if not sep:
+            return None
+        headers[name.strip().lower()] = value.strip()
+    if "connection" in headers:
+        headers["connection"] = headers["connection"].lower()
+    return method.upper(), target, version, headers
+
+
+def _quote_response(result: dict[str, Any], output_format: str) -> HTTPResponse:
+    if output_format == "pdf":
+        return HTTPResponse(
+            200,
+            result["pdf"],
+            "application/pdf",
+            {"X-Quote-Id": str(result["payload"]["quote_id"])},
+        )
+    document = {key: value for key, value in result.items() if key != "pdf"}
+    document["pdf_base64"] = base64.b64encode(result["pdf"]).decode("ascii")
+    return HTTPResponse.json(200, document)
+
+
+def _worker_died() -> HTTPResponse:
+    return HTTPResponse.json(
+        503, {"error": "a quote worker process died; retry the request"}, {"Retry-After": "1"}
+    )
+
+
+def _ignore_result(task: asyncio.Future) -> None:
+    if not task.cancelled():
+        task.exception()  # a pool that breaks again during warm-up shows up on the next quote
+
+
+def _percentile(values: list[float], quantile: float) -> float:
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, round(quantile * (len(values) - 1))))
+    return values[index]
+
+
+_worker_pipeline: QuotePipeline | None = None
+_worker_template: Path | None = None
+
+
+def _init_service_worker(settings: Settings, template: Path) -> None:
+    global _worker_pipeline, _worker_template
+    _worker_pipeline = QuotePipeline(settings)
+    _worker_template = template
+
+
+def _warm_up() -> bool:
+    return _worker_pipeline is not None
+
+
+def _quote_in_worker(
+    kind: str,
+    data: Any,
+    fail_on_formula_issues: bool,
+    recalc: str | None,
+) -> dict[str, Any]:
+    if _worker_pipeline is None or _worker_template is None:
+        raise RuntimeError("service worker was not initialized")
+    with tempfile.TemporaryDirectory(prefix="staff-quoter-http-") as tmp:
+        workbook_path = Path(tmp) / "request.xlsx"
+        if kind == "inputs":
+            _write_inputs(_worker_template, workbook_path, data)
+            # Cached values in the template are stale once inputs change.
+            recalc = recalc or "native"
+        else:
+            workbook_path.write_bytes(data)
+        rendered = _worker_pipeline.run_rendered(
+            workbook_path, fail_on_formula_issues=fail_on_formula_issues, recalc=recalc
+        )
+    result = rendered.result
+    return {
+        "payload": rendered.payload.to_dict(),
+        "formula_report": {
+            key: value for key, value in result.formula_report.items() if key != "workbook_path"
+        },
+        "recalc_output": result.recalc_output,
+        "json_output_path": result.json_output_path,
+        "pdf_output_path": result.pdf_output_path,
+        "pdf": rendered.pdf_bytes,
+    }
+
+
+def _write_inputs(template: Path, target: Path, inputs: Mapping[str, object]) -> None:
+    if not template.exists():
+        raise FileNotFoundError(f"Template workbook not found: {template}")
+    wb = load_workbook(template)
+    try:
+        ws = wb["INPUT_QUOTE"]
+        for cell, value in inputs.items():
+            ws[cell] = value
+        wb.save(target)
+    finally:
+        wb.close()
+
@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+from typing import Callable, Mapping, Sequence
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from .cell_map import QUOTE_CELL_MAP, CellField
+from .formula_engine import (
+    ExcelError,
+    FormulaEngine,
+    Node,
+    RangeValue,
+    call_function,
+    call_lazy_function,
+    evaluate_operator,
+    evaluate_unary,
+    function_kind,
+)
+from .models import QuotePayload
+from .quote_columns import coerce_column
+from .workbook_reader import WorkbookSnapshot
+
+CellKey = tuple[str, str]
+_VectorFunction = Callable[[list[object]], "np.ndarray | None"]
+# _numeric() yields a column per scenario or one scalar shared by all of them.
+_BinaryUfunc = Callable[["np.ndarray | float", "np.ndarray | float"], np.ndarray]
+
+_ARITHMETIC: dict[str, _BinaryUfunc] = {
+    "+": np.add,
+    "-": np.subtract,
+    "*": np.multiply,
+    "/": np.divide,
+    "^": np.power,
+}
+_VECTOR_COMPARISONS: dict[str, _BinaryUfunc] = {
+    "=": np.equal,
+    "<>": np.not_equal,
+    "<": np.less,
+    ">": np.greater,
+    "<=": np.less_equal,
+    ">=": np.greater_equal,
+}
+
+
+def scenario_grid(axes: Mapping[CellKey, Sequence[object]]) -> dict[CellKey, list[object]]:
+    """Cartesian product of per-cell input values: one list entry per scenario."""
+    keys = list(axes)
+    combos = list(itertools.product(*(list(axes[key]) for key in keys)))
+    return {key: [combo[idx] for combo in combos] for idx, key in enumerate(keys)}
+
+
+class QuoteSweep:
+    """Evaluates the quote formulas over many input scenarios at once.
+
+    Input cells are overridden with one array per cell; every formula that
+    depends on them is evaluated once over the whole array with NumPy, and
+    formulas that do not are evaluated once as scalars. Functions without a
+    vectorized form fall back to the scalar implementation per scenario, only
+    for the calls whose arguments actually vary.
+    """
+
+    def __init__(
+        self,
+        snapshot: WorkbookSnapshot,
+        cell_map: Sequence[CellField] = QUOTE_CELL_MAP,
+    ) -> None:
+        self._snapshot = snapshot
+        self._cell_map = tuple(cell_map)
+        self.unsupported_functions: set[str] = set()
+
+    def run(self, scenarios: Mapping[CellKey, Sequence[object]]) -> pd.DataFrame:
+        """Return one row per scenario: the input overrides followed by the payload fields."""
+        sizes = {len(values) for values in scenarios.values()}
+        if len(sizes) > 1:
+            raise ValueError("Every scenario input must have the same number of values.")
+        size = sizes.pop() if sizes else 1
+
+        engine = _VectorEngine(self._snapshot, size)
+        inputs: dict[str, list[object]] = {}
+        for (sheet, coordinate), values in scenarios.items():
+            values = list(values)
+            engine.set_value(sheet, coordinate, _compact(values))
+            inputs[f"{sheet}!{coordinate.upper()}"] = values
+
+        columns: dict[str, list[object]] = dict(inputs)
+        for field in self._cell_map:
+            if field.sheet in self._snapshot:
+                value = engine.value(field.sheet, field.cell)
+            else:
+                value = None
+            columns[field.name] = coerce_column(_broadcast(value, size), field.kind)
+        columns["quote_id"] = [quote_id or "UNKNOWN" for quote_id in columns["quote_id"]]
+        columns["generated_at_utc"] = [QuotePayload.now_iso()] * size
+        self.unsupported_functions |= engine.unsupported_functions
+        return pd.DataFrame(columns)
+
+
+class _VectorEngine(FormulaEngine):
+    def __init__(self, snapshot: WorkbookSnapshot, size: int) -> None:
+        super().__init__(snapshot)
+        self._size = size
+
+    def evaluate_node(self, node: Node, sheet: str) -> object:
+        kind = node[0]
+        if kind == "op":
+            op = node[1]
+            left, right = self.evaluate_node(node[2], sheet), self.evaluate_node(node[3], sheet)
+            if not (_has_vector(left) or _has_vector(right)):
+                return evaluate_operator(op, left, right)
+            if isinstance(left, RangeValue) or isinstance(right, RangeValue):
+                return self._per_scenario(
+                    lambda i: evaluate_operator(op, _pick(left, i), _pick(right, i))
+                )
+            return self._vector_binary(op, left, right)
+        if kind in ("neg", "pct"):
+            value = self.evaluate_node(node[1], sheet)
+            if isinstance(value, np.ndarray):
+                scale = -1.0 if kind == "neg" else 0.01
+                numbers = _numeric(value)
+                if numbers is not None:
+                    return numbers * scale
+                return self._per_scenario(lambda i: evaluate_unary(kind, _pick(value, i)))
+        if kind == "call":
+            return self._vector_call(node[1], node[2], sheet)
+        return super().evaluate_node(node, sheet)
+
+    def _vector_binary(self, op: str, left: object, right: object) -> object:
+        # Booleans rank above numbers in Excel comparisons; only arithmetic treats them as 0/1.
+        comparison = op in _VECTOR_COMPARISONS
+        a, b = _numeric(left, comparison), _numeric(right, comparison)
+        if a is not None and b is not None:
+            if op in _VECTOR_COMPARISONS:
+                return _VECTOR_COMPARISONS[op](a, b)
+            if op in _ARITHMETIC:
+                with np.errstate(all="ignore"):
+                    result = np.broadcast_to(_ARITHMETIC[op](a, b), (self._size,))
+                if op == "/":
+                    return _mark_errors(result, np.broadcast_to(b == 0, result.shape), "#DIV/0!")
+                if op == "^":
+                    invalid = np.broadcast_to((a == 0) & (b < 0), result.shape)
+                    result = _mark_errors(result, invalid, "#DIV/0!")
+                    if result.dtype != object:
+                        result = _mark_errors(result, ~np.isfinite(result), "#NUM!")
+                return result
+        return self._per_scenario(lambda i: evaluate_operator(op, _pick(left, i), _pick(right, i)))
+
+    def _vector_call(self, name: str, args: tuple[Node, ...], sheet: str) -> object:
+        kind = function_kind(name)
+        if kind is None:
+            self.unsupported_functions.add(name)
+            return ExcelError("#NAME?")
+
+        if kind == "lazy":
+            first = self.evaluate_node(args[0], sheet) if args else None
+            if not _has_vector(first):
+                return call_lazy_function(
+                    name,
+                    lambda index: first if index == 0 else self.evaluate_node(args[index], sheet),
+                    len(args),
+                )
+            values = [first] + [self.evaluate_node(arg, sheet) for arg in args[1:]]
+            if name == "IF":
+                selected = _vector_if(first, values)
+                if selected is not None:
+                    return selected
+            return self._per_scenario(
+                lambda i: call_lazy_function(
+                    name, lambda index: _pick(values[index], i), len(values)
+                )
+            )
+
+        values = [self.evaluate_node(arg, sheet) for arg in args]
+        if not any(_has_vector(value) for value in values):
+            return call_function(name, values)
+        vectorized = _VECTOR_FUNCTIONS.get(name)
+        if vectorized is not None:
+            result = vectorized(values)
+            if result is not None:
+                return result
+        return self._per_scenario(
+            lambda i: call_function(name, [_pick(value, i) for value in values])
+        )
+
+    def _per_scenario(self, compute: Callable[[int], object]) -> np.ndarray:
+        return _compact([compute(i) for i in range(self._size)])
+
+
+def _has_vector(value: object) -> bool:
+    if isinstance(value, np.ndarray):
+        return True
+    if isinstance(value, RangeValue):
+        return any(isinstance(item, np.ndarray) for item in value.flat())
+    return False
+
+
+def _item(value: object) -> object:
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _pick(value: object, index: int) -> object:
+    if isinstance(value, np.ndarray):
+        return _item(value[index])
+    if isinstance(value, RangeValue) and _has_vector(value):
+        return RangeValue([[_pick(item, index) for item in row] for row in value.rows])
+    return value
+
+
+def _compact(values: list[object]) -> np.ndarray:
+    if values and all(isinstance(value, bool) for value in values):
+        return np.array(values, dtype=bool)
+    if values and all(
+        isinstance(value, (int, float)) and not isinstance(value, bool) for value in values
+    ):
+        return np.array(values, dtype=float)
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def _numeric(value: object, strict: bool = False) -> np.ndarray | float | None:
+    if isinstance(value, np.ndarray):
+        kinds = "iuf" if strict else "biuf"
+        return value.astype(float) if value.dtype.kind in kinds else None
+    if value is None:
+        return 0.0
+    if isinstance(value, bool) and strict:
+        return None
+    if isinstance(value, (bool, int, float)):
+        return float(value)
+    return None
+
+
+def _mark_errors(result: np.ndarray, mask: np.ndarray, code: str) -> np.ndarray:
+    if not mask.any():
+        return result
+    marked = result.astype(object)
+    marked[mask] = ExcelError(code)
+    return marked
+
+
+def _broadcast(value: object, size: int) -> list[object]:
+    if isinstance(value, np.ndarray):
+        return [_item(item) for item in value]
+    return [value] * size
+
+
+def _vector_if(condition: object, values: list[object]) -> np.ndarray | None:
+    flags = _numeric(condition)
+    if flags is None or len(values) != 3:
+        return None
+    when_true, when_false = _numeric(values[1], strict=True), _numeric(values[2], strict=True)
+    if when_true is None or when_false is None:
+        return None
+    return np.where(flags != 0, when_true, when_false)
+
+
+def _numeric_args(values: list[object]) -> list[np.ndarray | float] | None:
+    numbers = []
+    for value in values:
+        number = _numeric(value)
+        if number is None:
+            return None
+        numbers.append(number)
+    return numbers
+
+
+def _round_half_away(numbers: np.ndarray, digits: np.ndarray | float, mode: str) -> np.ndarray:
+    factor = np.power(10.0, np.trunc(digits))
+    # Collapse binary noise (2.675 * 100 = 267.49999...) before rounding, like ROUND does.
+    scaled = np.round(np.abs(numbers) * factor, 9)
+    if mode == "half":
+        rounded = np.floor(scaled + 0.5)
+    elif mode == "up":
+        rounded = np.ceil(scaled)
+    else:
+        rounded = np.floor(scaled)
+    return np.sign(numbers) * rounded / factor
+
+
+def _rounding(mode: str) -> _VectorFunction:
+    def _apply(values: list[object]) -> np.ndarray | None:
+        numbers = _numeric_args(values)
+        if numbers is None or len(numbers) != 2:
+            return None
+        with np.errstate(all="ignore"):
+            return _round_half_away(np.asarray(numbers[0], dtype=float), numbers[1], mode)
+
+    return _apply
+
+
+def _reduce(function: Callable[..., np.ndarray]) -> _VectorFunction:
+    def _apply(values: list[object]) -> np.ndarray | None:
+        if any(isinstance(value, RangeValue) for value in values):
+            return None
+        # Blank references are ignored by SUM/MIN/MAX rather than counted as zero.
+        numbers = _numeric_args([value for value in values if value is not None])
+        if not numbers:
+            return None
+        return function(np.broadcast_arrays(*numbers), axis=0)
+
+    return _apply
+
+
+def _unary(function: Callable[[np.ndarray], np.ndarray]) -> _VectorFunction:
+    def _apply(values: list[object]) -> np.ndarray | None:
+        numbers = _numeric_args(values)
+        if numbers is None or len(numbers) != 1:
+            return None
+        return function(np.asarray(numbers[0], dtype=float))
+
+    return _apply
+
+
+def _multiple(function: Callable[[np.ndarray], np.ndarray]) -> _VectorFunction:
+    def _apply(values: list[object]) -> np.ndarray | None:
+        numbers = _numeric_args(values)
+        if numbers is None or len(numbers) != 2:
+            return None
+        number, significance = np.broadcast_arrays(
+            np.asarray(numbers[0], dtype=float), np.asarray(numbers[1], dtype=float)
+        )
+        # Sign and zero-significance edge cases keep the scalar semantics.
+        if np.any(significance == 0) or np.any((number > 0) & (significance < 0)):
+            return None
+        with np.errstate(all="ignore"):
+            return function(np.round(number / significance, 9)) * significance
+
+    return _apply
+
+
+_VECTOR_FUNCTIONS: dict[str, _VectorFunction] = {
+    "SUM": _reduce(np.sum),
+    "MIN": _reduce(np.min),
+    "MAX": _reduce(np.max),
+    "ROUND": _rounding("half"),
+    "ROUNDUP": _rounding("up"),
+    "ROUNDDOWN": _rounding("down"),
+    "ABS": _unary(np.abs),
+    "INT": _unary(np.floor),
+    "CEILING": _multiple(np.ceil),
+    "FLOOR": _multiple(np.floor),
+}
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+import random
+
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+ENGINE_TYPES = ("MACHINING", "FABRICATION", "ASSEMBLY")
+ERROR_TOKENS = ("#REF!", "#DIV/0!", "#VALUE!", "#N/A", "#NAME?")
+# Fill-down shapes a costing sheet actually uses; {left} is the previous column.
+_LOCAL_FORMULAS = (
+    "={left}{row}*1.15",
+    "=ROUND({left}{row}*$B{row},2)",
+    "=SUM($B{row}:{left}{row})",
+    "=IF($B{row}>0,{left}{row}/$B{row},0)",
+    "=MAX({left}{row},$A{row})+1",
+)
+
+
+@dataclass(frozen=True)
+class SyntheticWorkbookSpec:
+    """Shape of a generated quote workbook.
+
+    ``sheets`` costing sheets of ``rows`` x ``columns`` cells sit next to the
+    INPUT_QUOTE/CALC_OUTPUTS/QUOTE_OUTPUT tabs. ``formula_density`` is the share
+    of costing cells (after the two input columns) holding a formula;
+    ``cross_sheet_ratio`` of those read the previous costing sheet and
+    ``error_ratio`` carry an Excel error token.
+    """
+
+    sheets: int = 3
+    rows: int = 1000
+    columns: int = 8
+    formula_density: float = 0.6
+    cross_sheet_ratio: float = 0.1
+    error_ratio: float = 0.0
+    quotes: int = 1
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        if self.sheets < 0 or self.rows < 0 or self.quotes < 1:
+            raise ValueError("sheets and rows must be >= 0 and quotes >= 1")
+        if self.columns < 3:
+            raise ValueError("columns must be >= 3")
+        for name in ("formula_density", "cross_sheet_ratio", "error_ratio"):
+            if not 0.0 <= getattr(self, name) <= 1.0:
+                raise ValueError(f"{name} must be between 0 and 1")
+
+    @property
+    def label(self) -> str:
+        return (
+            f"{self.sheets}x{self.rows}x{self.columns}"
+            f"-f{self.formula_density:g}-x{self.cross_sheet_ratio:g}-e{self.error_ratio:g}"
+            f"-q{self.quotes}"
+        )
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "sheets": self.sheets,
+            "rows": self.rows,
+            "columns": self.columns,
+            "formula_density": self.formula_density,
+            "cross_sheet_ratio": self.cross_sheet_ratio,
+            "error_ratio": self.error_ratio,
+            "quotes": self.quotes,
+            "seed": self.seed,
+        }
+
+
+def generate_workbook(path: Path | str, spec: SyntheticWorkbookSpec) -> Path:
+    """Write a deterministic (per ``spec.seed``) quote workbook the pipeline can run as-is."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(spec.seed)
+    wb = Workbook(write_only=True)
+    _write_quote_sheets(wb, spec, rng)
+
+    previous: str | None = None
+    for index in range(1, spec.sheets + 1):
+        title = f"COSTING_{index:02d}"
+        ws = wb.create_sheet(title)
+        ws.append(["line", "qty", "rate", *(f"c{col}" for col in range(4, spec.columns + 1))])
+        for row in range(2, spec.rows + 2):
+            ws.append(_costing_row(row, spec, rng, previous))
+        previous = title
+
+    wb.save(path)
+    return path
+
+
+def _write_quote_sheets(wb: Workbook, spec: SyntheticWorkbookSpec, rng: random.Random) -> None:
+    ws_input = wb.create_sheet("INPUT_QUOTE")
+    ws_calc = wb.create_sheet("CALC_OUTPUTS")
+    ws_quote = wb.create_sheet("QUOTE_OUTPUT")
+    ws_input.append(["quote_id", "", "engine_type", "customer_name", "", "", "part_number"])
+    ws_calc.append(["", "total_cost", "total_price", "margin_pct", "lead_time_weeks", "moq"])
+    ws_quote.append(["", "", "pdf_ready_flag"])
+    for idx in range(spec.quotes):
+        cost = round(rng.uniform(50.0, 5000.0), 2)
+        margin = round(rng.uniform(0.1, 0.45), 4)
+        ws_input.append(
+            [
+                f"Q-SYN-{spec.seed:03d}-{idx:05d}",
+                None,
+                ENGINE_TYPES[idx % len(ENGINE_TYPES)],
+                f"Customer {rng.randrange(200):03d}",
+                None,
+                None,
+                f"PN-{rng.randrange(10_000):05d}",
+            ]
+        )
+        ws_calc.append(
+            [
+                None,
+                cost,
+                round(cost * (1 + margin), 2),
+                margin,
+                rng.randint(1, 12),
+                rng.choice((1, 10, 25, 50, 100)),
+            ]
+        )
+        ws_quote.append([None, None, "TRUE"])
+
+
+def _costing_row(
+    row: int,
+    spec: SyntheticWorkbookSpec,
+    rng: random.Random,
+    previous: str | None,
+) -> list[object]:
+    values: list[object] = [round(rng.uniform(1, 500)), round(rng.uniform(0.5, 250.0), 2)]
+    for col in range(3, spec.columns + 1):
+        if rng.random() >= spec.formula_density:
+            values.append(round(rng.uniform(0, 1000.0), 2))
+            continue
+        left = get_column_letter(col - 1)
+        if rng.random() < spec.error_ratio:
+            values.append(f"={left}{row}+{rng.choice(ERROR_TOKENS)}")
+        elif previous is not None and rng.random() < spec.cross_sheet_ratio:
+            values.append(f"={previous}!{get_column_letter(col)}{row}*{left}{row}")
+        else:
+            template = _LOCAL_FORMULAS[col % len(_LOCAL_FORMULAS)]
+            values.append(template.format(left=left, row=row))
+    return values
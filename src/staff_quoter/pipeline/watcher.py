@@ -0,0 +1,361 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterable
+import ctypes
+import ctypes.util
+import os
+import selectors
+import struct
+import threading
+import time
+
+from staff_quoter.config import Settings
+
+from .batch import BatchItemResult, WorkerPool, failed_item, finish_item, lost_item
+from .runner import QuotePipeline, recalc_mode
+
+WATCH_BACKENDS = ("auto", "inotify", "poll")
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+@dataclass(frozen=True)
+class _Pending:
+    path: Path
+    started: float
+    stat: tuple[int, int]
+    future: Future
+    pooled: bool
+    # Rerun by itself after a worker crash took it down along with others.
+    alone: bool = False
+
+
+class QuoteInboxDaemon:
+    """Keeps a warm :class:`QuotePipeline` and quotes every workbook dropped into ``inbox``.
+
+    Each finished workbook is moved to ``done_dir`` or ``failed_dir`` (the
+    latter with a ``.error.txt`` next to it). A workbook whose size or mtime
+    changed while it was being quoted stays in the inbox and is quoted again.
+    At most ``max_in_flight`` workbooks are in progress, oldest first, so a
+    deep backlog never queues unbounded work. With ``workers > 1`` extraction
+    runs in a persistent pool of warm worker processes instead of this one;
+    if a worker dies the pool is rebuilt and the workbooks it took down are
+    quoted again one at a time, so only one that crashes alone is failed.
+
+    On Linux the inbox is watched with inotify, so a file closed or renamed
+    into it is picked up immediately; elsewhere (or with ``watch="poll"``)
+    the directory is rescanned every ``poll_interval`` seconds and a file is
+    only taken once its mtime is ``settle_seconds`` old.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        inbox: Path | str,
+        done_dir: Path | str | None = None,
+        failed_dir: Path | str | None = None,
+        workers: int = 1,
+        max_in_flight: int = 4,
+        poll_interval: float = 1.0,
+        settle_seconds: float = 0.5,
+        watch: str = "auto",
+        fail_on_formula_issues: bool = True,
+        recalc: str | None = None,
+        recalc_workers: int = 0,
+    ) -> None:
+        if watch not in WATCH_BACKENDS:
+            raise ValueError(
+                f"Unknown watch backend: {watch}. Expected one of {', '.join(WATCH_BACKENDS)}."
+            )
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be >= 1")
+        self._inbox = Path(inbox)
+        self._done_dir = Path(done_dir) if done_dir is not None else self._inbox / "done"
+        self._failed_dir = Path(failed_dir) if failed_dir is not None else self._inbox / "failed"
+        for directory in (self._inbox, self._done_dir, self._failed_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+        self._max_in_flight = max_in_flight
+        self._poll_interval = poll_interval
+        self._settle_seconds = settle_seconds
+        self._fail_on_formula_issues = fail_on_formula_issues
+        self._recalc = recalc_mode(False, recalc)
+
+        self._pipeline: QuotePipeline | None = None
+        self._pool: WorkerPool | None = None
+        if workers > 1:
+            self._pool = WorkerPool(settings, workers, 1 if recalc_workers > 0 else 0)
+        else:
+            self._pipeline = QuotePipeline(settings, recalc_workers=recalc_workers)
+
+        self._watch = _InotifyWatch.open(self._inbox) if watch != "poll" else None
+        if watch == "inotify" and self._watch is None:
+            raise OSError("inotify is not available on this platform")
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._stopping = threading.Event()
+        self._pending: dict[Path, _Pending] = {}
+        self._suspects: deque[_Pending] = deque()
+        self._closed_names: set[str] = set()
+
+    @property
+    def backend(self) -> str:
+        return "inotify" if self._watch is not None else "poll"
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    def serve_forever(self, on_result: Callable[[BatchItemResult], None] | None = None) -> None:
+        """Quote workbooks as they arrive until :meth:`stop` is called."""
+        with selectors.DefaultSelector() as selector:
+            selector.register(self._wake_r, selectors.EVENT_READ)
+            if self._watch is not None:
+                selector.register(self._watch.fileno(), selectors.EVENT_READ)
+            while not self._stopping.is_set():
+                self._dispatch(on_result)
+                for key, _ in selector.select(self._poll_interval):
+                    if key.fd == self._wake_r:
+                        _drain(self._wake_r)
+                    elif self._watch is not None:
+                        self._closed_names.update(self._watch.read_names())
+            self._drain_pending(on_result)
+
+    def run_once(self, on_result: Callable[[BatchItemResult], None] | None = None) -> int:
+        """Quote everything currently waiting in the inbox, then return how many were handled."""
+        handled = 0
+
+        def _count(item: BatchItemResult) -> None:
+            nonlocal handled
+            handled += 1
+            if on_result is not None:
+                on_result(item)
+
+        while True:
+            self._dispatch(_count)
+            if not self._pending:
+                break
+            _wait_any(self._pending.values())
+        return handled
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._wake()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+        if self._pipeline is not None:
+            self._pipeline.close()
+        if self._watch is not None:
+            self._watch.close()
+        for fd in (self._wake_r, self._wake_w):
+            os.close(fd)
+
+    def _dispatch(self, on_result: Callable[[BatchItemResult], None] | None) -> None:
+        self._collect(on_result)
+        if self._suspects:
+            self._submit_suspect()
+            return
+        free = self._max_in_flight - len(self._pending)
+        if free <= 0:
+            return
+        for path, stat in self._ready()[:free]:
+            self._submit(path, stat)
+
+    def _ready(self) -> list[tuple[Path, tuple[int, int]]]:
+        now = time.time()
+        ready = []
+        seen = set()
+        with os.scandir(self._inbox) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.endswith(".xlsx") or name.startswith(("~$", ".")):
+                    continue
+                path = self._inbox / name
+                if path in self._pending or not entry.is_file():
+                    continue
+                seen.add(name)
+                stat = entry.stat()
+                closed = name in self._closed_names
+                if not closed and now - stat.st_mtime < self._settle_seconds:
+                    continue
+                ready.append((stat.st_mtime_ns, path, (stat.st_size, stat.st_mtime_ns)))
+        self._closed_names &= seen
+        ready.sort()
+        return [(path, stat) for _, path, stat in ready]
+
+    def _submit(self, path: Path, stat: tuple[int, int]) -> None:
+        self._closed_names.discard(path.name)
+        started = time.perf_counter()
+        if self._pool is not None:
+            self._track(_Pending(path, started, stat, self._pool_submit(path), pooled=True))
+            return
+        assert self._pipeline is not None
+        try:
+            future = self._pipeline.submit(
+                path, fail_on_formula_issues=self._fail_on_formula_issues, recalc=self._recalc
+            )
+        except Exception as exc:
+            future = Future()
+            future.set_exception(exc)
+        self._track(_Pending(path, started, stat, future, pooled=False))
+
+    def _submit_suspect(self) -> None:
+        # Suspects run with nothing else in flight, so a crash can be pinned on one workbook.
+        if not self._pending:
+            suspect = self._suspects.popleft()
+            self._track(replace(suspect, future=self._pool_submit(suspect.path), alone=True))
+
+    def _pool_submit(self, path: Path) -> Future:
+        assert self._pool is not None
+        try:
+            return self._pool.submit(path, self._fail_on_formula_issues, self._recalc)
+        except BrokenProcessPool as exc:
+            # Broke while idle: fail the future so _collect rebuilds the pool and reruns it.
+            future: Future = Future()
+            future.set_exception(exc)
+            return future
+
+    def _track(self, pending: _Pending) -> None:
+        self._pending[pending.path] = pending
+        pending.future.add_done_callback(lambda _: self._wake())
+
+    def _finish(self, pending: _Pending) -> BatchItemResult | None:
+        if _lost(pending):
+            item = lost_item(pending.path, pending.started)
+        elif pending.pooled:
+            try:
+                item = pending.future.result()
+            except Exception as exc:
+                item = failed_item(pending.path, pending.started, exc)
+        else:
+            item = finish_item(pending.path, pending.started, pending.future)
+
+        try:
+            current = pending.path.stat()
+        except FileNotFoundError:
+            return item
+        if (current.st_size, current.st_mtime_ns) != pending.stat:
+            return None  # rewritten while being quoted; the next scan picks it up again
+        target_dir = self._done_dir if item.ok else self._failed_dir
+        target = _unique_target(target_dir / pending.path.name)
+        os.replace(pending.path, target)
+        if not item.ok:
+            target.with_name(f"{target.name}.error.txt").write_text(
+                f"{item.error}\n", encoding="utf-8"
+            )
+        return item
+
+    def _collect(self, on_result: Callable[[BatchItemResult], None] | None) -> None:
+        done = [p for p in self._pending.values() if p.future.done()]
+        if any(_lost(p) for p in done):
+            self._restart_pool()
+            done = [p for p in self._pending.values() if p.future.done()]
+        for pending in done:
+            del self._pending[pending.path]
+            if _lost(pending) and not pending.alone:
+                self._suspects.append(pending)
+                continue
+            item = self._finish(pending)
+            if on_result is not None and item is not None:
+                on_result(item)
+
+    def _drain_pending(self, on_result: Callable[[BatchItemResult], None] | None) -> None:
+        while self._pending or self._suspects:
+            if self._suspects:
+                self._submit_suspect()
+            _wait_any(self._pending.values())
+            self._collect(on_result)
+
+    def _restart_pool(self) -> None:
+        # A broken pool fails every future it holds; wait for all of them so none
+        # of the old pool's failures is mistaken for a crash of the new one.
+        assert self._pool is not None
+        wait([p.future for p in self._pending.values() if p.pooled])
+        self._pool.restart()
+
+    def _wake(self) -> None:
+        try:
+            os.write(self._wake_w, b"\0")
+        except OSError:
+            pass  # pipe already full (a wake-up is pending) or daemon closed
+
+
+class _InotifyWatch:
+    def __init__(self, libc: ctypes.CDLL, fd: int) -> None:
+        self._libc = libc
+        self._fd = fd
+
+    @classmethod
+    def open(cls, directory: Path) -> _InotifyWatch | None:
+        """inotify watch on ``directory``, or None where inotify is unavailable."""
+        name = ctypes.util.find_library("c")
+        try:
+            libc = ctypes.CDLL(name or "libc.so.6", use_errno=True)
+            init, add_watch = libc.inotify_init1, libc.inotify_add_watch
+        except (OSError, AttributeError):
+            return None
+        fd = init(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            return None
+        mask = _IN_CLOSE_WRITE | _IN_MOVED_TO
+        if add_watch(fd, os.fsencode(str(directory)), mask) < 0:
+            os.close(fd)
+            return None
+        return cls(libc, fd)
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def read_names(self) -> set[str]:
+        names: set[str] = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return names
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(data):
+                _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                raw = data[offset : offset + length].split(b"\0", 1)[0]
+                offset += length
+                if raw:
+                    names.add(os.fsdecode(raw))
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def _lost(pending: _Pending) -> bool:
+    return pending.pooled and isinstance(pending.future.exception(), BrokenProcessPool)
+
+
+def _wait_any(pending: Iterable[_Pending]) -> None:
+    wait([p.future for p in pending], return_when=FIRST_COMPLETED)
+
+
+def _drain(fd: int) -> None:
+    try:
+        while os.read(fd, 4096):
+            pass
+    except BlockingIOError:
+        pass
+
+
+def _unique_target(path: Path) -> Path:
+    if not path.exists():
+        return path
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    return path.with_name(f"{path.stem}.{stamp}{path.suffix}")
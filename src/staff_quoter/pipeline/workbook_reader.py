@@ -0,0 +1,463 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import IO, Iterable, Iterator
+from xml.etree.ElementTree import iterparse
+import xml.etree.ElementTree as ET
+import zipfile
+
+from openpyxl.cell.text import Text
+from openpyxl.formula.translate import Translator
+from openpyxl.reader.strings import read_string_table
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import coordinate_to_tuple
+from openpyxl.utils.datetime import from_ISO8601
+
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+_ROW_TAG = f"{{{_MAIN_NS}}}row"
+_CELL_TAG = f"{{{_MAIN_NS}}}c"
+_VALUE_TAG = f"{{{_MAIN_NS}}}v"
+_FORMULA_TAG = f"{{{_MAIN_NS}}}f"
+_INLINE_STRING_TAG = f"{{{_MAIN_NS}}}is"
+_SHARED_STRING_TAG = f"{{{_MAIN_NS}}}si"
+_SHEET_DATA_TAG = f"{{{_MAIN_NS}}}sheetData"
+_SHEET_TAG = f"{{{_MAIN_NS}}}sheet"
+_DEFINED_NAME_TAG = f"{{{_MAIN_NS}}}definedName"
+_RELATIONSHIP_TAG = f"{{{_PKG_REL_NS}}}Relationship"
+
+_OFFICE_DOCUMENT_REL = "/officeDocument"
+_WORKSHEET_REL = "/worksheet"
+_SHARED_STRINGS_REL = "/sharedStrings"
+
+
+@dataclass(frozen=True)
+class SheetPart:
+    title: str
+    part_name: str
+
+
+@dataclass(frozen=True)
+class WorkbookParts:
+    sheetnames: list[str]
+    worksheets: list[SheetPart]
+    shared_strings_part: str | None
+    defined_names: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class SheetSnapshot:
+    title: str
+    formulas: list[tuple[str, str]] = field(default_factory=list)
+    values: dict[str, object] = field(default_factory=dict)
+
+    def value(self, coordinate: str) -> object:
+        return self.values.get(coordinate)
+
+
+class WorkbookSnapshot:
+    """Formula text and cached values of a workbook, parsed in a single pass per sheet.
+
+    Styles are not read, so date-formatted numeric cells come back as Excel
+    serial numbers rather than ``datetime`` objects.
+    """
+
+    def __init__(
+        self,
+        workbook_path: Path,
+        sheetnames: list[str],
+        worksheets: list[SheetSnapshot],
+        defined_names: dict[str, str] | None = None,
+    ) -> None:
+        self.workbook_path = workbook_path
+        self.sheetnames = sheetnames
+        self.worksheets = worksheets
+        self.defined_names = defined_names or {}
+        self._by_title = {ws.title: ws for ws in worksheets}
+
+    @classmethod
+    def load(cls, workbook_path: Path | str) -> WorkbookSnapshot:
+        workbook_path = Path(workbook_path)
+        with zipfile.ZipFile(workbook_path) as archive:
+            parts = read_workbook_parts(archive)
+            shared_strings = read_shared_strings(archive, parts)
+            worksheets = []
+            for sheet_part in parts.worksheets:
+                sheet = SheetSnapshot(title=sheet_part.title)
+                with archive.open(sheet_part.part_name) as stream:
+                    for coordinate, formula, value in iter_sheet_cells(stream, shared_strings):
+                        if formula is not None:
+                            sheet.formulas.append((coordinate, formula))
+                        if value is not None:
+                            sheet.values[coordinate] = value
+                worksheets.append(sheet)
+        return cls(workbook_path, parts.sheetnames, worksheets, parts.defined_names)
+
+    @property
+    def total_formulas(self) -> int:
+        return sum(len(ws.formulas) for ws in self.worksheets)
+
+    def __getitem__(self, title: str) -> SheetSnapshot:
+        try:
+            return self._by_title[title]
+        except KeyError:
+            raise KeyError(f"Worksheet {title} does not exist.") from None
+
+    def __contains__(self, title: str) -> bool:
+        return title in self._by_title
+
+    def read_columns(
+        self,
+        columns: Iterable[tuple[str, str, int]],
+    ) -> dict[tuple[str, str, int], list[object]]:
+        wanted = _group_columns(columns)
+        collected: dict[tuple[str, str, int], dict[int, object]] = {}
+        for sheet, sheet_columns in wanted.items():
+            for coordinate, value in self[sheet].values.items():
+                _collect_column_value(sheet, sheet_columns, coordinate, value, collected)
+        return _column_lists(wanted, collected)
+
+
+def read_workbook_parts(archive: zipfile.ZipFile) -> WorkbookParts:
+    workbook_part = _office_document_part(archive)
+    rels = _read_relationships(archive, workbook_part)
+
+    root = ET.fromstring(archive.read(workbook_part))
+    sheetnames: list[str] = []
+    worksheets: list[SheetPart] = []
+    for sheet in root.iter(_SHEET_TAG):
+        title = sheet.get("name", "")
+        sheetnames.append(title)
+        rel = rels.get(sheet.get(f"{{{_REL_NS}}}id", ""))
+        if rel is None:
+            continue
+        rel_type, target = rel
+        if rel_type.endswith(_WORKSHEET_REL):
+            worksheets.append(SheetPart(title=title, part_name=target))
+
+    # Sheet-scoped names are skipped; only workbook-level names are global.
+    defined_names = {
+        name.get("name", ""): (name.text or "").strip()
+        for name in root.iter(_DEFINED_NAME_TAG)
+        if name.get("localSheetId") is None and name.text
+    }
+
+    shared_strings_part = None
+    for rel_type, target in rels.values():
+        if rel_type.endswith(_SHARED_STRINGS_REL):
+            shared_strings_part = target
+            break
+
+    return WorkbookParts(
+        sheetnames=sheetnames,
+        worksheets=worksheets,
+        shared_strings_part=shared_strings_part,
+        defined_names=defined_names,
+    )
+
+
+def read_shared_strings(archive: zipfile.ZipFile, parts: WorkbookParts) -> list[str]:
+    if parts.shared_strings_part is None:
+        return []
+    try:
+        with archive.open(parts.shared_strings_part) as stream:
+            return read_string_table(stream)
+    except KeyError:
+        return []
+
+
+def iter_sheet_cells(
+    stream: IO[bytes],
+    shared_strings: list[str],
+) -> Iterator[tuple[str, str | None, object]]:
+    """Yield ``(coordinate, formula, cached_value)`` for every cell of a worksheet part.
+
+    Formulas are returned the way openpyxl reports them with ``data_only=False``
+    (leading ``=``, shared formulas translated); array and data-table formulas
+    are reported as ``None`` because openpyxl does not expose them as text.
+    """
+    shared_formulae: dict[str, Translator] = {}
+    for coordinate, element in _iter_cell_elements(stream):
+        formula = _parse_formula(element, coordinate, shared_formulae)
+        yield coordinate, formula, _parse_cached_value(element, shared_strings)
+
+
+def iter_sheet_formulas(stream: IO[bytes]) -> Iterator[tuple[str, str]]:
+    shared_formulae: dict[str, Translator] = {}
+    for coordinate, element in _iter_cell_elements(stream):
+        formula = _parse_formula(element, coordinate, shared_formulae)
+        if formula is not None:
+            yield coordinate, formula
+
+
+def read_cells(
+    workbook_path: Path | str,
+    cells: Iterable[tuple[str, str]],
+) -> dict[tuple[str, str], object]:
+    """Read the cached values of specific ``(sheet, coordinate)`` cells.
+
+    Each worksheet part is only parsed up to the highest row requested, and the
+    shared string table only up to the highest string index referenced, so the
+    cost does not grow with the size of the workbook. Number formats are not
+    applied: date-formatted cells are returned as Excel serial numbers.
+    """
+    wanted: dict[str, set[str]] = {}
+    for sheet, coordinate in cells:
+        wanted.setdefault(sheet, set()).add(coordinate.upper())
+
+    values: dict[tuple[str, str], object] = {}
+    string_refs: dict[tuple[str, str], int] = {}
+    with zipfile.ZipFile(workbook_path) as archive:
+        parts = read_workbook_parts(archive)
+        part_names = {part.title: part.part_name for part in parts.worksheets}
+        for sheet, coordinates in wanted.items():
+            if sheet not in part_names:
+                raise KeyError(f"Worksheet {sheet} does not exist.")
+            max_row = max(coordinate_to_tuple(coordinate)[0] for coordinate in coordinates)
+            with archive.open(part_names[sheet]) as stream:
+                for coordinate, element in _iter_cell_elements(stream, max_row=max_row):
+                    if coordinate not in coordinates:
+                        continue
+                    if element.get("t") == "s":
+                        raw_index = element.findtext(_VALUE_TAG, None)
+                        if raw_index:
+                            string_refs[(sheet, coordinate)] = int(raw_index)
+                        continue
+                    value = _parse_cached_value(element, [])
+                    if value is not None:
+                        values[(sheet, coordinate)] = value
+
+        if string_refs and parts.shared_strings_part is not None:
+            strings = _read_shared_strings_upto(
+                archive, parts.shared_strings_part, max(string_refs.values())
+            )
+            for key, index in string_refs.items():
+                values[key] = strings[index]
+
+    return values
+
+
+def read_columns(
+    workbook_path: Path | str,
+    columns: Iterable[tuple[str, str, int]],
+) -> dict[tuple[str, str, int], list[object]]:
+    """Read whole columns as lists of cached values.
+
+    ``columns`` holds ``(sheet, column_letter, first_row)`` triples. Every list
+    starts at its own ``first_row`` and all lists are padded with ``None`` to
+    the same length, so index ``k`` is the ``k``-th data row of each column.
+    """
+    wanted = _group_columns(columns)
+    collected: dict[tuple[str, str, int], dict[int, object]] = {}
+    with zipfile.ZipFile(workbook_path) as archive:
+        parts = read_workbook_parts(archive)
+        shared_strings = read_shared_strings(archive, parts)
+        part_names = {part.title: part.part_name for part in parts.worksheets}
+        for sheet, sheet_columns in wanted.items():
+            if sheet not in part_names:
+                raise KeyError(f"Worksheet {sheet} does not exist.")
+            with archive.open(part_names[sheet]) as stream:
+                for coordinate, element in _iter_cell_elements(stream):
+                    letters = coordinate.rstrip("0123456789")
+                    if letters not in sheet_columns:
+                        continue
+                    value = _parse_cached_value(element, shared_strings)
+                    _collect_column_value(sheet, sheet_columns, coordinate, value, collected)
+
+    return _column_lists(wanted, collected)
+
+
+def _group_columns(columns: Iterable[tuple[str, str, int]]) -> dict[str, dict[str, list[int]]]:
+    wanted: dict[str, dict[str, list[int]]] = {}
+    for sheet, letters, first_row in columns:
+        wanted.setdefault(sheet, {}).setdefault(letters.upper(), []).append(first_row)
+    return wanted
+
+
+def _collect_column_value(
+    sheet: str,
+    sheet_columns: dict[str, list[int]],
+    coordinate: str,
+    value: object,
+    collected: dict[tuple[str, str, int], dict[int, object]],
+) -> None:
+    if value is None:
+        return
+    letters = coordinate.rstrip("0123456789")
+    first_rows = sheet_columns.get(letters)
+    if first_rows is None:
+        return
+    row = int(coordinate[len(letters):])
+    for first_row in first_rows:
+        if row >= first_row:
+            collected.setdefault((sheet, letters, first_row), {})[row - first_row] = value
+
+
+def _column_lists(
+    wanted: dict[str, dict[str, list[int]]],
+    collected: dict[tuple[str, str, int], dict[int, object]],
+) -> dict[tuple[str, str, int], list[object]]:
+    length = max((max(cells) + 1 for cells in collected.values()), default=0)
+    columns: dict[tuple[str, str, int], list[object]] = {}
+    for sheet, sheet_columns in wanted.items():
+        for letters, first_rows in sheet_columns.items():
+            for first_row in first_rows:
+                cells = collected.get((sheet, letters, first_row), {})
+                columns[(sheet, letters, first_row)] = [cells.get(idx) for idx in range(length)]
+    return columns
+
+
+def _read_shared_strings_upto(
+    archive: zipfile.ZipFile,
+    part_name: str,
+    max_index: int,
+) -> list[str]:
+    strings: list[str] = []
+    with archive.open(part_name) as stream:
+        for _, element in iterparse(stream):
+            if element.tag == _SHARED_STRING_TAG:
+                strings.append(Text.from_tree(element).content.replace("x005F_", ""))
+                element.clear()
+                if len(strings) > max_index:
+                    break
+    return strings
+
+
+def _iter_cell_elements(
+    stream: IO[bytes],
+    max_row: int | None = None,
+) -> Iterator[tuple[str, ET.Element]]:
+    sheet_data: ET.Element | None = None
+    row_index = 0
+    col_index = 0
+    previous: str | None = None
+    for event, element in iterparse(stream, events=("start", "end")):
+        tag = element.tag
+        if event == "start":
+            if tag == _ROW_TAG:
+                row_attr = element.get("r")
+                row_index = int(row_attr) if row_attr else row_index + 1
+                if max_row is not None and row_index > max_row:
+                    return
+                col_index = 0
+                previous = None
+            elif tag == _SHEET_DATA_TAG:
+                sheet_data = element
+            continue
+
+        if tag == _CELL_TAG:
+            coordinate = element.get("r")
+            if not coordinate:
+                if previous is not None:
+                    col_index = _column_index(previous)
+                col_index += 1
+                coordinate = f"{get_column_letter(col_index)}{row_index}"
+            previous = coordinate
+            yield coordinate, element
+        elif tag == _ROW_TAG and sheet_data is not None:
+            sheet_data.clear()
+
+
+def _parse_formula(
+    element: ET.Element,
+    coordinate: str,
+    shared_formulae: dict[str, Translator],
+) -> str | None:
+    formula = element.find(_FORMULA_TAG)
+    if formula is None:
+        return None
+
+    formula_type = formula.get("t")
+    value = "="
+    if formula.text is not None:
+        value += formula.text
+
+    if formula_type == "shared":
+        idx = formula.get("si", "")
+        if idx in shared_formulae:
+            return shared_formulae[idx].translate_formula(coordinate)
+        if value != "=":
+            shared_formulae[idx] = Translator(value, coordinate)
+        return value
+    if formula_type in ("array", "dataTable"):
+        return None
+    return value
+
+
+def _parse_cached_value(element: ET.Element, shared_strings: list[str]) -> object:
+    data_type = element.get("t", "n")
+    if data_type == "inlineStr":
+        child = element.find(_INLINE_STRING_TAG)
+        return Text.from_tree(child).content if child is not None else None
+
+    value = element.findtext(_VALUE_TAG, None) or None
+    if value is None:
+        return None
+    if data_type == "n":
+        return _cast_number(value)
+    if data_type == "s":
+        return shared_strings[int(value)]
+    if data_type == "b":
+        return bool(int(value))
+    if data_type == "d":
+        return from_ISO8601(value)
+    return value
+
+
+def _cast_number(value: str) -> int | float:
+    if "." in value or "E" in value or "e" in value:
+        return float(value)
+    return int(value)
+
+
+def _column_index(coordinate: str) -> int:
+    index = 0
+    for char in coordinate:
+        if not char.isalpha():
+            break
+        index = index * 26 + (ord(char.upper()) - 64)
+    return index
+
+
+def _office_document_part(archive: zipfile.ZipFile) -> str:
+    for rel_type, target in _read_relationships(archive, "").values():
+        if rel_type.endswith(_OFFICE_DOCUMENT_REL):
+            return target
+    return "xl/workbook.xml"
+
+
+def _read_relationships(archive: zipfile.ZipFile, source_part: str) -> dict[str, tuple[str, str]]:
+    source = PurePosixPath(source_part)
+    rels_part = "_rels/.rels"
+    if source_part:
+        rels_part = str(source.parent / "_rels" / f"{source.name}.rels")
+    try:
+        root = ET.fromstring(archive.read(rels_part))
+    except KeyError:
+        return {}
+
+    rels: dict[str, tuple[str, str]] = {}
+    for rel in root.iter(_RELATIONSHIP_TAG):
+        target = rel.get("Target", "")
+        if target.startswith("/"):
+            resolved = target.lstrip("/")
+        else:
+            resolved = _normalize_part(str(source.parent / target))
+        rels[rel.get("Id", "")] = (rel.get("Type", ""), resolved)
+    return rels
+
+
+def _normalize_part(part: str) -> str:
+    segments: list[str] = []
+    for segment in part.split("/"):
+        if segment in ("", "."):
+            continue
+        if segment == "..":
+            if segments:
+                segments.pop()
+            continue
+        segments.append(segment)
+    return "/".join(segments)
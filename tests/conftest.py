@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from typing import Any, Mapping
+
+import pytest
+from gspread.utils import a1_to_rowcol
+
+
+class FakeWorksheet:
+    def __init__(self, sheet_id: int, title: str, rows: int = 1000, cols: int = 26) -> None:
+        self.id = sheet_id
+        self.title = title
+        self.row_count = rows
+        self.col_count = cols
+        self.cells: dict[tuple[int, int], Any] = {}
+        self.reads = 0
+
+    def get_all_values(self) -> list[list[Any]]:
+        self.reads += 1
+        if not self.cells:
+            return []
+        max_row = max(row for row, _col in self.cells)
+        max_col = max(col for _row, col in self.cells)
+        return [
+            [self.cells.get((row, col), "") for col in range(1, max_col + 1)]
+            for row in range(1, max_row + 1)
+        ]
+
+    def get(self, range_name: str) -> list[list[Any]]:
+        # Only whole-row ranges such as "1:1" are needed by the gateway.
+        first, _, last = range_name.partition(":")
+        rows = self.get_all_values()[int(first) - 1:int(last or first)]
+        return [row for row in rows if any(value != "" for value in row)]
+
+    def get_all_records(self, default_blank: Any = "") -> list[dict[str, Any]]:
+        values = self.get_all_values()
+        if not values:
+            return []
+        header, *rows = values
+        return [
+            {key: default_blank if value == "" else value for key, value in zip(header, row)}
+            for row in rows
+        ]
+
+    def write(self, start_row: int, start_col: int, values: list[list[Any]]) -> None:
+        for row_offset, row in enumerate(values):
+            for col_offset, value in enumerate(row):
+                row_idx, col_idx = start_row + row_offset, start_col + col_offset
+                if row_idx > self.row_count or col_idx > self.col_count:
+                    raise ValueError(f"Range exceeds grid limits of {self.title}")
+                self.cells[row_idx, col_idx] = value
+
+
+class FakeSpreadsheet:
+    """In-memory stand-in for the gspread Spreadsheet calls the gateway makes."""
+
+    def __init__(self, tabs: Mapping[str, tuple[int, int]] | None = None) -> None:
+        self.id = "fake-spreadsheet"
+        self.modified_time = "2026-01-01T00:00:00.000Z"
+        self.calls: list[tuple[str, Any]] = []
+        self._worksheets = [
+            FakeWorksheet(idx, title, rows, cols)
+            for idx, (title, (rows, cols)) in enumerate((tabs or {}).items())
+        ]
+
+    def worksheets(self, exclude_hidden: bool = False) -> list[FakeWorksheet]:
+        self.calls.append(("worksheets", None))
+        return list(self._worksheets)
+
+    def get_lastUpdateTime(self) -> str:
+        self.calls.append(("get_lastUpdateTime", None))
+        return self.modified_time
+
+    def tab(self, title: str) -> FakeWorksheet:
+        return next(ws for ws in self._worksheets if ws.title == title)
+
+    def batch_update(self, body: Mapping[str, Any]) -> dict[str, Any]:
+        self.calls.append(("batch_update", body))
+        for request in body["requests"]:
+            if "updateSheetProperties" not in request:
+                continue
+            properties = request["updateSheetProperties"]["properties"]
+            ws = next(ws for ws in self._worksheets if ws.id == properties["sheetId"])
+            ws.row_count = properties["gridProperties"]["rowCount"]
+            ws.col_count = properties["gridProperties"]["columnCount"]
+        return {}
+
+    def values_batch_clear(self, params: Any = None, body: Mapping[str, Any] | None = None) -> dict:
+        self.calls.append(("values_batch_clear", body))
+        for range_name in (body or {})["ranges"]:
+            title, _, rows = range_name.partition("!")
+            ws = self.tab(_sheet_title(title))
+            if not rows:
+                ws.cells.clear()
+                continue
+            first, _, last = rows.partition(":")
+            for key in [key for key in ws.cells if int(first) <= key[0] <= int(last)]:
+                del ws.cells[key]
+        return {}
+
+    def values_append(
+        self,
+        range: str,
+        params: Mapping[str, Any] | None = None,
+        body: Mapping[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        self.calls.append(("values_append", {"range": range, "params": params, "body": body}))
+        ws = self.tab(_sheet_title(range))
+        values = (body or {})["values"]
+        next_row = max((row for row, _col in ws.cells), default=0) + 1
+        ws.row_count = max(ws.row_count, next_row + len(values) - 1)
+        ws.write(next_row, 1, values)
+        return {}
+
+    def values_batch_update(self, body: Mapping[str, Any] | None = None) -> dict[str, Any]:
+        self.calls.append(("values_batch_update", body))
+        for value_range in (body or {})["data"]:
+            title, _, cell = value_range["range"].rpartition("!")
+            row, col = a1_to_rowcol(cell)
+            self.tab(_sheet_title(title)).write(row, col, value_range["values"])
+        return {}
+
+
+def _sheet_title(range_name: str) -> str:
+    title = range_name.split("!")[0]
+    if title.startswith("'") and title.endswith("'"):
+        title = title[1:-1].replace("''", "'")
+    return title
+
+
+@pytest.fixture
+def fake_spreadsheet() -> FakeSpreadsheet:
+    return FakeSpreadsheet({"RATES": (1000, 26), "CUSTOMERS": (10, 3), "Bob's Tab": (1000, 26)})
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from staff_quoter.pipeline.benchmark import (
+    CASES,
+    BenchmarkResult,
+    compare_to_baseline,
+    load_baseline,
+    run_suite,
+    write_baseline,
+)
+from staff_quoter.pipeline.synthetic import SyntheticWorkbookSpec, generate_workbook
+
+
+def test_run_suite_covers_every_case_and_records_baseline(tmp_path: Path) -> None:
+    spec = SyntheticWorkbookSpec(sheets=1, rows=20, quotes=2)
+    workbook_path = generate_workbook(tmp_path / "bench.xlsx", spec)
+
+    results = run_suite(workbook_path, iterations=1, isolate=False, min_seconds=0.0)
+
+    assert [result.case for result in results] == list(CASES)
+    assert all(result.iterations == 1 and result.ops_per_second > 0 for result in results)
+
+    baseline_path = tmp_path / "baseline.json"
+    assert load_baseline(baseline_path, spec) is None
+    write_baseline(baseline_path, spec, results)
+    baseline = load_baseline(baseline_path, spec)
+    assert baseline is not None
+    assert compare_to_baseline(results, baseline) == []
+    assert load_baseline(baseline_path, SyntheticWorkbookSpec(rows=21)) is None
+
+
+def test_compare_to_baseline_flags_throughput_and_memory_regressions() -> None:
+    baseline = {
+        "results": {
+            "validator": {"ops_per_second": 10.0, "peak_rss_bytes": 100 * 2**20},
+            "pipeline": {"ops_per_second": 4.0, "peak_rss_bytes": 100 * 2**20},
+        }
+    }
+    results = [
+        BenchmarkResult("validator", iterations=7, elapsed_seconds=1.0, peak_rss_bytes=110 * 2**20),
+        BenchmarkResult("pipeline", iterations=4, elapsed_seconds=1.0, peak_rss_bytes=130 * 2**20),
+        BenchmarkResult("builder", iterations=1, elapsed_seconds=1.0),
+    ]
+
+    regressions = compare_to_baseline(results, baseline, threshold=0.2)
+
+    assert len(regressions) == 2
+    assert regressions[0].startswith("validator: throughput 7.00 ops/s")
+    assert regressions[1].startswith("pipeline: peak RSS 130.0 MiB")
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from openpyxl import Workbook
+
+from staff_quoter.pipeline.dependency_graph import DependencyGraph, IncrementalEvaluator
+from staff_quoter.pipeline.workbook_reader import WorkbookSnapshot
+
+
+def _create_template(path: Path) -> None:
+    wb = Workbook()
+    ws_input = wb.active
+    ws_input.title = "INPUT_QUOTE"
+    ws_input["H2"] = 10
+    ws_input["I2"] = "steel"
+    ws_input["J2"] = 0.3
+
+    ws_rates = wb.create_sheet("RATES")
+    ws_rates["A1"], ws_rates["B1"] = "aluminum", 4.0
+    ws_rates["A2"], ws_rates["B2"] = "steel", 6.0
+    for row in range(3, 401):
+        ws_rates[f"C{row}"] = row
+
+    ws_calc = wb.create_sheet("CALC_OUTPUTS")
+    ws_calc["H2"] = "=VLOOKUP(INPUT_QUOTE!I2,RATES!A1:B2,2,FALSE)"
+    ws_calc["B2"] = "=INPUT_QUOTE!H2*H2"
+    ws_calc["C2"] = "=B2*(1+INPUT_QUOTE!J2)"
+    ws_calc["D2"] = "=SUM(RATES!C3:C400)"
+    wb.save(path)
+    wb.close()
+
+
+def test_graph_tracks_precedents_and_dependents(tmp_path: Path) -> None:
+    path = tmp_path / "template.xlsx"
+    _create_template(path)
+
+    graph = DependencyGraph.build(WorkbookSnapshot.load(path))
+
+    assert len(graph) == 4
+    assert set(graph.dependents("INPUT_QUOTE", "H2")) == {("CALC_OUTPUTS", "B2")}
+    assert graph.dependents("RATES", "C250") == [("CALC_OUTPUTS", "D2")]
+    assert graph.downstream([("INPUT_QUOTE", "I2")]) == [
+        ("CALC_OUTPUTS", "H2"),
+        ("CALC_OUTPUTS", "B2"),
+        ("CALC_OUTPUTS", "C2"),
+    ]
+
+
+def test_graph_round_trips_through_json(tmp_path: Path) -> None:
+    path = tmp_path / "template.xlsx"
+    _create_template(path)
+    snapshot = WorkbookSnapshot.load(path)
+    graph_path = tmp_path / "template.graph.json"
+
+    DependencyGraph.build(snapshot).save(graph_path)
+    loaded = DependencyGraph.load(graph_path)
+
+    assert loaded.matches(snapshot)
+    assert loaded.downstream([("INPUT_QUOTE", "J2")]) == [("CALC_OUTPUTS", "C2")]
+
+
+def test_incremental_evaluator_recomputes_only_downstream_cells(tmp_path: Path) -> None:
+    path = tmp_path / "template.xlsx"
+    _create_template(path)
+    evaluator = IncrementalEvaluator(WorkbookSnapshot.load(path))
+    assert evaluator.value("CALC_OUTPUTS", "C2") == pytest.approx(78.0)
+    assert evaluator.value("CALC_OUTPUTS", "D2") == sum(range(3, 401))
+
+    dirty = evaluator.set_input("INPUT_QUOTE", "J2", 0.5)
+
+    assert dirty == [("CALC_OUTPUTS", "C2")]
+    assert evaluator.value("CALC_OUTPUTS", "C2") == pytest.approx(90.0)
+
+    dirty = evaluator.set_input("INPUT_QUOTE", "I2", "aluminum")
+
+    assert ("CALC_OUTPUTS", "D2") not in dirty
+    assert evaluator.value("CALC_OUTPUTS", "C2") == pytest.approx(60.0)
+    with pytest.raises(ValueError, match="holds a formula"):
+        evaluator.set_input("CALC_OUTPUTS", "B2", 1)
+
+
+def test_whole_column_references_track_inputs_past_the_used_range(tmp_path: Path) -> None:
+    path = tmp_path / "whole_column.xlsx"
+    wb = Workbook()
+    ws_input = wb.active
+    ws_input.title = "INPUT_QUOTE"
+    ws_input["H2"], ws_input["H3"] = 1, 2
+    wb.create_sheet("CALC_OUTPUTS")["B2"] = "=SUM(INPUT_QUOTE!H:H)"
+    wb.save(path)
+    wb.close()
+    evaluator = IncrementalEvaluator(WorkbookSnapshot.load(path))
+    assert evaluator.value("CALC_OUTPUTS", "B2") == 3
+
+    dirty = evaluator.set_input("INPUT_QUOTE", "H4", 10)
+
+    assert dirty == [("CALC_OUTPUTS", "B2")]
+    assert evaluator.value("CALC_OUTPUTS", "B2") == 13
+    graph_path = tmp_path / "whole_column.graph.json"
+    evaluator.graph.save(graph_path)
+    assert DependencyGraph.load(graph_path).dependents("INPUT_QUOTE", "H900") == dirty
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from openpyxl import Workbook, load_workbook
+from openpyxl.workbook.defined_name import DefinedName
+
+from staff_quoter.pipeline.cell_map import QUOTE_CELL_MAP
+from staff_quoter.pipeline.formula_engine import (
+    ExcelError,
+    FormulaEngine,
+    FormulaEvaluationError,
+    call_function,
+    evaluate_operator,
+    function_kind,
+    recalc_snapshot,
+)
+from staff_quoter.pipeline.workbook_reader import WorkbookSnapshot
+
+
+def _create_formula_workbook(path: Path) -> Path:
+    wb = Workbook()
+
+    ws_input = wb.active
+    ws_input.title = "INPUT_QUOTE"
+    ws_input["A2"] = "Q-NATIVE-001"
+    ws_input["C2"] = "MACHINING"
+    ws_input["D2"] = "Native Customer"
+    ws_input["G2"] = "PN-NATIVE-001"
+    ws_input["H2"] = 12
+    ws_input["I2"] = "steel"
+
+    ws_rates = wb.create_sheet("Rate Table")
+    for row, (material, rate, lead) in enumerate(
+        [("aluminum", 4.5, 2), ("steel", 6.25, 3), ("titanium", 18.0, 6)], start=1
+    ):
+        ws_rates.cell(row=row, column=1, value=material)
+        ws_rates.cell(row=row, column=2, value=rate)
+        ws_rates.cell(row=row, column=3, value=lead)
+    ws_rates["E1"] = 0
+    ws_rates["E2"] = 10
+    ws_rates["E3"] = 50
+    ws_rates["F1"] = 0.0
+    ws_rates["F2"] = 0.05
+    ws_rates["F3"] = 0.1
+    wb.defined_names["markup"] = DefinedName("markup", attr_text="'Rate Table'!$H$1")
+    ws_rates["H1"] = 0.35
+
+    ws_calc = wb.create_sheet("CALC_OUTPUTS")
+    ws_calc["H2"] = "=VLOOKUP(INPUT_QUOTE!I2,'Rate Table'!$A$1:$C$3,2,FALSE)"
+    ws_calc["I2"] = "=INPUT_QUOTE!H2*H2"
+    ws_calc["J2"] = "=INDEX('Rate Table'!F1:F3,MATCH(INPUT_QUOTE!H2,'Rate Table'!E1:E3,1))"
+    ws_calc["B2"] = "=ROUND(I2*(1-J2),2)"
+    ws_calc["C2"] = "=ROUND(B2*(1+markup),2)"
+    ws_calc["D2"] = "=IFERROR((C2-B2)/C2,0)"
+    ws_calc["E2"] = "=VLOOKUP(INPUT_QUOTE!I2,'Rate Table'!$A$1:$C$3,3,FALSE)+CEILING(H2/10,1)"
+    ws_calc["F2"] = "=MAX(10,ROUNDUP(INPUT_QUOTE!H2/5,0)*5)"
+    ws_calc["Z2"] = "=1/0"
+
+    ws_quote = wb.create_sheet("QUOTE_OUTPUT")
+    ws_quote["C2"] = '=AND(CALC_OUTPUTS!C2>0,INPUT_QUOTE!A2<>"")'
+
+    wb.save(path)
+    wb.close()
+    return path
+
+
+@pytest.fixture
+def formula_workbook(tmp_path: Path) -> Path:
+    """Quote workbook whose CALC_OUTPUTS/QUOTE_OUTPUT cells are formulas over a rate table."""
+    return _create_formula_workbook(tmp_path / "native.xlsx")
+
+
+def _engine_for(tmp_path: Path, cells: dict[str, object]) -> FormulaEngine:
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "S"
+    for coordinate, value in cells.items():
+        ws[coordinate] = value
+    path = tmp_path / "cells.xlsx"
+    wb.save(path)
+    wb.close()
+    return FormulaEngine(WorkbookSnapshot.load(path))
+
+
+def test_engine_evaluates_calc_outputs_subgraph(formula_workbook: Path) -> None:
+    engine = FormulaEngine(WorkbookSnapshot.load(formula_workbook))
+
+    assert engine.value("CALC_OUTPUTS", "B2") == pytest.approx(71.25)
+    assert engine.value("CALC_OUTPUTS", "C2") == pytest.approx(96.19)
+    assert engine.value("CALC_OUTPUTS", "E2") == 4
+    assert engine.value("CALC_OUTPUTS", "F2") == 15
+    assert engine.value("QUOTE_OUTPUT", "C2") is True
+    # D2 and Z2 are not on the requested path and must not have been evaluated.
+    assert engine.evaluated_cells == 8
+    assert engine.value("CALC_OUTPUTS", "Z2") == ExcelError("#DIV/0!")
+
+
+@pytest.mark.parametrize(
+    ("formula", "expected"),
+    [
+        ("=-2^2", 4),
+        ("=2+3*4-6/3", 12),
+        ("=5%*200", 10),
+        ('="a"&1&TRUE', "a1TRUE"),
+        ("=ROUND(2.675,2)", 2.68),
+        ("=ROUND(-2.5,0)", -3),
+        ("=ROUNDDOWN(-2.59,1)", -2.5),
+        ("=FLOOR(7.5,2)", 6),
+        ("=MOD(-3,2)", 1),
+        ('=IF(A1>=1,"big","small")', "big"),
+        ("=IF(A1>10,1)", False),
+        ("=SUM(A1:A3,10)", 16),
+        ("=PRODUCT(A1:A3)", 6),
+        ("=PRODUCT(D1:D3)", 0),
+        ("=PRODUCT(B1:B3,D1)", 0),
+        ("=SUMPRODUCT((A1:A3>1)*A1:A3)", 5),
+        ('=SUMIF(B1:B3,"x*",A1:A3)', 4),
+        ('=COUNTIF(A1:A3,">=2")', 2),
+        ("=AVERAGE(A1:A3)", 2),
+        ('=XLOOKUP("Y",B1:B3,A1:A3)', 2),
+        ('=IFERROR(VLOOKUP("q",B1:B3,1,FALSE),"none")', "none"),
+        ("=CONCAT(B1:B3)", "xAyxZ"),
+        ("=TEXTJOIN(\"-\",TRUE,B1:B3,\"\")", "xA-y-xZ"),
+        ('=A1="2"', False),
+        ('=B2="Y"', True),
+        ("=1/0", ExcelError("#DIV/0!")),
+        ("=NOSUCHFUNC(1)", ExcelError("#NAME?")),
+    ],
+)
+def test_engine_functions_and_operators(tmp_path: Path, formula: str, expected: object) -> None:
+    engine = _engine_for(
+        tmp_path,
+        {"A1": 1, "A2": 2, "A3": 3, "B1": "xA", "B2": "y", "B3": "xZ", "C1": formula},
+    )
+
+    value = engine.value("S", "C1")
+    assert value == (pytest.approx(expected) if isinstance(expected, float) else expected)
+
+
+def test_engine_handles_long_chains_without_recursion(tmp_path: Path) -> None:
+    cells: dict[str, object] = {"A1": 1}
+    for row in range(2, 3001):
+        cells[f"A{row}"] = f"=A{row - 1}+1"
+
+    engine = _engine_for(tmp_path, cells)
+
+    assert engine.value("S", "A3000") == 3000
+
+
+def test_engine_rejects_circular_references(tmp_path: Path) -> None:
+    engine = _engine_for(tmp_path, {"A1": "=B1+1", "B1": "=A1+1"})
+
+    with pytest.raises(FormulaEvaluationError, match="Circular reference"):
+        engine.value("S", "A1")
+
+
+def test_recalc_snapshot_overrides_cached_values(formula_workbook: Path) -> None:
+    snapshot = WorkbookSnapshot.load(formula_workbook)
+    assert snapshot["CALC_OUTPUTS"].value("C2") is None
+
+    output = recalc_snapshot(snapshot, QUOTE_CELL_MAP)
+
+    assert output["status"] == "ok"
+    assert output["target_cells"] == 6
+    assert output["unsupported_functions"] == []
+    assert snapshot["CALC_OUTPUTS"].value("C2") == pytest.approx(96.19)
+    assert snapshot["QUOTE_OUTPUT"].value("C2") is True
+
+
+def test_recalc_snapshot_fails_when_a_target_reaches_an_unsupported_function(
+    tmp_path: Path,
+) -> None:
+    path = _create_formula_workbook(tmp_path / "unsupported.xlsx")
+    wb = load_workbook(path)
+    wb["CALC_OUTPUTS"]["J2"] = '=TEXT(0.05,"0.00")*1'
+    wb.save(path)
+    wb.close()
+    snapshot = WorkbookSnapshot.load(path)
+
+    output = recalc_snapshot(snapshot, QUOTE_CELL_MAP)
+
+    assert output["status"] == "failed"
+    assert output["unsupported_functions"] == ["TEXT"]
+    assert output["failed_targets"] == [
+        "CALC_OUTPUTS!B2: #NAME?",
+        "CALC_OUTPUTS!C2: #NAME?",
+        "QUOTE_OUTPUT!C2: #NAME?",
+    ]
+
+
+def test_public_evaluation_hooks_match_the_engine() -> None:
+    assert function_kind("IF") == "lazy"
+    assert function_kind("SUM") == "eager"
+    assert function_kind("NOSUCHFUNC") is None
+    assert call_function("SUM", [1, 2]) == 3
+    assert call_function("MOD", [1, 0]) == ExcelError("#DIV/0!")
+    assert evaluate_operator("&", "a", 1) == "a1"
@@ -2,9 +2,12 @@ from __future__ import annotations
 
 from pathlib import Path
 
+import pytest
 from openpyxl import Workbook
+from openpyxl.worksheet.formula import ArrayFormula
 
 from staff_quoter.pipeline import WorkbookFormulaValidator
+from staff_quoter.pipeline.formula_validator import analyze_formula, formula_template
 
 
 def test_formula_validator_detects_tokens_and_unknown_sheets(tmp_path: Path) -> None:
@@ -29,3 +32,99 @@ def test_formula_validator_detects_tokens_and_unknown_sheets(tmp_path: Path) ->
     codes = {issue.code for issue in report.issues}
     assert "ERROR_TOKEN" in codes
     assert "UNKNOWN_SHEET_REF" in codes
+
+
+def test_stream_engine_matches_openpyxl_engine(tmp_path: Path) -> None:
+    workbook_path = tmp_path / "validator_parity.xlsx"
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "MAIN"
+    data = wb.create_sheet("Rate Table")
+    data["A1"] = 10
+
+    ws["A1"] = "=1+1"
+    ws["A2"] = "=#REF!+#N/A"
+    ws["A3"] = "=MISSING_SHEET!A1"
+    ws["A4"] = "='Rate Table'!A1*2"
+    ws["A5"] = '="GHOST!"&MAIN!A1'
+    ws["B1"] = "plain text"
+    ws["C7"] = "=IFERROR(1/0,#DIV/0!)"
+    ws["D1"] = ArrayFormula("D1:D2", "=SUM(A1:A2*2)")
+
+    wb.save(workbook_path)
+    wb.close()
+
+    expected = WorkbookFormulaValidator(engine="openpyxl").validate(workbook_path)
+    actual = WorkbookFormulaValidator(engine="stream").validate(workbook_path)
+
+    assert actual.to_dict() == expected.to_dict()
+    assert actual.total_formulas == 6
+
+
+def test_validator_rejects_unknown_engine() -> None:
+    with pytest.raises(ValueError):
+        WorkbookFormulaValidator(engine="xml")
+
+
+def test_formula_template_normalizes_dragged_formulas() -> None:
+    assert formula_template("=B2*$C$1+'Q1 Rates'!D2") == formula_template("=B9*$C$1+'Q1 Rates'!D9")
+    assert formula_template("=B2*$C$1+'Q1 Rates'!D2") == "=RC*RC+'Q1 Rates'!RC"
+    assert formula_template('="A1"&A1') == '="A1"&RC'
+    assert formula_template("=LOG10(A1)+#N/A1") == "=LOG10(RC)+#N/A1"
+
+
+def test_analyze_formula_reports_tokens_and_unknown_sheets() -> None:
+    assert analyze_formula("=SUM(INPUT!A1:A3)", {"INPUT"}) == ()
+    assert analyze_formula('=A1+#div/0!&"Missing!"', {"INPUT"}) == (
+        ("ERROR_TOKEN", "Found token #DIV/0!"),
+    )
+    assert analyze_formula("='Old Rates'!B2", {"INPUT"}) == (
+        ("UNKNOWN_SHEET_REF", "Unknown sheet reference: Old Rates"),
+    )
+
+
+def test_validator_memoizes_templates_and_maps_issues_to_cells(tmp_path: Path) -> None:
+    workbook_path = tmp_path / "validator_templates.xlsx"
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "MAIN"
+    for row in range(1, 11):
+        ws[f"B{row}"] = f"=A{row}*2+GONE!A{row}"
+    ws["C1"] = "=SUM(B1:B10)"
+    wb.save(workbook_path)
+    wb.close()
+
+    report = WorkbookFormulaValidator(engine="stream").validate(workbook_path)
+
+    assert report.total_formulas == 11
+    assert report.formula_templates == 2
+    assert report.issues[0].detail == "Unknown sheet reference: GONE"
+    assert report.template_hit_rate == pytest.approx(9 / 11)
+    assert [issue.cell for issue in report.issues] == [f"B{row}" for row in range(1, 11)]
+    assert report.to_dict()["template_hit_rate"] == round(9 / 11, 4)
+
+
+def test_parallel_validation_matches_serial_run(tmp_path: Path) -> None:
+    workbook_path = tmp_path / "validator_parallel.xlsx"
+
+    wb = Workbook()
+    wb.active.title = "SHEET_0"
+    for idx in range(1, 4):
+        wb.create_sheet(f"SHEET_{idx}")
+    for idx, ws in enumerate(wb.worksheets):
+        for row in range(1, 30):
+            ws[f"A{row}"] = row
+            ws[f"B{row}"] = f"=A{row}*{idx}+SHEET_{(idx + 1) % 4}!A{row}"
+        ws["C1"] = "=#REF!+GONE!A1"
+        ws["C2"] = "=#REF!+GONE!A1"
+    wb.save(workbook_path)
+    wb.close()
+
+    serial = WorkbookFormulaValidator().validate(workbook_path)
+    parallel = WorkbookFormulaValidator(workers=3).validate(workbook_path)
+
+    assert parallel.to_dict() == serial.to_dict()
+    assert parallel.issues == serial.issues
+    assert parallel.total_formulas == 4 * 31
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 from pathlib import Path
+import json
 
 import pytest
+from gspread.exceptions import WorksheetNotFound
 
-from staff_quoter.google_sheets import GoogleSheetsGateway
+from staff_quoter.google_sheets import GoogleSheetsGateway, ReadCache, SyncStateStore
 
 
 def test_gateway_requires_spreadsheet_id_and_credentials() -> None:
@@ -19,3 +21,255 @@ def test_gateway_requires_existing_credentials_file(tmp_path: Path) -> None:
     missing = tmp_path / "missing.json"
     with pytest.raises(FileNotFoundError):
         GoogleSheetsGateway(spreadsheet_id="abc", credentials_file=str(missing))
+
+
+def test_write_many_batches_clears_and_updates(fake_spreadsheet) -> None:
+    gateway = GoogleSheetsGateway.from_spreadsheet(fake_spreadsheet)
+    customers = [{"id": str(idx), "name": f"Customer {idx}"} for idx in range(25)]
+
+    written = gateway.write_many(
+        {
+            "RATES": [{"material": "steel", "rate": 6.25}, {"material": "aluminum", "rate": None}],
+            "CUSTOMERS": customers,
+            "Bob's Tab": [],
+        }
+    )
+
+    assert written == {"RATES": 2, "CUSTOMERS": 25, "Bob's Tab": 0}
+    assert [name for name, _body in fake_spreadsheet.calls] == [
+        "worksheets",
+        "batch_update",
+        "values_batch_clear",
+        "values_batch_update",
+    ]
+    assert fake_spreadsheet.tab("RATES").get_all_values() == [
+        ["material", "rate"],
+        ["steel", 6.25],
+        ["aluminum", ""],
+    ]
+    assert fake_spreadsheet.tab("CUSTOMERS").row_count == 26
+    assert fake_spreadsheet.tab("CUSTOMERS").get_all_values()[-1] == ["24", "Customer 24"]
+
+
+def test_write_many_chunks_large_payloads(fake_spreadsheet) -> None:
+    gateway = GoogleSheetsGateway.from_spreadsheet(fake_spreadsheet)
+    rows = [{"material": f"material-{idx:04d}", "rate": idx} for idx in range(500)]
+
+    gateway.write_many({"RATES": rows}, max_request_bytes=4096)
+
+    updates = [body for name, body in fake_spreadsheet.calls if name == "values_batch_update"]
+    assert len(updates) > 1
+    assert all(len(json.dumps(body["data"])) < 4096 + 512 for body in updates)
+    values = fake_spreadsheet.tab("RATES").get_all_values()
+    assert len(values) == 501
+    assert values[-1] == ["material-0499", 499]
+
+
+def test_write_many_rejects_unknown_tabs(fake_spreadsheet) -> None:
+    gateway = GoogleSheetsGateway.from_spreadsheet(fake_spreadsheet)
+
+    with pytest.raises(WorksheetNotFound):
+        gateway.write_many({"MISSING": [{"a": 1}]})
+
+
+def test_write_diff_sends_only_changed_rows(fake_spreadsheet, tmp_path: Path) -> None:
+    gateway = GoogleSheetsGateway.from_spreadsheet(fake_spreadsheet)
+    store = SyncStateStore(tmp_path / "sync_state.json")
+    rows = [{"material": f"m{idx}", "rate": idx} for idx in range(100)]
+
+    first = gateway.write_diff({"RATES": rows}, store)
+    assert first["RATES"].mode == "full"
+
+    rows[10] = {"material": "m10", "rate": 99.5}
+    rows[11] = {"material": "m11", "rate": 99.5}
+    rows[50] = {"material": "m50", "rate": 42.0}
+    del rows[98:]
+    fake_spreadsheet.calls.clear()
+
+    second = gateway.write_diff({"RATES": rows}, SyncStateStore(tmp_path / "sync_state.json"))
+
+    assert second["RATES"].mode == "diff"
+    assert second["RATES"].changed_rows == 3
+    assert second["RATES"].cleared_rows == 2
+    clears = [body for name, body in fake_spreadsheet.calls if name == "values_batch_clear"]
+    updates = [body for name, body in fake_spreadsheet.calls if name == "values_batch_update"]
+    assert clears == [{"ranges": ["'RATES'!100:101"]}]
+    assert [item["range"] for item in updates[0]["data"]] == ["'RATES'!A12", "'RATES'!A52"]
+    values = fake_spreadsheet.tab("RATES").get_all_values()
+    assert len(values) == 99
+    assert values[11] == ["m10", 99.5]
+    assert values[51] == ["m50", 42.0]
+
+    fake_spreadsheet.calls.clear()
+    third = gateway.write_diff({"RATES": rows}, SyncStateStore(tmp_path / "sync_state.json"))
+    assert third["RATES"].mode == "unchanged"
+    assert [name for name, _body in fake_spreadsheet.calls] == ["worksheets"]
+
+
+def test_write_diff_rewrites_tab_when_header_changes(fake_spreadsheet, tmp_path: Path) -> None:
+    gateway = GoogleSheetsGateway.from_spreadsheet(fake_spreadsheet)
+    store = SyncStateStore(tmp_path / "sync_state.json")
+    gateway.write_diff({"RATES": [{"material": "steel", "rate": 1}]}, store)
+
+    result = gateway.write_diff({"RATES": [{"material": "steel", "usd_rate": 1}]}, store)
+
+    assert result["RATES"].mode == "full"
+    assert fake_spreadsheet.tab("RATES").get_all_values() == [
+        ["material", "usd_rate"],
+        ["steel", 1],
+    ]
+
+
+def test_repeated_reads_come_from_cache_until_revision_changes(fake_spreadsheet) -> None:
+    gateway = GoogleSheetsGateway.from_spreadsheet(fake_spreadsheet)
+    rates = fake_spreadsheet.tab("RATES")
+    rates.write(1, 1, [["material", "rate"], ["steel", 12.5]])
+
+    with gateway.read_batch():
+        for _ in range(5):
+            assert gateway.read_records("RATES") == [{"material": "steel", "rate": 12.5}]
+        gateway.read_records("RATES")[0]["rate"] = 0
+    assert rates.reads == 1
+    assert [name for name, _ in fake_spreadsheet.calls].count("worksheets") == 1
+
+    with gateway.read_batch():
+        assert gateway.read_records("RATES")[0]["rate"] == 12.5
+    assert rates.reads == 1
+
+    fake_spreadsheet.modified_time = "2026-01-02T00:00:00.000Z"
+    rates.write(2, 2, [[13.0]])
+    with gateway.read_batch():
+        assert gateway.read_records("RATES") == [{"material": "steel", "rate": 13.0}]
+    assert rates.reads == 2
+
+
+def test_reads_cached_before_the_first_batch_are_revalidated(fake_spreadsheet) -> None:
+    reader = GoogleSheetsGateway.from_spreadsheet(fake_spreadsheet)
+    writer = GoogleSheetsGateway.from_spreadsheet(fake_spreadsheet)
+    writer.write_many({"RATES": [{"material": "steel", "rate": 12.5}]})
+    assert reader.read_records("RATES") == [{"material": "steel", "rate": 12.5}]
+
+    writer.write_many({"RATES": [{"material": "steel", "rate": 13.0}]})
+    fake_spreadsheet.modified_time = "2026-01-02T00:00:00.000Z"
+    with reader.read_batch():
+        assert reader.read_records("RATES") == [{"material": "steel", "rate": 13.0}]
+
+
+def test_cache_ttl_lru_and_write_invalidation(fake_spreadsheet) -> None:
+    now = [0.0]
+    cache = ReadCache(ttl_seconds=60, max_entries=2, clock=lambda: now[0])
+    gateway = GoogleSheetsGateway.from_spreadsheet(fake_spreadsheet, cache=cache)
+    rates = fake_spreadsheet.tab("RATES")
+
+    gateway.read_values("RATES")
+    gateway.read_values("CUSTOMERS")
+    gateway.read_values("Bob's Tab")
+    assert len(cache) == 2
+    gateway.read_values("RATES")
+    assert rates.reads == 2
+
+    now[0] = 61.0
+    gateway.read_values("RATES")
+    assert rates.reads == 3
+
+    gateway.write_many({"RATES": [{"material": "steel", "rate": 1}]})
+    assert gateway.read_values("RATES") == [["material", "rate"], ["steel", 1]]
+    assert rates.reads == 4
+    with pytest.raises(WorksheetNotFound):
+        gateway.worksheet("MISSING")
+
+
+def test_write_stream_resizes_once_and_uploads_bounded_chunks(fake_spreadsheet) -> None:
+    gateway = GoogleSheetsGateway.from_spreadsheet(fake_spreadsheet)
+    consumed = []
+
+    def rows():
+        for idx in range(2_500):
+            consumed.append(idx)
+            yield [f"C{idx}", idx, None]
+
+    written = gateway.write_stream(
+        "CUSTOMERS", ["id", "qty", "note"], rows(), row_count=2_500, chunk_rows=1_000
+    )
+
+    assert written == 2_500
+    names = [name for name, _ in fake_spreadsheet.calls]
+    assert names.count("batch_update") == 1
+    assert names.count("values_batch_clear") == 1
+    updates = [
+        body["data"][0] for name, body in fake_spreadsheet.calls if name == "values_batch_update"
+    ]
+    assert [len(update["values"]) for update in updates] == [1_000, 1_000, 501]
+    assert [update["range"] for update in updates] == [
+        "'CUSTOMERS'!A1",
+        "'CUSTOMERS'!A1001",
+        "'CUSTOMERS'!A2001",
+    ]
+    values = fake_spreadsheet.tab("CUSTOMERS").get_all_values()
+    assert values[0] == ["id", "qty", "note"]
+    assert values[-1] == ["C2499", 2499, ""]
+    assert fake_spreadsheet.tab("CUSTOMERS").row_count == 2_501
+
+
+def test_write_stream_fits_the_grid_when_row_count_is_wrong(fake_spreadsheet) -> None:
+    gateway = GoogleSheetsGateway.from_spreadsheet(fake_spreadsheet)
+    customers = fake_spreadsheet.tab("CUSTOMERS")
+
+    written = gateway.write_stream(
+        "CUSTOMERS", ["a"], ([idx, "x"] for idx in range(15)), row_count=3, chunk_rows=4
+    )
+
+    assert written == 15
+    assert (customers.row_count, customers.col_count) == (16, 3)
+    assert customers.get_all_values()[-1] == [14, "x"]
+
+    written = gateway.write_stream("CUSTOMERS", ["a"], ([idx] for idx in range(2)), row_count=9)
+
+    assert written == 2
+    assert customers.row_count == 3
+    with pytest.raises(ValueError, match="row_count"):
+        gateway.write_stream("CUSTOMERS", ["a"], [], row_count=-1)
+
+
+def test_typed_write_sends_raw_values_and_formats_dates(fake_spreadsheet) -> None:
+    gateway = GoogleSheetsGateway.from_spreadsheet(fake_spreadsheet)
+    rows = [
+        {"sku": "0042", "qty": "3", "price": "12.50", "active": "TRUE", "due": "2026-01-05"},
+        {"sku": "0043", "qty": "", "price": "8", "active": "false", "due": "2026-01-06"},
+    ]
+
+    gateway.write_records("RATES", rows, typed=True)
+
+    update = next(body for name, body in fake_spreadsheet.calls if name == "values_batch_update")
+    assert update["valueInputOption"] == "RAW"
+    assert update["data"][0]["values"] == [
+        ["sku", "qty", "price", "active", "due"],
+        ["0042", 3, 12.5, True, 46027],
+        ["0043", "", 8, False, 46028],
+    ]
+    requests = next(body for name, body in fake_spreadsheet.calls if name == "batch_update")
+    [date_format] = [request["repeatCell"] for request in requests["requests"]]
+    assert date_format["range"]["startColumnIndex"] == 4
+    assert date_format["cell"]["userEnteredFormat"]["numberFormat"]["type"] == "DATE"
+
+
+def test_append_records_aligns_to_header_without_clearing(fake_spreadsheet) -> None:
+    gateway = GoogleSheetsGateway.from_spreadsheet(fake_spreadsheet)
+    log = fake_spreadsheet.tab("Bob's Tab")
+
+    gateway.append_records("Bob's Tab", [{"quote_id": "Q-1", "total": "100.5"}])
+    gateway.append_records("Bob's Tab", [{"total": 7, "quote_id": "Q-2"}])
+    gateway.append_records("Bob's Tab", [{"quote_id": "Q-3", "total": 9}], typed=False)
+
+    assert log.reads == 1
+    assert log.get_all_values() == [
+        ["quote_id", "total"],
+        ["Q-1", 100.5],
+        ["Q-2", 7],
+        ["Q-3", 9],
+    ]
+    names = [name for name, _ in fake_spreadsheet.calls]
+    assert "values_batch_clear" not in names
+    assert names.count("values_append") == 3
+    with pytest.raises(ValueError, match="discount"):
+        gateway.append_records("Bob's Tab", [{"quote_id": "Q-4", "discount": 1}])
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+from staff_quoter.pipeline import QuoteLedger, QuotePayload
+
+
+def _payload(idx: int, customer: str = "ACME", part: str | None = None) -> QuotePayload:
+    return QuotePayload(
+        quote_id=f"Q-{idx:05d}",
+        engine_type="MACHINING",
+        customer_name=customer,
+        part_number=part or f"PN-{idx % 3}",
+        total_cost=10.0 + idx,
+        total_price=15.0 + idx,
+        margin_pct=0.5,
+        lead_time_weeks=1.0,
+        moq=1,
+        pdf_ready_flag=True,
+        generated_at_utc="2026-01-01T00:00:00+00:00",
+    )
+
+
+def test_ledger_lookups_across_writers_and_segments(tmp_path: Path) -> None:
+    first = QuoteLedger(tmp_path, writer_id="a", segment_max_bytes=600)
+    second = QuoteLedger(tmp_path, writer_id="b")
+    for idx in range(10):
+        writer = first if idx % 2 == 0 else second
+        writer.append(_payload(idx, customer="ACME" if idx < 6 else "Globex"))
+    first.close()
+    second.close()
+
+    assert len(list((tmp_path / "segments").glob("a-*.jsonl"))) > 1
+    ledger = QuoteLedger.load(tmp_path)
+    assert len(ledger) == 10
+    assert ledger.get("Q-00007")["total_price"] == 22.0
+    assert ledger.get("Q-99999") is None
+    assert sorted(quote["quote_id"] for quote in ledger.find(customer_name="Globex")) == [
+        "Q-00006",
+        "Q-00007",
+        "Q-00008",
+        "Q-00009",
+    ]
+    matches = ledger.find("Globex", part_number="PN-0")
+    assert sorted(quote["quote_id"] for quote in matches) == ["Q-00006", "Q-00009"]
+    assert sum(1 for _ in ledger.scan()) == 10
+    with pytest.raises(ValueError):
+        ledger.find()
+
+
+def test_ledger_latest_version_wins_and_refresh_is_incremental(tmp_path: Path) -> None:
+    writer = QuoteLedger(tmp_path)
+    writer.append(_payload(1, customer="Old Co"))
+    reader = QuoteLedger.load(tmp_path)
+
+    writer.append(replace(_payload(1, customer="New Co"), total_price=99.0))
+    (tmp_path / "segments" / "partial.jsonl").write_bytes(b'{"quote_id": "Q-')
+    (tmp_path / "index" / "partial.idx").write_bytes(b'{"quote_id": "Q-')
+
+    assert reader.refresh() == 1
+    assert reader.refresh() == 0
+    assert reader.get("Q-00001")["total_price"] == 99.0
+    assert reader.find(customer_name="Old Co") == []
+    assert len(reader.find(customer_name="New Co")) == 1
+    assert sum(1 for _ in reader.scan()) == 2
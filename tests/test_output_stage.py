@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from pathlib import Path
+import json
+import shutil
+
+from staff_quoter.pipeline import QuotePayload
+from staff_quoter.pipeline.ledger import QuoteLedger
+from staff_quoter.pipeline.output_stage import QuoteOutputStage
+from staff_quoter.pipeline.pdf_renderer import QuotePdfRenderer
+
+
+def _payload(idx: int) -> QuotePayload:
+    return QuotePayload(
+        quote_id=f"Q-OUT-{idx:03d}",
+        engine_type="MACHINING",
+        customer_name="Output Customer",
+        part_number=f"PN-{idx:03d}",
+        total_cost=10.0,
+        total_price=15.0,
+        margin_pct=0.5,
+        lead_time_weeks=1.0,
+        moq=1,
+        pdf_ready_flag=True,
+        generated_at_utc="2026-01-01T00:00:00+00:00",
+    )
+
+
+def test_output_stage_commits_artifacts_atomically(tmp_path: Path) -> None:
+    json_dir = tmp_path / "json"
+    pdf_dir = tmp_path / "pdf"
+    stage = QuoteOutputStage(
+        json_dir, pdf_dir, QuotePdfRenderer(), max_workers=2, max_pending=1, json_mode="files"
+    )
+
+    futures = [stage.submit(_payload(idx)) for idx in range(4)]
+    artifacts = [future.result() for future in futures]
+    stage.shutdown()
+
+    for idx, committed in enumerate(artifacts):
+        assert committed.json_output_path == json_dir / f"Q-OUT-{idx:03d}.json"
+        data = json.loads(committed.json_output_path.read_text(encoding="utf-8"))
+        assert data["part_number"] == f"PN-{idx:03d}"
+        assert committed.pdf_output_path.read_bytes().startswith(b"%PDF")
+        assert committed.json_committed_at_utc <= committed.pdf_committed_at_utc
+
+    written = [*json_dir.iterdir(), *pdf_dir.iterdir()]
+    assert [path.name for path in written if path.name.startswith(".")] == []
+
+
+def test_output_stage_appends_json_to_ledger_by_default(tmp_path: Path) -> None:
+    stage = QuoteOutputStage(tmp_path / "json", tmp_path / "pdf", QuotePdfRenderer())
+
+    artifacts = [stage.submit(_payload(idx)).result() for idx in range(3)]
+    stage.shutdown()
+
+    assert len({committed.json_output_path for committed in artifacts}) == 1
+    assert [path.suffix for path in (tmp_path / "json").rglob("*.json")] == []
+    ledger = QuoteLedger.load(tmp_path / "json")
+    assert len(ledger) == 3
+    assert ledger.get("Q-OUT-001")["part_number"] == "PN-001"
+    assert [committed.json_offset for committed in artifacts][0] == 0
+
+
+def test_output_stage_recreates_output_dirs_removed_between_writes(tmp_path: Path) -> None:
+    stage = QuoteOutputStage(
+        tmp_path / "json", tmp_path / "pdf", QuotePdfRenderer(), json_mode="files"
+    )
+    stage.submit(_payload(0)).result()
+    shutil.rmtree(tmp_path / "json")
+    shutil.rmtree(tmp_path / "pdf")
+
+    committed = stage.submit(_payload(1)).result()
+    stage.shutdown()
+
+    assert committed.json_output_path.exists()
+    assert committed.pdf_output_path.exists()
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pdfplumber
+from pypdf import PdfReader
+
+from staff_quoter.pipeline import QuotePayload
+from staff_quoter.pipeline.pdf_renderer import QuotePdfRenderer
+
+
+def _payload(idx: int) -> QuotePayload:
+    return QuotePayload(
+        quote_id=f"Q-PDF-{idx:03d}",
+        engine_type="MACHINING",
+        customer_name=f"Customer {idx}",
+        part_number=f"PN-{idx:03d}",
+        total_cost=1234.5 + idx,
+        total_price=2000.0 + idx,
+        margin_pct=0.25,
+        lead_time_weeks=3.0,
+        moq=10 + idx,
+        pdf_ready_flag=idx % 2 == 0,
+        generated_at_utc="2026-01-01T00:00:00+00:00",
+    )
+
+
+def test_render_combined_writes_one_page_per_quote(tmp_path: Path) -> None:
+    output_path = QuotePdfRenderer().render_combined(
+        [_payload(idx) for idx in range(3)],
+        tmp_path / "combined.pdf",
+    )
+
+    reader = PdfReader(str(output_path))
+    assert len(reader.pages) == 3
+    for idx, page in enumerate(reader.pages):
+        text = page.extract_text()
+        assert "Staff Quoter - Quote Summary" in text
+        assert f"Q-PDF-{idx:03d}" in text
+        assert f"{1234.5 + idx:,.2f}" in text
+
+    chrome_forms = {
+        page["/Resources"]["/XObject"].raw_get("/FormXob.QuoteChrome").idnum
+        for page in reader.pages
+    }
+    assert len(chrome_forms) == 1
+
+
+def test_render_many_writes_one_file_per_quote(tmp_path: Path) -> None:
+    paths = QuotePdfRenderer().render_many([_payload(idx) for idx in range(2)], tmp_path / "pdf")
+
+    assert [path.name for path in paths] == ["Q-PDF-000.pdf", "Q-PDF-001.pdf"]
+    with pdfplumber.open(paths[1]) as pdf:
+        text = pdf.pages[0].extract_text()
+    assert "Customer: Customer 1" in text
+    assert "MOQ: 11" in text
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import tracemalloc
+
+from staff_quoter.pipeline.profiling import StageProfiler, to_prometheus
+
+
+def test_stage_profiler_records_memory_only_when_tracing() -> None:
+    profiler = StageProfiler()
+    with profiler.stage("plain"):
+        sum(range(1000))
+
+    tracemalloc.start()
+    try:
+        with profiler.stage("traced"):
+            blob = bytearray(1_000_000)
+        del blob
+    finally:
+        tracemalloc.stop()
+
+    plain, traced = profiler.spans
+    assert plain.peak_memory_bytes is None
+    assert traced.peak_memory_bytes is not None and traced.peak_memory_bytes >= 1_000_000
+    assert plain.wall_seconds >= 0 and plain.cpu_seconds >= 0
+
+    disabled = StageProfiler(enabled=False)
+    with disabled.stage("skipped"):
+        pass
+    assert disabled.spans == []
+
+
+def test_stage_profiler_measures_one_memory_peak_at_a_time() -> None:
+    outer = StageProfiler()
+    inner = StageProfiler()
+    background = StageProfiler(measure_memory=False)
+
+    tracemalloc.start()
+    try:
+        with outer.stage("caller"):
+            with inner.stage("overlapping"):
+                pass
+            with background.stage("writer"):
+                pass
+        with inner.stage("after"):
+            pass
+    finally:
+        tracemalloc.stop()
+
+    assert outer.spans[0].peak_memory_bytes is not None
+    assert [span.peak_memory_bytes is None for span in inner.spans] == [True, False]
+    assert background.spans[0].peak_memory_bytes is None
+
+
+def _span(stage: str, wall: float, cpu: float, peak: int | None) -> dict[str, object]:
+    return {"stage": stage, "wall_seconds": wall, "cpu_seconds": cpu, "peak_memory_bytes": peak}
+
+
+def test_to_prometheus_sums_stages_and_context() -> None:
+    profiles = [
+        {
+            "stages": [
+                _span("load", 0.5, 0.25, 100),
+                _span("pdf_render", 1.0, 1.0, None),
+            ],
+            "context": {"workbook_bytes": 2048, "quotes": 1},
+        },
+        {
+            "stages": [
+                _span("load", 0.25, 0.25, 300),
+            ],
+            "context": {"workbook_bytes": 1024, "quotes": 1},
+        },
+    ]
+
+    text = to_prometheus(profiles)
+
+    assert 'staff_quoter_stage_wall_seconds_total{stage="load"} 0.75' in text
+    assert 'staff_quoter_stage_spans_total{stage="load"} 2' in text
+    assert 'staff_quoter_stage_peak_memory_bytes{stage="load"} 300' in text
+    assert 'staff_quoter_stage_peak_memory_bytes{stage="pdf_render"}' not in text
+    assert "# TYPE staff_quoter_stage_cpu_seconds_total counter" in text
+    assert "staff_quoter_workbook_bytes_total 3072" in text
+    assert "staff_quoter_quotes_total 2" in text
@@ -1,20 +1,25 @@
 from __future__ import annotations
 
+from dataclasses import replace
 from pathlib import Path
 import json
+import os
+import sqlite3
 
-from openpyxl import Workbook
+import pytest
+from openpyxl import Workbook, load_workbook
 
-from staff_quoter.config import Settings
-from staff_quoter.pipeline import QuotePipeline
+from staff_quoter.config import Settings, get_settings
+from staff_quoter.pipeline import BatchSummary, QuoteLedger, QuotePipeline
+from staff_quoter.pipeline.quote_builder import QuotePayloadBuilder
 
 
-def _create_workbook(path: Path) -> None:
+def _create_quote_workbook(path: Path, quote_id: str = "Q-TEST-001") -> Path:
     wb = Workbook()
 
     ws_input = wb.active
     ws_input.title = "INPUT_QUOTE"
-    ws_input["A2"] = "Q-TEST-001"
+    ws_input["A2"] = quote_id
     ws_input["C2"] = "MACHINING"
     ws_input["D2"] = "Test Customer"
     ws_input["G2"] = "PN-TEST-001"
@@ -31,13 +36,11 @@ def _create_workbook(path: Path) -> None:
 
     wb.save(path)
     wb.close()
+    return path
 
 
-def test_quote_pipeline_generates_json_and_pdf(tmp_path: Path) -> None:
-    workbook_path = tmp_path / "pipeline_case.xlsx"
-    _create_workbook(workbook_path)
-
-    settings = Settings(
+def _settings(tmp_path: Path, workbook_path: Path) -> Settings:
+    return Settings(
         workspace_root=tmp_path,
         google_credentials_file="",
         google_sheets_id="",
@@ -45,8 +48,16 @@ def test_quote_pipeline_generates_json_and_pdf(tmp_path: Path) -> None:
         default_workbook=workbook_path,
         output_json_dir=tmp_path / "output" / "json",
         output_pdf_dir=tmp_path / "output" / "pdf",
+        output_json_mode="files",
     )
 
+
+def test_quote_pipeline_generates_json_and_pdf(tmp_path: Path) -> None:
+    workbook_path = tmp_path / "pipeline_case.xlsx"
+    _create_quote_workbook(workbook_path)
+
+    settings = _settings(tmp_path, workbook_path)
+
     result = QuotePipeline(settings).run(workbook_path, fail_on_formula_issues=True, run_recalc=False)
 
     json_path = Path(result.json_output_path)
@@ -64,3 +75,302 @@ def test_quote_pipeline_generates_json_and_pdf(tmp_path: Path) -> None:
 
     assert result.formula_report["total_formulas"] == 0
     assert result.formula_report["issue_count"] == 0
+    assert result.json_committed_at_utc is not None
+    assert result.pdf_committed_at_utc is not None
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_quote_pipeline_run_batch_isolates_failures(tmp_path: Path, workers: int) -> None:
+    workbook_dir = tmp_path / "inbox"
+    workbook_dir.mkdir()
+    for idx in range(3):
+        _create_quote_workbook(workbook_dir / f"quote_{idx}.xlsx", quote_id=f"Q-BATCH-{idx:03d}")
+    broken_path = workbook_dir / "broken.xlsx"
+    broken_path.write_bytes(b"not a workbook")
+
+    settings = _settings(tmp_path, broken_path)
+    paths = sorted(workbook_dir.glob("*.xlsx"))
+    summary = BatchSummary()
+    for item in QuotePipeline(settings).run_batch(paths, workers=workers):
+        summary.add(item)
+
+    assert summary.total == 4
+    assert summary.succeeded == 3
+    assert summary.failed == 1
+    assert summary.failures[0]["workbook_path"] == str(broken_path)
+    for idx in range(3):
+        assert (settings.output_json_dir / f"Q-BATCH-{idx:03d}.json").exists()
+
+
+def test_quote_pipeline_run_batch_survives_worker_crash(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from staff_quoter.pipeline import batch
+
+    run_batch_item = batch.run_batch_item
+
+    def _crash_on_demand(pipeline, workbook_path, *args):  # type: ignore[no-untyped-def]
+        if workbook_path.name.startswith("crash"):
+            os._exit(1)
+        return run_batch_item(pipeline, workbook_path, *args)
+
+    # Worker processes are forked, so they inherit the patched function.
+    monkeypatch.setattr(batch, "run_batch_item", _crash_on_demand)
+    workbook_dir = tmp_path / "inbox"
+    workbook_dir.mkdir()
+    for idx in range(4):
+        _create_quote_workbook(workbook_dir / f"quote_{idx}.xlsx", quote_id=f"Q-CRASH-{idx:03d}")
+    crash_path = workbook_dir / "crash.xlsx"
+    _create_quote_workbook(crash_path, quote_id="Q-CRASH-999")
+
+    settings = _settings(tmp_path, crash_path)
+    summary = BatchSummary()
+    for item in QuotePipeline(settings).run_batch(sorted(workbook_dir.glob("*.xlsx")), workers=2):
+        summary.add(item)
+
+    assert summary.total == 5
+    assert summary.succeeded == 4
+    assert summary.failures[0]["workbook_path"] == str(crash_path)
+    assert "worker process died" in summary.failures[0]["error"]
+
+
+def test_quote_pipeline_batch_writes_indexed_ledger(tmp_path: Path) -> None:
+    workbook_dir = tmp_path / "inbox"
+    workbook_dir.mkdir()
+    for idx in range(4):
+        _create_quote_workbook(workbook_dir / f"quote_{idx}.xlsx", quote_id=f"Q-LEDGER-{idx:03d}")
+    settings = replace(
+        _settings(tmp_path, workbook_dir / "quote_0.xlsx"), output_json_mode="ledger"
+    )
+
+    items = list(QuotePipeline(settings).run_batch(sorted(workbook_dir.glob("*.xlsx")), workers=2))
+
+    assert all(item.ok for item in items)
+    ledger = QuoteLedger.load(settings.output_json_dir)
+    assert len(ledger) == 4
+    assert ledger.get("Q-LEDGER-002")["total_price"] == 150.0
+    assert {item.result.json_output_path for item in items} == {
+        str(entry) for entry in (settings.output_json_dir / "segments").iterdir()
+    }
+    assert list(settings.output_json_dir.glob("*.json")) == []
+
+
+def _create_multi_quote_workbook(path: Path, rows: int) -> None:
+    wb = Workbook()
+    ws_input = wb.active
+    ws_input.title = "INPUT_QUOTE"
+    ws_calc = wb.create_sheet("CALC_OUTPUTS")
+    ws_quote = wb.create_sheet("QUOTE_OUTPUT")
+
+    for idx in range(rows):
+        row = idx + 2
+        ws_input[f"A{row}"] = f"Q-MULTI-{idx:03d}"
+        ws_input[f"C{row}"] = "FABRICATION"
+        ws_input[f"D{row}"] = f"Customer {idx}"
+        ws_input[f"G{row}"] = f"PN-{idx:03d}"
+        ws_calc[f"B{row}"] = 100.0 + idx
+        ws_calc[f"C{row}"] = str(150 + idx)
+        ws_calc[f"D{row}"] = "n/a" if idx == 1 else 0.25
+        ws_calc[f"E{row}"] = 2
+        ws_calc[f"F{row}"] = 49.9
+        ws_quote[f"C{row}"] = " true " if idx % 2 == 0 else False
+
+    wb.save(path)
+    wb.close()
+
+
+def test_quote_pipeline_run_many_emits_one_quote_per_row(tmp_path: Path) -> None:
+    workbook_path = tmp_path / "multi_quote.xlsx"
+    _create_multi_quote_workbook(workbook_path, rows=3)
+    settings = _settings(tmp_path, workbook_path)
+
+    results = QuotePipeline(settings).run_many(workbook_path)
+
+    assert [Path(result.json_output_path).stem for result in results] == [
+        "Q-MULTI-000",
+        "Q-MULTI-001",
+        "Q-MULTI-002",
+    ]
+    payloads = [json.loads(Path(r.json_output_path).read_text(encoding="utf-8")) for r in results]
+    assert payloads[1]["total_price"] == 151.0
+    assert payloads[1]["margin_pct"] == 0.0
+    assert payloads[0]["moq"] == 49
+    assert [p["pdf_ready_flag"] for p in payloads] == [True, False, True]
+    assert all(Path(r.pdf_output_path).exists() for r in results)
+
+
+def test_build_many_matches_single_row_builder(tmp_path: Path) -> None:
+    workbook_path = tmp_path / "multi_quote_parity.xlsx"
+    _create_multi_quote_workbook(workbook_path, rows=1)
+    builder = QuotePayloadBuilder()
+
+    [many] = list(builder.build_many(workbook_path))
+    single = builder.build_from_workbook(workbook_path)
+
+    assert many.to_dict() | {"generated_at_utc": ""} == single.to_dict() | {"generated_at_utc": ""}
+
+
+def test_coerce_column_matches_scalar_coercion() -> None:
+    from staff_quoter.pipeline.quote_builder import coerce_cell
+    from staff_quoter.pipeline.quote_columns import coerce_column
+
+    values = [None, "", "2.7", "abc", float("inf"), "-inf", 1e20, "1e400", True, 3]
+    for kind in ("float", "int"):
+        expected = [coerce_cell(value, kind) for value in values]
+        assert coerce_column(values, kind) == expected
+    assert coerce_column(values, "int")[6] == 10**20
+    assert coerce_column([float("nan")], "int") == [0]
+
+
+def test_build_many_keeps_blank_quote_ids_apart(tmp_path: Path) -> None:
+    workbook_path = tmp_path / "multi_quote_blank_ids.xlsx"
+    _create_multi_quote_workbook(workbook_path, rows=3)
+    wb = load_workbook(workbook_path)
+    for row in (3, 4):
+        wb["INPUT_QUOTE"][f"A{row}"] = None
+    wb.save(workbook_path)
+
+    payloads = list(QuotePayloadBuilder().build_many(workbook_path))
+
+    assert [p.quote_id for p in payloads] == ["Q-MULTI-000", "UNKNOWN-3", "UNKNOWN-4"]
+
+
+def test_quote_pipeline_native_recalc_uses_evaluated_formulas(tmp_path: Path) -> None:
+    workbook_path = tmp_path / "native_case.xlsx"
+    _create_quote_workbook(workbook_path)
+    wb = load_workbook(workbook_path)
+    wb["INPUT_QUOTE"]["H2"] = 40
+    wb["CALC_OUTPUTS"]["B2"] = "=INPUT_QUOTE!H2*2.5"
+    wb["CALC_OUTPUTS"]["C2"] = "=ROUND(B2*1.25,2)"
+    wb["QUOTE_OUTPUT"]["C2"] = "=CALC_OUTPUTS!C2>0"
+    wb.save(workbook_path)
+    wb.close()
+
+    pipeline = QuotePipeline(_settings(tmp_path, workbook_path))
+    try:
+        result = pipeline.run(workbook_path, recalc="native")
+        with pytest.raises(ValueError, match="Unknown recalc mode"):
+            pipeline.run(workbook_path, recalc="excel")
+    finally:
+        pipeline.close()
+
+    payload = json.loads(Path(result.json_output_path).read_text(encoding="utf-8"))
+    assert payload["total_cost"] == 100.0
+    assert payload["total_price"] == 125.0
+    assert payload["pdf_ready_flag"] is True
+    assert result.recalc_output is not None
+    assert result.recalc_output["engine"] == "native"
+    assert result.recalc_output["target_cells"] == 3
+
+
+def test_quote_pipeline_native_recalc_fails_on_unsupported_function(tmp_path: Path) -> None:
+    workbook_path = tmp_path / "unsupported_case.xlsx"
+    _create_quote_workbook(workbook_path)
+    wb = load_workbook(workbook_path)
+    wb["CALC_OUTPUTS"]["B2"] = "=INPUT_QUOTE!H2*2.5"
+    wb["CALC_OUTPUTS"]["C2"] = "=ROUND(B2*1.25,2)+N(0)"
+    wb.save(workbook_path)
+    wb.close()
+    settings = _settings(tmp_path, workbook_path)
+
+    pipeline = QuotePipeline(settings)
+    try:
+        with pytest.raises(ValueError, match=r"CALC_OUTPUTS!C2: #NAME\?.*functions: N"):
+            pipeline.run(workbook_path, recalc="native")
+    finally:
+        pipeline.close()
+
+    assert not list(settings.output_pdf_dir.glob("*.pdf"))
+
+
+def test_quote_pipeline_records_history_once_per_unchanged_quote(tmp_path: Path) -> None:
+    workbook_path = tmp_path / "history_case.xlsx"
+    _create_multi_quote_workbook(workbook_path, rows=3)
+    settings = replace(
+        _settings(tmp_path, workbook_path), quote_history_db=tmp_path / "history.sqlite3"
+    )
+
+    pipeline = QuotePipeline(settings)
+    try:
+        pipeline.run_many(workbook_path)
+        pipeline.run_many(workbook_path)
+        assert pipeline.history is not None
+        assert len(pipeline.history) == 3
+        assert pipeline.history.latest("Q-MULTI-001").total_price == 151.0
+    finally:
+        pipeline.close()
+
+
+def test_quote_pipeline_run_rendered_returns_this_runs_artifacts(tmp_path: Path) -> None:
+    workbook_path = _create_quote_workbook(tmp_path / "rendered.xlsx")
+    pipeline = QuotePipeline(_settings(tmp_path, workbook_path))
+    try:
+        rendered = pipeline.run_rendered(workbook_path)
+    finally:
+        pipeline.close()
+
+    assert rendered.payload.quote_id == "Q-TEST-001"
+    assert rendered.pdf_bytes == Path(rendered.result.pdf_output_path).read_bytes()
+    assert json.loads(Path(rendered.result.json_output_path).read_text()) == (
+        rendered.payload.to_dict()
+    )
+
+
+def test_quote_pipeline_writes_outputs_when_history_fails(tmp_path: Path) -> None:
+    workbook_path = _create_quote_workbook(tmp_path / "locked_history.xlsx")
+    settings = replace(
+        _settings(tmp_path, workbook_path), quote_history_db=tmp_path / "history.sqlite3"
+    )
+
+    def _locked(payloads: object) -> int:
+        raise sqlite3.OperationalError("database is locked")
+
+    pipeline = QuotePipeline(settings)
+    try:
+        assert pipeline.history is not None
+        pipeline.history.add_many = _locked  # type: ignore[method-assign]
+        with pytest.warns(RuntimeWarning, match="database is locked"):
+            result = pipeline.run(workbook_path)
+    finally:
+        pipeline.close()
+
+    assert Path(result.json_output_path).exists()
+    assert Path(result.pdf_output_path).exists()
+
+
+def test_get_settings_empty_history_db_disables_history(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("QUOTE_HISTORY_DB", "")
+    assert get_settings().quote_history_db is None
+    monkeypatch.delenv("QUOTE_HISTORY_DB")
+    assert get_settings().quote_history_db is not None
+
+
+def test_quote_pipeline_profile_records_stage_spans(tmp_path: Path) -> None:
+    workbook_path = tmp_path / "profile_case.xlsx"
+    _create_multi_quote_workbook(workbook_path, rows=2)
+    settings = _settings(tmp_path, workbook_path)
+
+    pipeline = QuotePipeline(settings, profile=True)
+    try:
+        first, second = pipeline.run_many(workbook_path, recalc="native")
+    finally:
+        pipeline.close()
+
+    assert first.profile is not None and second.profile is not None
+    stages = [span["stage"] for span in first.profile["stages"]]
+    assert stages[:5] == ["load", "validate", "recalc", "build", "history"]
+    assert stages[5:] == ["json_write", "pdf_render", "pdf_write"]
+    assert [span["stage"] for span in second.profile["stages"]] == stages[5:]
+    peaks = {span["stage"]: span["peak_memory_bytes"] for span in first.profile["stages"]}
+    assert all(peaks[stage] is not None for stage in stages[:5])
+    assert all(peaks[stage] is None for stage in stages[5:])
+    assert first.profile["context"]["quotes"] == 2
+    assert first.profile["context"]["sheets"] == 3
+    assert first.profile["context"]["workbook_bytes"] == workbook_path.stat().st_size
+
+    plain = QuotePipeline(settings)
+    try:
+        assert plain.run(workbook_path).profile is None
+    finally:
+        plain.close()
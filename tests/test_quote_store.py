@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from pathlib import Path
+import math
+
+from staff_quoter.pipeline import QuotePayload, QuoteRepository
+
+
+def _payload(idx: int, customer: str = "ACME", generated: str = "2026-01-01T00:00:00+00:00"):
+    return QuotePayload(
+        quote_id=f"Q-{idx:05d}",
+        engine_type="MACHINING" if idx % 2 else "FABRICATION",
+        customer_name=customer,
+        part_number=f"PN-{idx % 4}",
+        total_cost=10.0 + idx,
+        total_price=15.0 + idx,
+        margin_pct=0.5,
+        lead_time_weeks=1.0,
+        moq=1,
+        pdf_ready_flag=bool(idx % 3),
+        generated_at_utc=generated,
+    )
+
+
+def test_repository_dedupes_unchanged_requotes_by_content(tmp_path: Path) -> None:
+    repo = QuoteRepository(tmp_path / "history.sqlite3")
+    original = _payload(1)
+
+    assert repo.add(original) is True
+    assert repo.add(replace(original, generated_at_utc="2026-02-01T00:00:00+00:00")) is False
+    repriced = replace(original, total_price=99.0, generated_at_utc="2026-03-01T00:00:00+00:00")
+    assert repo.add_many([repriced, repriced, original]) == 2
+
+    assert len(repo) == 3
+    assert [quote.total_price for quote in repo.history("Q-00001")] == [16.0, 99.0, 16.0]
+    assert repo.latest("Q-00001") == original
+    assert repo.latest("missing") is None
+    repo.close()
+
+
+def test_latest_for_customer_returns_current_versions_newest_first(tmp_path: Path) -> None:
+    path = tmp_path / "history.sqlite3"
+    repo = QuoteRepository(path)
+    repo.add_many(
+        _payload(idx, "ACME" if idx < 30 else "Globex", generated=f"2026-01-{idx % 28 + 1:02d}")
+        for idx in range(40)
+    )
+    repo.add(replace(_payload(3), total_price=1.0, generated_at_utc="2026-06-01"))
+    repo.close()
+
+    reopened = QuoteRepository(path)
+    latest = reopened.latest_for_customer("ACME", limit=3)
+    assert [quote.quote_id for quote in latest] == ["Q-00003", "Q-00027", "Q-00026"]
+    assert latest[0].total_price == 1.0
+    assert len(reopened.latest_for_customer("ACME", limit=100)) == 30
+    machining = reopened.query(part_number="PN-1", engine_type="MACHINING")
+    assert {quote.quote_id for quote in machining} == {f"Q-{idx:05d}" for idx in range(1, 40, 4)}
+    assert len(reopened.query(customer_name="Globex", since_utc="2026-01-05")) == 8
+
+
+def test_repository_round_trips_non_finite_amounts(tmp_path: Path) -> None:
+    repo = QuoteRepository(tmp_path / "history.sqlite3")
+    broken = replace(_payload(1), total_cost=math.nan, margin_pct=math.inf)
+
+    assert repo.add(broken) is True
+    assert repo.add(broken) is False
+    stored = repo.latest("Q-00001")
+    assert stored is not None
+    assert math.isnan(stored.total_cost)
+    assert stored.margin_pct == math.inf
+    assert stored.total_price == 16.0
+    repo.close()
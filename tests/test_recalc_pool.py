@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from openpyxl import Workbook
+
+from staff_quoter.config import Settings
+from staff_quoter.pipeline import QuotePipeline, recalc_pool
+from staff_quoter.pipeline.recalc_pool import RecalcWorkerPool
+
+FAKE_RECALC = '''
+import os
+import time
+
+
+def recalc(filename, timeout=30):
+    if "hang" in filename:
+        time.sleep(60)
+    if "crash" in filename:
+        os._exit(3)
+    print("noise that must not reach the protocol stream")
+    return {"status": "success", "total_errors": 0, "pid": os.getpid(), "timeout": timeout}
+'''
+
+
+def test_recalc_pool_reuses_warm_workers_and_recycles_failures(tmp_path: Path) -> None:
+    script_path = tmp_path / "recalc.py"
+    script_path.write_text(FAKE_RECALC, encoding="utf-8")
+
+    with RecalcWorkerPool(script_path, size=1, job_timeout=2.0, recalc_timeout=7) as pool:
+        first = pool.recalc(tmp_path / "a.xlsx")
+        second = pool.recalc(tmp_path / "b.xlsx")
+        assert first["status"] == "ok"
+        assert first["parsed"] == {
+            "status": "success",
+            "total_errors": 0,
+            "pid": first["worker_pid"],
+            "timeout": 7,
+        }
+        assert "noise" in str(first["stdout"])
+        assert second["worker_pid"] == first["worker_pid"]
+
+        hung = pool.recalc(tmp_path / "hang.xlsx")
+        assert hung["status"] == "failed"
+        assert "timed out" in str(hung["reason"])
+
+        crashed = pool.recalc(tmp_path / "crash.xlsx")
+        assert crashed["status"] == "failed"
+
+        recovered = pool.recalc(tmp_path / "c.xlsx")
+        assert recovered["status"] == "ok"
+        assert recovered["worker_pid"] not in {first["worker_pid"], hung["worker_pid"]}
+
+
+def test_recalc_pool_keeps_its_slot_when_a_respawn_fails(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    script_path = tmp_path / "recalc.py"
+    script_path.write_text(FAKE_RECALC, encoding="utf-8")
+    spawn_worker = recalc_pool._RecalcWorker
+    failures = iter([True])
+
+    def _flaky_worker(python: str, script: Path) -> object:
+        if next(failures, False):
+            raise OSError("fork failed")
+        return spawn_worker(python, script)
+
+    with RecalcWorkerPool(script_path, size=1, job_timeout=2.0) as pool:
+        monkeypatch.setattr(recalc_pool, "_RecalcWorker", _flaky_worker)
+        assert pool.recalc(tmp_path / "crash.xlsx")["status"] == "failed"
+
+        recovered = pool.recalc(tmp_path / "a.xlsx")
+        assert recovered["status"] == "ok"
+
+def test_pipeline_routes_recalc_through_worker_pool(tmp_path: Path) -> None:
+    script_path = tmp_path / "recalc.py"
+    script_path.write_text(FAKE_RECALC, encoding="utf-8")
+
+    workbook_path = tmp_path / "recalc_case.xlsx"
+    wb = Workbook()
+    wb.active.title = "INPUT_QUOTE"
+    wb["INPUT_QUOTE"]["A2"] = "Q-RECALC-001"
+    wb.create_sheet("CALC_OUTPUTS")
+    wb.create_sheet("QUOTE_OUTPUT")
+    wb.save(workbook_path)
+    wb.close()
+
+    settings = Settings(
+        workspace_root=tmp_path,
+        google_credentials_file="",
+        google_sheets_id="",
+        xlsx_recalc_script=script_path,
+        default_workbook=workbook_path,
+        output_json_dir=tmp_path / "output" / "json",
+        output_pdf_dir=tmp_path / "output" / "pdf",
+    )
+    pipeline = QuotePipeline(settings, recalc_workers=1)
+    try:
+        first = pipeline.run(workbook_path, run_recalc=True)
+        second = pipeline.run(workbook_path, run_recalc=True)
+    finally:
+        pipeline.close()
+
+    assert first.recalc_output is not None and second.recalc_output is not None
+    assert first.recalc_output["status"] == "ok"
+    assert first.recalc_output["worker_pid"] == second.recalc_output["worker_pid"]
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from pathlib import Path
+from typing import Iterator
+import asyncio
+import base64
+import http.client
+import json
+import os
+import threading
+import time
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from staff_quoter.config import Settings
+from staff_quoter.pipeline.service import XLSX_CONTENT_TYPE, QuoteService
+from staff_quoter.pipeline.synthetic import SyntheticWorkbookSpec, generate_workbook
+
+
+def _create_quote_workbook(path: Path, quote_id: str = "Q-TEST-001") -> Path:
+    wb = Workbook()
+
+    ws_input = wb.active
+    ws_input.title = "INPUT_QUOTE"
+    ws_input["A2"] = quote_id
+    ws_input["C2"] = "MACHINING"
+    ws_input["D2"] = "Test Customer"
+    ws_input["G2"] = "PN-TEST-001"
+
+    ws_calc = wb.create_sheet("CALC_OUTPUTS")
+    ws_calc["B2"] = 100.0
+    ws_calc["C2"] = 150.0
+    ws_calc["D2"] = 0.5
+    ws_calc["E2"] = 2.0
+    ws_calc["F2"] = 50
+
+    ws_quote = wb.create_sheet("QUOTE_OUTPUT")
+    ws_quote["C2"] = "TRUE"
+
+    wb.save(path)
+    wb.close()
+    return path
+
+
+def _settings(tmp_path: Path, workbook_path: Path) -> Settings:
+    return Settings(
+        workspace_root=tmp_path,
+        google_credentials_file="",
+        google_sheets_id="",
+        xlsx_recalc_script=tmp_path / "recalc.py",
+        default_workbook=workbook_path,
+        output_json_dir=tmp_path / "output" / "json",
+        output_pdf_dir=tmp_path / "output" / "pdf",
+        output_json_mode="files",
+    )
+
+
+class _RunningService:
+    def __init__(self, service: QuoteService) -> None:
+        self.service = service
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self.host, self.port = self._call(service.start("127.0.0.1", 0))
+
+    def _call(self, coro):  # type: ignore[no-untyped-def]
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout=60)
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: bytes = b"",
+        headers: dict[str, str] | None = None,
+    ) -> tuple[int, dict[str, str], bytes]:
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        try:
+            conn.request(method, path, body=body, headers=headers or {})
+            response = conn.getresponse()
+            return response.status, dict(response.getheaders()), response.read()
+        finally:
+            conn.close()
+
+    def stop(self) -> None:
+        self._call(self.service.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=10)
+        self._loop.close()
+
+
+@pytest.fixture
+def template(tmp_path: Path) -> Path:
+    path = tmp_path / "template.xlsx"
+    _create_quote_workbook(path, quote_id="Q-HTTP-TEMPLATE")
+    wb = load_workbook(path)
+    wb["INPUT_QUOTE"]["H2"] = 10
+    wb["CALC_OUTPUTS"]["B2"] = "=INPUT_QUOTE!H2*2.5"
+    wb["CALC_OUTPUTS"]["C2"] = "=ROUND(B2*1.25,2)"
+    wb.save(path)
+    wb.close()
+    return path
+
+
+@pytest.fixture
+def running(tmp_path: Path, template: Path) -> Iterator[_RunningService]:
+    service = QuoteService(_settings(tmp_path, template), workers=2, request_timeout=30)
+    server = _RunningService(service)
+    try:
+        yield server
+    finally:
+        server.stop()
+
+
+def test_quote_endpoint_returns_payload_and_pdf(tmp_path: Path, running: _RunningService) -> None:
+    workbook_path = tmp_path / "upload.xlsx"
+    _create_quote_workbook(workbook_path, quote_id="Q-HTTP-001")
+    upload = workbook_path.read_bytes()
+
+    status, _, body = running.request(
+        "POST", "/quote", upload, {"Content-Type": XLSX_CONTENT_TYPE}
+    )
+    assert status == 200
+    document = json.loads(body)
+    assert document["payload"]["quote_id"] == "Q-HTTP-001"
+    assert document["payload"]["total_price"] == 150.0
+    assert base64.b64decode(document["pdf_base64"]).startswith(b"%PDF")
+    assert Path(document["pdf_output_path"]).exists()
+
+    status, headers, pdf = running.request("POST", "/quote?format=pdf", upload)
+    assert status == 200
+    assert headers["Content-Type"] == "application/pdf"
+    assert headers["X-Quote-Id"] == "Q-HTTP-001"
+    assert pdf.startswith(b"%PDF")
+
+    inputs = json.dumps({"input_quote": {"A2": "Q-HTTP-002", "H2": 40}}).encode("utf-8")
+    status, _, body = running.request(
+        "POST", "/quote", inputs, {"Content-Type": "application/json"}
+    )
+    assert status == 200
+    payload = json.loads(body)["payload"]
+    assert payload["quote_id"] == "Q-HTTP-002"
+    assert payload["total_cost"] == 100.0
+    assert payload["total_price"] == 125.0
+
+
+def test_quote_endpoint_rejects_bad_requests(running: _RunningService) -> None:
+    assert running.request("GET", "/quote")[0] == 405
+    assert running.request("GET", "/nope")[0] == 404
+    assert running.request("POST", "/quote", b"not a workbook")[0] == 400
+    assert running.request("POST", "/quote", b"PK\x03\x04broken")[0] == 422
+    bad_cells = json.dumps({"input_quote": {"A1; DROP": 1}}).encode("utf-8")
+    assert running.request(
+        "POST", "/quote", bad_cells, {"Content-Type": "application/json"}
+    )[0] == 400
+
+    status, _, body = running.request("GET", "/metrics")
+    assert status == 200
+    text = body.decode("utf-8")
+    assert 'staff_quoter_http_quote_latency_seconds{quantile="0.99"}' in text
+    assert "staff_quoter_http_queue_depth 0" in text
+    assert 'staff_quoter_http_responses_total{status="400"} 2' in text
+
+
+def test_full_queue_gets_503_and_slow_quote_gets_504(tmp_path: Path, template: Path) -> None:
+    slow_path = generate_workbook(
+        tmp_path / "slow.xlsx", SyntheticWorkbookSpec(sheets=2, rows=2000)
+    )
+    settings = replace(_settings(tmp_path, template), output_json_mode="ledger")
+    server = _RunningService(
+        QuoteService(settings, workers=1, max_queue=1, request_timeout=0.05)
+    )
+    try:
+        upload = slow_path.read_bytes()
+        assert server.request("POST", "/quote", upload)[0] == 504
+        # The timed-out quote still holds the only slot until the worker finishes.
+        status, headers, _ = server.request("POST", "/quote", upload)
+        assert status == 503
+        assert headers["Retry-After"] == "1"
+
+        deadline = time.monotonic() + 60
+        while server.service.admitted and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert server.service.admitted == 0
+        text = server.request("GET", "/metrics")[2].decode("utf-8")
+        assert 'staff_quoter_http_responses_total{status="503"} 1' in text
+        assert 'staff_quoter_http_responses_total{status="504"} 1' in text
+    finally:
+        server.stop()
+
+
+def test_dead_worker_gets_503_and_the_pool_is_replaced(
+    tmp_path: Path,
+    template: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from staff_quoter.pipeline import service
+
+    write_inputs = service._write_inputs
+
+    def _crash_on_demand(template: Path, target: Path, inputs: dict[str, object]) -> None:
+        if inputs.get("Z9") == "crash":
+            os._exit(1)
+        write_inputs(template, target, inputs)
+
+    # Worker processes are forked, so they inherit the patched function.
+    monkeypatch.setattr(service, "_write_inputs", _crash_on_demand)
+    server = _RunningService(QuoteService(_settings(tmp_path, template), workers=1))
+    try:
+        crash = json.dumps({"input_quote": {"Z9": "crash"}}).encode("utf-8")
+        status, headers, _ = server.request(
+            "POST", "/quote", crash, {"Content-Type": "application/json"}
+        )
+        assert status == 503
+        assert headers["Retry-After"] == "1"
+        assert server.service.admitted == 0
+
+        inputs = json.dumps({"input_quote": {"A2": "Q-HTTP-003", "H2": 4}}).encode("utf-8")
+        status, _, body = server.request(
+            "POST", "/quote", inputs, {"Content-Type": "application/json"}
+        )
+        assert status == 200
+        assert json.loads(body)["payload"]["total_cost"] == 10.0
+    finally:
+        server.stop()
+
+
+def test_unexpected_handler_error_gets_500(
+    running: _RunningService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def _broken(*args: object) -> object:
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(running.service, "handle", _broken)
+    status, _, body = running.request("GET", "/healthz")
+    assert status == 500
+    assert json.loads(body)["error"] == "RuntimeError: boom"
+
+
+def test_inputs_hitting_an_unsupported_function_get_422(tmp_path: Path, template: Path) -> None:
+    wb = load_workbook(template)
+    wb["CALC_OUTPUTS"]["C2"] = "=ROUND(B2*1.25,2)+N(0)"
+    wb.save(template)
+    wb.close()
+    settings = _settings(tmp_path, template)
+    server = _RunningService(QuoteService(settings, workers=1))
+    try:
+        inputs = json.dumps({"input_quote": {"H2": 40}}).encode("utf-8")
+        status, _, body = server.request(
+            "POST", "/quote", inputs, {"Content-Type": "application/json"}
+        )
+    finally:
+        server.stop()
+
+    assert status == 422
+    error = json.loads(body)["error"]
+    assert error.startswith("ValueError: Native recalc failed")
+    assert "CALC_OUTPUTS!C2: #NAME?" in error
+    assert not list(settings.output_pdf_dir.glob("*.pdf"))
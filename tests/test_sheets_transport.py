@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+from urllib.parse import unquote, urlparse
+import json
+import random
+import socket
+import threading
+import time
+
+import gspread
+import pytest
+import requests
+from gspread.exceptions import APIError
+
+from staff_quoter.google_sheets import (
+    GoogleSheetsGateway,
+    RateLimitedHTTPClient,
+    RetryPolicy,
+    TokenBucket,
+)
+
+_TABS = {
+    "RATES": [["material", "rate"], ["steel", "12.5"]],
+    "CUSTOMERS": [["name"], ["ACME"]],
+    "PARTS": [["sku"], ["P-1"], ["P-2"]],
+}
+
+
+class _StandInSheetsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, throttle_first: int) -> None:
+        super().__init__(("127.0.0.1", 0), _SheetsHandler)
+        self.throttle_left = throttle_first
+        self.post_statuses: list[int] = []
+        self.requests: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _SheetsHandler(BaseHTTPRequestHandler):
+    server: _StandInSheetsServer
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            throttled = server.throttle_left > 0
+            server.throttle_left -= 1 if throttled else 0
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            if throttled:
+                self._reply(429, {"error": {"code": 429, "message": "Quota exceeded"}})
+                return
+            time.sleep(0.05)
+            self._reply(200, self._payload(urlparse(self.path).path))
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.server.lock:
+            self.server.requests.append(self.path)
+            status = self.server.post_statuses.pop(0) if self.server.post_statuses else 200
+        self._reply(status, {"error": {"code": status}} if status != 200 else {})
+
+    def _payload(self, path: str) -> dict:
+        if "/values/" in path:
+            title = unquote(path.split("/values/", 1)[1]).strip("'")
+            return {"range": f"'{title}'", "majorDimension": "ROWS", "values": _TABS[title]}
+        sheets = [
+            {
+                "properties": {
+                    "sheetId": idx,
+                    "title": title,
+                    "index": idx,
+                    "gridProperties": {"rowCount": 1000, "columnCount": 26},
+                }
+            }
+            for idx, title in enumerate(_TABS)
+        ]
+        return {"properties": {"title": "Stand-in"}, "sheets": sheets}
+
+    def _reply(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def stand_in_server() -> Iterator[_StandInSheetsServer]:
+    server = _StandInSheetsServer(throttle_first=3)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _client(server: _StandInSheetsServer, sleeps: list[float], **kwargs) -> gspread.Client:
+    http_client = partial(
+        RateLimitedHTTPClient,
+        api_root=server.url,
+        limiter=TokenBucket(requests_per_minute=60_000, capacity=10),
+        retry=RetryPolicy(max_attempts=5, base_delay=0.01, max_delay=0.05),
+        sleep=lambda seconds: sleeps.append(seconds) or time.sleep(seconds),
+        rng=random.Random(7),
+        **kwargs,
+    )
+    return gspread.Client(auth=None, session=requests.Session(), http_client=http_client)
+
+
+def test_gateway_retries_429_and_reads_tabs_concurrently(stand_in_server) -> None:
+    sleeps: list[float] = []
+    client = _client(stand_in_server, sleeps, pool_size=3)
+    gateway = GoogleSheetsGateway.from_client(client, "sheet-id", max_workers=3)
+
+    values = gateway.read_many(list(_TABS))
+
+    assert values == _TABS
+    assert client.http_client.retries == 3
+    assert len(sleeps) == 3 and all(0 <= delay <= 0.05 for delay in sleeps)
+    assert stand_in_server.max_in_flight > 1
+
+
+def test_client_gives_up_after_max_attempts(stand_in_server) -> None:
+    stand_in_server.throttle_left = 100
+    client = _client(stand_in_server, [])
+
+    with pytest.raises(APIError):
+        client.open_by_key("sheet-id")
+    assert len(stand_in_server.requests) == 5
+
+
+def test_token_bucket_paces_requests_after_burst() -> None:
+    now = [0.0]
+    waits: list[float] = []
+
+    def sleep(seconds: float) -> None:
+        waits.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(requests_per_minute=60, capacity=2, clock=lambda: now[0], sleep=sleep)
+    for _ in range(4):
+        bucket.acquire()
+
+    assert waits == [pytest.approx(1.0), pytest.approx(1.0)]
+    bucket.drain()
+    assert bucket.acquire() == pytest.approx(1.0)
+
+
+def test_retry_policy_honors_retry_after_and_caps_delay() -> None:
+    policy = RetryPolicy(base_delay=1.0, max_delay=8.0)
+    rng = random.Random(0)
+
+    assert all(0 <= policy.delay(attempt, rng) <= min(8.0, 2 ** attempt) for attempt in range(6))
+    assert policy.delay(0, rng, retry_after=5.0) == 5.0
+    assert policy.delay(0, rng, retry_after=120.0) == 8.0
+
+
+def test_non_idempotent_requests_are_retried_only_on_429(stand_in_server) -> None:
+    stand_in_server.throttle_left = 0
+    stand_in_server.post_statuses = [429, 503]
+    http_client = _client(stand_in_server, []).http_client
+    append = "https://sheets.googleapis.com/v4/spreadsheets/sheet-id/values/RATES:append"
+
+    with pytest.raises(APIError):
+        http_client.request("post", append, json={"values": [["steel", 1]]})
+
+    # The 429 was retried; the 503 may have been applied server-side, so it is not.
+    assert len(stand_in_server.requests) == 2
+    assert http_client.retries == 1
+
+    stand_in_server.post_statuses = [503]
+    clear = "https://sheets.googleapis.com/v4/spreadsheets/sheet-id/values:batchClear"
+    assert http_client.request("post", clear, json={"ranges": ["RATES"]}).ok
+    assert http_client.retries == 2
+
+
+def test_non_idempotent_requests_are_retried_when_never_sent() -> None:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    http_client = RateLimitedHTTPClient(
+        None,
+        requests.Session(),
+        api_root=f"http://127.0.0.1:{port}",
+        retry=RetryPolicy(max_attempts=3, base_delay=0.0),
+        sleep=lambda seconds: None,
+    )
+
+    with pytest.raises(requests.ConnectionError):
+        http_client.request("post", "https://sheets.googleapis.com/v4/spreadsheets/x:batchUpdate")
+    assert http_client.retries == 2
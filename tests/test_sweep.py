@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from openpyxl import Workbook
+from openpyxl.workbook.defined_name import DefinedName
+
+from staff_quoter.pipeline.formula_engine import FormulaEngine
+from staff_quoter.pipeline.sweep import QuoteSweep, scenario_grid
+from staff_quoter.pipeline.workbook_reader import WorkbookSnapshot
+
+
+def _create_formula_workbook(path: Path) -> Path:
+    wb = Workbook()
+
+    ws_input = wb.active
+    ws_input.title = "INPUT_QUOTE"
+    ws_input["A2"] = "Q-NATIVE-001"
+    ws_input["C2"] = "MACHINING"
+    ws_input["D2"] = "Native Customer"
+    ws_input["G2"] = "PN-NATIVE-001"
+    ws_input["H2"] = 12
+    ws_input["I2"] = "steel"
+
+    ws_rates = wb.create_sheet("Rate Table")
+    for row, (material, rate, lead) in enumerate(
+        [("aluminum", 4.5, 2), ("steel", 6.25, 3), ("titanium", 18.0, 6)], start=1
+    ):
+        ws_rates.cell(row=row, column=1, value=material)
+        ws_rates.cell(row=row, column=2, value=rate)
+        ws_rates.cell(row=row, column=3, value=lead)
+    ws_rates["E1"] = 0
+    ws_rates["E2"] = 10
+    ws_rates["E3"] = 50
+    ws_rates["F1"] = 0.0
+    ws_rates["F2"] = 0.05
+    ws_rates["F3"] = 0.1
+    wb.defined_names["markup"] = DefinedName("markup", attr_text="'Rate Table'!$H$1")
+    ws_rates["H1"] = 0.35
+
+    ws_calc = wb.create_sheet("CALC_OUTPUTS")
+    ws_calc["H2"] = "=VLOOKUP(INPUT_QUOTE!I2,'Rate Table'!$A$1:$C$3,2,FALSE)"
+    ws_calc["I2"] = "=INPUT_QUOTE!H2*H2"
+    ws_calc["J2"] = "=INDEX('Rate Table'!F1:F3,MATCH(INPUT_QUOTE!H2,'Rate Table'!E1:E3,1))"
+    ws_calc["B2"] = "=ROUND(I2*(1-J2),2)"
+    ws_calc["C2"] = "=ROUND(B2*(1+markup),2)"
+    ws_calc["D2"] = "=IFERROR((C2-B2)/C2,0)"
+    ws_calc["E2"] = "=VLOOKUP(INPUT_QUOTE!I2,'Rate Table'!$A$1:$C$3,3,FALSE)+CEILING(H2/10,1)"
+    ws_calc["F2"] = "=MAX(10,ROUNDUP(INPUT_QUOTE!H2/5,0)*5)"
+    ws_calc["Z2"] = "=1/0"
+
+    ws_quote = wb.create_sheet("QUOTE_OUTPUT")
+    ws_quote["C2"] = '=AND(CALC_OUTPUTS!C2>0,INPUT_QUOTE!A2<>"")'
+
+    wb.save(path)
+    wb.close()
+    return path
+
+
+@pytest.fixture
+def formula_workbook(tmp_path: Path) -> Path:
+    """Quote workbook whose CALC_OUTPUTS/QUOTE_OUTPUT cells are formulas over a rate table."""
+    return _create_formula_workbook(tmp_path / "native.xlsx")
+
+
+def test_scenario_grid_is_cartesian_product() -> None:
+    grid = scenario_grid({("S", "A1"): [1, 2, 3], ("S", "B1"): ["x", "y"]})
+
+    assert grid[("S", "A1")] == [1, 1, 2, 2, 3, 3]
+    assert grid[("S", "B1")] == ["x", "y", "x", "y", "x", "y"]
+
+
+def test_sweep_matches_scalar_engine_per_scenario(formula_workbook: Path) -> None:
+    snapshot = WorkbookSnapshot.load(formula_workbook)
+    grid = scenario_grid(
+        {
+            ("INPUT_QUOTE", "H2"): [1, 9, 10, 12, 49, 50, 333],
+            ("INPUT_QUOTE", "I2"): ["aluminum", "steel", "titanium", "unobtainium"],
+        }
+    )
+
+    table = QuoteSweep(snapshot).run(grid)
+
+    assert len(table) == 28
+    assert list(table.columns[:2]) == ["INPUT_QUOTE!H2", "INPUT_QUOTE!I2"]
+    for row in table.itertuples(index=False):
+        engine = FormulaEngine(WorkbookSnapshot.load(formula_workbook))
+        engine.set_value("INPUT_QUOTE", "H2", row[0])
+        engine.set_value("INPUT_QUOTE", "I2", row[1])
+        expected_price = engine.value("CALC_OUTPUTS", "C2")
+        if isinstance(expected_price, float):
+            assert row.total_price == pytest.approx(expected_price)
+        else:
+            assert row.total_price == 0.0
+        assert row.moq == int(engine.value("CALC_OUTPUTS", "F2"))
+        assert row.pdf_ready_flag is (engine.value("QUOTE_OUTPUT", "C2") is True)
+    assert set(table["quote_id"]) == {"Q-NATIVE-001"}
+
+
+def test_sweep_evaluates_ten_thousand_scenarios(formula_workbook: Path) -> None:
+    grid = scenario_grid(
+        {
+            ("INPUT_QUOTE", "H2"): list(range(1, 2501)),
+            ("INPUT_QUOTE", "I2"): ["aluminum", "steel", "titanium", "steel"],
+        }
+    )
+
+    table = QuoteSweep(WorkbookSnapshot.load(formula_workbook)).run(grid)
+
+    assert len(table) == 10000
+    assert (table["total_price"] > 0).all()
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from staff_quoter.pipeline import WorkbookFormulaValidator, WorkbookSnapshot
+from staff_quoter.pipeline.quote_builder import QuotePayloadBuilder
+from staff_quoter.pipeline.synthetic import SyntheticWorkbookSpec, generate_workbook
+
+
+def test_generated_workbook_has_requested_shape(tmp_path: Path) -> None:
+    spec = SyntheticWorkbookSpec(
+        sheets=2, rows=50, columns=6, formula_density=1.0, cross_sheet_ratio=0.5, quotes=3
+    )
+    workbook_path = generate_workbook(tmp_path / "synthetic.xlsx", spec)
+
+    snapshot = WorkbookSnapshot.load(workbook_path)
+    assert snapshot.sheetnames == [
+        "INPUT_QUOTE", "CALC_OUTPUTS", "QUOTE_OUTPUT", "COSTING_01", "COSTING_02"
+    ]
+    # Every costing cell after the two input columns is a formula at density 1.0.
+    assert snapshot.total_formulas == 2 * 50 * 4
+    formulas = [formula for _, formula in snapshot["COSTING_02"].formulas]
+    assert any("COSTING_01!" in formula for formula in formulas)
+    assert not any("COSTING_" in formula for _, formula in snapshot["COSTING_01"].formulas)
+
+    report = WorkbookFormulaValidator().validate(workbook_path)
+    assert not report.has_errors
+    payloads = list(QuotePayloadBuilder().build_many(workbook_path))
+    assert [payload.quote_id for payload in payloads] == [
+        "Q-SYN-000-00000",
+        "Q-SYN-000-00001",
+        "Q-SYN-000-00002",
+    ]
+
+
+def test_generator_is_deterministic_and_injects_error_tokens(tmp_path: Path) -> None:
+    spec = SyntheticWorkbookSpec(sheets=1, rows=200, error_ratio=0.1, seed=7)
+    first = WorkbookSnapshot.load(generate_workbook(tmp_path / "a.xlsx", spec))
+    second = WorkbookSnapshot.load(generate_workbook(tmp_path / "b.xlsx", spec))
+
+    assert first["COSTING_01"].formulas == second["COSTING_01"].formulas
+    report = WorkbookFormulaValidator().validate(tmp_path / "a.xlsx")
+    assert "ERROR_TOKEN" in {issue.code for issue in report.issues}
+    with pytest.raises(ValueError, match="formula_density"):
+        SyntheticWorkbookSpec(formula_density=1.5)
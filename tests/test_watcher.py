@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from pathlib import Path
+import os
+import sys
+import threading
+
+import pytest
+from openpyxl import Workbook
+
+from staff_quoter.config import Settings
+from staff_quoter.pipeline import BatchItemResult
+from staff_quoter.pipeline.watcher import QuoteInboxDaemon
+
+
+def _create_quote_workbook(path: Path, quote_id: str = "Q-TEST-001") -> Path:
+    wb = Workbook()
+
+    ws_input = wb.active
+    ws_input.title = "INPUT_QUOTE"
+    ws_input["A2"] = quote_id
+    ws_input["C2"] = "MACHINING"
+    ws_input["D2"] = "Test Customer"
+    ws_input["G2"] = "PN-TEST-001"
+
+    ws_calc = wb.create_sheet("CALC_OUTPUTS")
+    ws_calc["B2"] = 100.0
+    ws_calc["C2"] = 150.0
+    ws_calc["D2"] = 0.5
+    ws_calc["E2"] = 2.0
+    ws_calc["F2"] = 50
+
+    ws_quote = wb.create_sheet("QUOTE_OUTPUT")
+    ws_quote["C2"] = "TRUE"
+
+    wb.save(path)
+    wb.close()
+    return path
+
+
+def _settings(tmp_path: Path, workbook_path: Path) -> Settings:
+    return Settings(
+        workspace_root=tmp_path,
+        google_credentials_file="",
+        google_sheets_id="",
+        xlsx_recalc_script=tmp_path / "recalc.py",
+        default_workbook=workbook_path,
+        output_json_dir=tmp_path / "output" / "json",
+        output_pdf_dir=tmp_path / "output" / "pdf",
+        output_json_mode="files",
+    )
+
+
+def test_run_once_moves_workbooks_to_done_and_failed(tmp_path: Path) -> None:
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    for idx in range(5):
+        _create_quote_workbook(inbox / f"quote_{idx}.xlsx", quote_id=f"Q-INBOX-{idx:03d}")
+    (inbox / "broken.xlsx").write_bytes(b"not a workbook")
+    (inbox / "notes.txt").write_text("ignored", encoding="utf-8")
+
+    daemon = QuoteInboxDaemon(
+        _settings(tmp_path, inbox / "quote_0.xlsx"),
+        inbox,
+        max_in_flight=2,
+        settle_seconds=0,
+        watch="poll",
+    )
+    items: list[BatchItemResult] = []
+    try:
+        assert daemon.run_once(items.append) == 6
+    finally:
+        daemon.close()
+
+    assert sorted(item.ok for item in items) == [False] + [True] * 5
+    assert sorted(p.name for p in inbox.iterdir() if p.is_file()) == ["notes.txt"]
+    assert len(list((inbox / "done").glob("*.xlsx"))) == 5
+    assert (inbox / "failed" / "broken.xlsx").exists()
+    assert "broken.xlsx.error.txt" in {p.name for p in (inbox / "failed").iterdir()}
+    assert (tmp_path / "output" / "json" / "Q-INBOX-004.json").exists()
+
+
+@pytest.mark.parametrize("watch", ["auto", "poll"])
+def test_serve_forever_quotes_files_as_they_arrive(tmp_path: Path, watch: str) -> None:
+    inbox = tmp_path / "inbox"
+    settings = _settings(tmp_path, inbox / "late.xlsx")
+    daemon = QuoteInboxDaemon(settings, inbox, poll_interval=0.05, settle_seconds=0.05, watch=watch)
+    if watch == "auto" and sys.platform.startswith("linux"):
+        assert daemon.backend == "inotify"
+    arrived = threading.Event()
+    items: list[BatchItemResult] = []
+
+    def _on_result(item: BatchItemResult) -> None:
+        items.append(item)
+        arrived.set()
+
+    thread = threading.Thread(target=daemon.serve_forever, args=(_on_result,))
+    thread.start()
+    try:
+        staging = tmp_path / "staging.xlsx"
+        _create_quote_workbook(staging, quote_id="Q-LATE-001")
+        staging.rename(inbox / "late.xlsx")
+        assert arrived.wait(timeout=10)
+    finally:
+        daemon.stop()
+        thread.join(timeout=10)
+        daemon.close()
+
+    assert not thread.is_alive()
+    assert [item.ok for item in items] == [True]
+    assert (inbox / "done" / "late.xlsx").exists()
+    assert (settings.output_pdf_dir / "Q-LATE-001.pdf").exists()
+
+
+def test_daemon_with_worker_processes_and_name_collisions(tmp_path: Path) -> None:
+    inbox = tmp_path / "inbox"
+    (inbox / "done").mkdir(parents=True)
+    _create_quote_workbook(inbox / "done" / "quote.xlsx", quote_id="Q-OLD")
+    _create_quote_workbook(inbox / "quote.xlsx", quote_id="Q-POOL-001")
+    _create_quote_workbook(inbox / "other.xlsx", quote_id="Q-POOL-002")
+
+    daemon = QuoteInboxDaemon(
+        _settings(tmp_path, inbox / "quote.xlsx"), inbox, workers=2, settle_seconds=0, watch="poll"
+    )
+    try:
+        assert daemon.run_once() == 2
+    finally:
+        daemon.close()
+
+    done = sorted(p.name for p in (inbox / "done").iterdir())
+    assert len(done) == 3 and "other.xlsx" in done and "quote.xlsx" in done
+    assert (tmp_path / "output" / "json" / "Q-POOL-001.json").exists()
+
+
+def test_daemon_reruns_workbooks_lost_to_a_worker_crash(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from staff_quoter.pipeline import batch
+
+    run_batch_item = batch.run_batch_item
+
+    def _crash_on_demand(pipeline, workbook_path, *args):  # type: ignore[no-untyped-def]
+        if workbook_path.name.startswith("crash"):
+            os._exit(1)
+        return run_batch_item(pipeline, workbook_path, *args)
+
+    # Worker processes are forked, so they inherit the patched function.
+    monkeypatch.setattr(batch, "run_batch_item", _crash_on_demand)
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    for idx in range(3):
+        _create_quote_workbook(inbox / f"quote_{idx}.xlsx", quote_id=f"Q-WCRASH-{idx:03d}")
+    _create_quote_workbook(inbox / "crash.xlsx", quote_id="Q-WCRASH-999")
+
+    daemon = QuoteInboxDaemon(
+        _settings(tmp_path, inbox / "crash.xlsx"),
+        inbox,
+        workers=2,
+        max_in_flight=4,
+        settle_seconds=0,
+        watch="poll",
+    )
+    items: list[BatchItemResult] = []
+    try:
+        assert daemon.run_once(items.append) == 4
+    finally:
+        daemon.close()
+
+    failed = [item for item in items if not item.ok]
+    assert [Path(item.workbook_path).name for item in failed] == ["crash.xlsx"]
+    assert "worker process died" in (failed[0].error or "")
+    assert len(list((inbox / "done").glob("quote_*.xlsx"))) == 3
+    assert (inbox / "failed" / "crash.xlsx").exists()
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from pathlib import Path
+import zipfile
+
+from openpyxl import Workbook, load_workbook
+
+from staff_quoter.pipeline import WorkbookFormulaValidator, WorkbookSnapshot
+from staff_quoter.pipeline.cell_map import QUOTE_CELL_MAP, CellField
+from staff_quoter.pipeline.quote_builder import QuotePayloadBuilder
+from staff_quoter.pipeline.workbook_reader import read_cells
+
+
+def _rewrite_part(path: Path, part_name: str, replacements: dict[str, str]) -> None:
+    with zipfile.ZipFile(path) as archive:
+        parts = {name: archive.read(name) for name in archive.namelist()}
+
+    xml = parts[part_name].decode("utf-8")
+    for old, new in replacements.items():
+        assert old in xml
+        xml = xml.replace(old, new)
+    parts[part_name] = xml.encode("utf-8")
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in parts.items():
+            archive.writestr(name, data)
+
+
+def _create_workbook(path: Path) -> None:
+    wb = Workbook()
+    ws_input = wb.active
+    ws_input.title = "INPUT_QUOTE"
+    ws_input["A2"] = "Q-SNAP-001"
+    ws_input["C2"] = "FABRICATION"
+    ws_input["D2"] = "Snapshot Customer"
+    ws_input["G2"] = "PN-SNAP-001"
+    ws_input["H2"] = 12
+
+    ws_calc = wb.create_sheet("CALC_OUTPUTS")
+    ws_calc["B2"] = "=INPUT_QUOTE!H2*10"
+    ws_calc["C2"] = 180.5
+    ws_calc["D2"] = "=C2/B2-1"
+    ws_calc["E2"] = 3
+    ws_calc["F2"] = "=MISSING!A1"
+    for row in range(3, 6):
+        ws_calc[f"G{row}"] = f"=B{row}+1"
+
+    ws_quote = wb.create_sheet("QUOTE_OUTPUT")
+    ws_quote["C2"] = True
+
+    wb.save(path)
+    wb.close()
+
+    _rewrite_part(
+        path,
+        "xl/worksheets/sheet2.xml",
+        {
+            "<f>INPUT_QUOTE!H2*10</f><v />": "<f>INPUT_QUOTE!H2*10</f><v>120</v>",
+            "<f>C2/B2-1</f><v />": "<f>C2/B2-1</f><v>0.5041666</v>",
+            '<c r="G3"><f>B3+1</f><v /></c>': (
+                '<c r="G3"><f t="shared" ref="G3:G5" si="0">B3+1</f><v>1</v></c>'
+            ),
+            '<c r="G4"><f>B4+1</f><v /></c>': '<c r="G4"><f t="shared" si="0" /><v>1</v></c>',
+            '<c r="G5"><f>B5+1</f><v /></c>': '<c r="G5"><f t="shared" si="0" /><v>1</v></c>',
+        },
+    )
+
+
+def test_snapshot_exposes_formulas_and_cached_values(tmp_path: Path) -> None:
+    workbook_path = tmp_path / "snapshot_case.xlsx"
+    _create_workbook(workbook_path)
+
+    snapshot = WorkbookSnapshot.load(workbook_path)
+
+    assert snapshot.sheetnames == ["INPUT_QUOTE", "CALC_OUTPUTS", "QUOTE_OUTPUT"]
+    calc = snapshot["CALC_OUTPUTS"]
+    assert calc.value("B2") == 120
+    assert calc.value("D2") == 0.5041666
+
+    wb = load_workbook(workbook_path, data_only=False, read_only=True)
+    expected = [
+        (cell.coordinate, cell.value)
+        for row in wb["CALC_OUTPUTS"].iter_rows()
+        for cell in row
+        if cell.data_type == "f"
+    ]
+    wb.close()
+    assert calc.formulas == expected
+    assert ("G5", "=B5+1") in calc.formulas
+
+
+def test_snapshot_matches_file_based_validator_and_builder(tmp_path: Path) -> None:
+    workbook_path = tmp_path / "snapshot_parity.xlsx"
+    _create_workbook(workbook_path)
+
+    snapshot = WorkbookSnapshot.load(workbook_path)
+    validator = WorkbookFormulaValidator()
+    from_snapshot_report = validator.validate_snapshot(snapshot).to_dict()
+    assert from_snapshot_report == validator.validate(workbook_path).to_dict()
+
+    builder = QuotePayloadBuilder()
+    from_snapshot = builder.build_from_snapshot(snapshot).to_dict()
+    from_file = builder.build_from_workbook(workbook_path).to_dict()
+    from_snapshot.pop("generated_at_utc")
+    from_file.pop("generated_at_utc")
+    assert from_snapshot == from_file
+    assert from_snapshot["total_cost"] == 120.0
+    assert from_snapshot["pdf_ready_flag"] is True
+
+
+def test_read_cells_stops_after_highest_requested_row(tmp_path: Path) -> None:
+    workbook_path = tmp_path / "targeted_cells.xlsx"
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "CALC_OUTPUTS"
+    ws["B2"] = 42.5
+    ws["C2"] = "label"
+    for row in range(3, 5000):
+        ws.append([row, row * 2, f"=A{row}+B{row}"])
+    wb.save(workbook_path)
+    wb.close()
+
+    # A truncated tail only breaks readers that parse past the rows they need.
+    _rewrite_part(
+        workbook_path, "xl/worksheets/sheet1.xml", {"</sheetData>": "<broken></sheetData>"}
+    )
+
+    values = read_cells(
+        workbook_path,
+        [("CALC_OUTPUTS", "B2"), ("CALC_OUTPUTS", "C2"), ("CALC_OUTPUTS", "D2")],
+    )
+
+    assert values == {("CALC_OUTPUTS", "B2"): 42.5, ("CALC_OUTPUTS", "C2"): "label"}
+
+
+def test_builder_uses_declarative_cell_map(tmp_path: Path) -> None:
+    workbook_path = tmp_path / "cell_map.xlsx"
+    _create_workbook(workbook_path)
+
+    cell_map = [
+        CellField(field.name, field.sheet, "E2" if field.name == "moq" else field.cell, field.kind)
+        for field in QUOTE_CELL_MAP
+    ]
+    payload = QuotePayloadBuilder(cell_map).build_from_workbook(workbook_path)
+
+    assert payload.quote_id == "Q-SNAP-001"
+    assert payload.moq == 3
+    assert payload.total_price == 180.5